@@ -0,0 +1,3 @@
+from .container import read_arrays, write_arrays
+
+__all__ = ["read_arrays", "write_arrays"]
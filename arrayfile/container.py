@@ -0,0 +1,79 @@
+import json
+import os
+import struct
+from typing import Any, Dict, Tuple, Union
+
+import numpy as np
+
+PathLike = Union[str, os.PathLike]
+
+ALIGNMENT = 64
+_PREAMBLE = struct.Struct("<8sII")  # magic, version, header length
+
+
+def _aligned(offset: int) -> int:
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def write_arrays(
+    path: PathLike,
+    magic: bytes,
+    version: int,
+    header: Dict[str, Any],
+    arrays: Dict[str, np.ndarray],
+) -> None:
+    """Atomically write ``arrays`` with a JSON ``header`` to ``path``.
+
+    The file is a fixed preamble (8 magic bytes, format version, header
+    size), the header with an added ``"arrays"`` list giving the name, dtype
+    and shape of each array, then the raw arrays in order, each starting on
+    the next 64-byte boundary so `read_arrays` can memory-map them in place.
+    """
+    header = dict(header)
+    header["arrays"] = [
+        {"name": name, "dtype": array.dtype.str, "shape": list(array.shape)}
+        for name, array in arrays.items()
+    ]
+    header_bytes = json.dumps(header).encode("utf-8")
+
+    tmp_path = f"{os.fspath(path)}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(_PREAMBLE.pack(magic, version, len(header_bytes)))
+        f.write(header_bytes)
+        for array in arrays.values():
+            f.write(b"\0" * (_aligned(f.tell()) - f.tell()))
+            f.write(np.ascontiguousarray(array).tobytes())
+    os.replace(tmp_path, path)
+
+
+def read_arrays(
+    path: PathLike, magic: bytes, version: int, kind: str, mmap: bool = True
+) -> Tuple[Dict[str, Any], Dict[str, np.ndarray]]:
+    """Header and arrays of a file written by `write_arrays`.
+
+    With ``mmap=True`` non-empty arrays are read-only memory maps of the
+    file, so loading is instant and processes reading the same file share
+    its pages; otherwise they are read into memory. ``kind`` names the
+    expected content in the error raised for a wrong magic.
+    """
+    with open(path, "rb") as f:
+        file_magic, file_version, header_len = _PREAMBLE.unpack(f.read(_PREAMBLE.size))
+        if file_magic != magic:
+            raise ValueError(f"{path} is not a saved {kind}.")
+        if file_version != version:
+            raise ValueError(f"Unsupported model format version {file_version}.")
+        header = json.loads(f.read(header_len).decode("utf-8"))
+
+    arrays = {}
+    offset = _PREAMBLE.size + header_len
+    for spec in header.pop("arrays"):
+        dtype, shape = np.dtype(spec["dtype"]), tuple(spec["shape"])
+        offset = _aligned(offset)
+        count = int(np.prod(shape))
+        if mmap and count:
+            array = np.memmap(path, dtype=dtype, mode="r", offset=offset, shape=shape)
+        else:
+            array = np.fromfile(path, dtype=dtype, count=count, offset=offset)
+        arrays[spec["name"]] = array.reshape(shape)
+        offset += count * dtype.itemsize
+    return header, arrays
@@ -0,0 +1,75 @@
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+MIN_BINS, MAX_BINS = 2, 256
+
+
+def categorical_mask(
+    categorical_features: Optional[Sequence[int]], n_features: int
+) -> np.ndarray:
+    """Boolean mask of the categorical columns given as indices or a mask."""
+    mask = np.zeros(n_features, dtype=bool)
+    if categorical_features is not None:
+        mask[np.asarray(categorical_features)] = True
+    return mask
+
+
+def compute_bin_edges(
+    X: np.ndarray, max_bins: int = MAX_BINS, categorical: Optional[np.ndarray] = None
+) -> List[np.ndarray]:
+    """Per-feature upper bin edges from the quantiles of ``X``.
+
+    Edges are actual data values, so bin ``b`` holds ``edges[b-1] < x <= edges[b]``
+    and "bin <= b" is the same split as "x <= edges[b]". A feature with at
+    most ``max_bins`` distinct values gets one bin per value, making
+    histogram splits identical to exact ones. The last bin is open-ended and
+    has no edge, so there are at most ``max_bins - 1`` edges per feature.
+
+    NaNs are ignored here; `bin_features` puts them in a bin of their own
+    after the value bins, so a feature with NaNs gets one value bin less.
+    Features flagged in the boolean mask ``categorical`` get one bin per
+    category and all their categories as edges (bin ``b`` is ``edges[b]``).
+    """
+    if not MIN_BINS <= max_bins <= MAX_BINS:
+        raise ValueError(f"max_bins must be between {MIN_BINS} and {MAX_BINS}.")
+    if categorical is None:
+        categorical = np.zeros(X.shape[1], dtype=bool)
+    edges = []
+    for col, is_categorical in zip(X.T, categorical):
+        has_missing = np.isnan(col).any()
+        n_value_bins = max_bins - 1 if has_missing else max_bins
+        xs = np.sort(col[~np.isnan(col)] if has_missing else col)
+        values = xs[np.append(True, xs[1:] != xs[:-1])] if xs.size else xs
+        if is_categorical:
+            # The bin after the categories stays free, so NaNs get the next one
+            if values.size > max_bins - 2:
+                raise ValueError(
+                    f"Categorical features need at most max_bins - 2 = "
+                    f"{max_bins - 2} categories."
+                )
+            edges.append(values)
+            continue
+        if values.size > n_value_bins:
+            # Evenly spaced order statistics, deduplicated for heavy ties
+            ranks = (np.arange(1, n_value_bins) * xs.size) // n_value_bins
+            values = np.unique(xs[ranks])
+        edges.append(values[:-1] if values.size and values[-1] == xs[-1] else values)
+    return edges
+
+
+def bin_features(X: np.ndarray, edges: List[np.ndarray]) -> np.ndarray:
+    """Map ``X`` to ``uint8`` bin codes using edges from `compute_bin_edges`.
+
+    NaNs of a feature get code ``len(edges[feat]) + 1``, the first code
+    above its value bins. Returns a Fortran-ordered ``(n_samples,
+    n_features)`` array, so the codes of one feature are contiguous.
+    """
+    binned = np.empty(X.shape, dtype=np.uint8, order="F")
+    for feat, feat_edges in enumerate(edges):
+        col = X[:, feat]
+        binned[:, feat] = np.searchsorted(feat_edges, col, side="left")
+        missing = np.isnan(col)
+        if missing.any():
+            binned[missing, feat] = feat_edges.size + 1
+    return binned
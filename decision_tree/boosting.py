@@ -0,0 +1,258 @@
+import abc
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .binning import MAX_BINS, bin_features, categorical_mask, compute_bin_edges
+from .forest import _stack_trees
+from .tree import DecisionTree, TreeArrays
+
+
+def _sigmoid(raw: np.ndarray) -> np.ndarray:
+    return 0.5 * (1.0 + np.tanh(0.5 * raw))
+
+
+class _GradientBoosting(abc.ABC):
+    """Shared boosting loop; subclasses define the loss.
+
+    ``X`` is binned once (`binning.bin_features`) and every round fits a
+    shallow ``criterion="mse"`` `DecisionTree` to the negative gradient on
+    those codes via `DecisionTree.fit_binned`. Raw predictions of the
+    training (and validation) rows are updated in place from the new tree's
+    leaves, so a round costs O(n * depth) beyond the histogram split search
+    and never re-scores earlier trees.
+
+    ``subsample < 1`` fits each tree on a random fraction of the rows
+    (drawn without replacement, passed as 0/1 sample weights). With
+    ``n_iter_no_change`` set, training stops once the validation loss has
+    not improved by ``tol`` for that many rounds, and the model is cut back
+    to its best round. The validation set is ``eval_set`` if given to `fit`,
+    else a ``validation_fraction`` of the training rows. NaNs and
+    ``categorical_features`` are handled natively, as in `DecisionTree`.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        n_estimators: int = 100,
+        learning_rate: float = 0.1,
+        max_depth: int = 3,
+        min_samples_split: int = 2,
+        *,
+        subsample: float = 1.0,
+        max_bins: int = MAX_BINS,
+        n_iter_no_change: Optional[int] = None,
+        validation_fraction: float = 0.1,
+        tol: float = 1e-7,
+        random_state: Optional[int] = None,
+        batch_size: int = 4096,
+        categorical_features: Optional[Sequence[int]] = None,
+    ):
+        self.n_estimators = n_estimators
+        self.learning_rate = learning_rate
+        self.max_depth = max_depth
+        self.min_samples_split = min_samples_split
+        self.subsample = subsample
+        self.max_bins = max_bins
+        self.n_iter_no_change = n_iter_no_change
+        self.validation_fraction = validation_fraction
+        self.tol = tol
+        self.random_state = random_state
+        self.batch_size = batch_size
+        self.categorical_features = categorical_features
+        self.estimators_: List[TreeArrays] = []
+
+    # Loss interface, on encoded targets and raw (additive) scores
+    def _set_target(self, y: np.ndarray) -> np.ndarray:
+        """Learn the target encoding from training labels and apply it."""
+        return self._encode_target(y)
+
+    @abc.abstractmethod
+    def _encode_target(self, y: np.ndarray) -> np.ndarray:
+        """Targets as the loss expects them, with the encoding already fixed."""
+
+    @abc.abstractmethod
+    def _init_raw(self, y: np.ndarray) -> float:
+        """Constant raw score minimizing the loss, the model's starting point."""
+
+    @abc.abstractmethod
+    def _loss(self, y: np.ndarray, raw: np.ndarray) -> float:
+        """Mean loss of raw scores ``raw`` on encoded targets ``y``."""
+
+    @abc.abstractmethod
+    def _negative_gradient(self, y: np.ndarray, raw: np.ndarray) -> np.ndarray:
+        """Per-row negative gradient of the loss, the next tree's target."""
+
+    def _fit_leaves(
+        self,
+        tree: TreeArrays,
+        leaves: np.ndarray,
+        weight: np.ndarray,
+        y: np.ndarray,
+        raw: np.ndarray,
+    ) -> None:
+        """Optionally replace the tree's leaf values (default: mean residual)."""
+
+    def fit(
+        self,
+        X: np.ndarray,
+        y: np.ndarray,
+        eval_set: Optional[Tuple[np.ndarray, np.ndarray]] = None,
+    ):
+        if not 0.0 < self.subsample <= 1.0:
+            raise ValueError("subsample must be in (0, 1].")
+        rng = np.random.default_rng(self.random_state)
+        y = self._set_target(y)
+        if eval_set is not None:
+            X_val, y_val = eval_set[0], self._encode_target(eval_set[1])
+        elif self.n_iter_no_change is not None:
+            order = rng.permutation(y.size)
+            n_val = max(1, int(self.validation_fraction * y.size))
+            X_val, y_val = X[order[:n_val]], y[order[:n_val]]
+            X, y = X[order[n_val:]], y[order[n_val:]]
+        else:
+            X_val = y_val = None
+
+        categorical = categorical_mask(self.categorical_features, X.shape[1])
+        self.bin_edges_ = compute_bin_edges(X, self.max_bins, categorical)
+        X_binned = bin_features(X, self.bin_edges_)
+        self.init_ = self._init_raw(y)
+        raw = np.full(y.size, self.init_)
+        raw_val = None if X_val is None else np.full(y_val.size, self.init_)
+        n_sub = max(1, round(self.subsample * y.size))
+
+        self.estimators_ = []
+        self.train_score_: List[float] = []
+        self.validation_score_: List[float] = []
+        best_loss, best_round = np.inf, 0
+        for _ in range(self.n_estimators):
+            weight = np.ones(y.size)
+            if n_sub < y.size:
+                weight[:] = 0.0
+                weight[rng.choice(y.size, n_sub, replace=False)] = 1.0
+            tree = DecisionTree(
+                max_depth=self.max_depth,
+                min_samples_split=self.min_samples_split,
+                splitter="hist",
+                max_bins=self.max_bins,
+                criterion="mse",
+                categorical_features=self.categorical_features,
+            ).fit_binned(
+                X_binned, self.bin_edges_, self._negative_gradient(y, raw), weight
+            )
+            arrays = tree.tree_
+            leaves = arrays.apply(X)
+            self._fit_leaves(arrays, leaves, weight, y, raw)
+            arrays.value *= self.learning_rate
+            raw += arrays.value[leaves, 0]
+            self.estimators_.append(arrays)
+            self.train_score_.append(self._loss(y, raw))
+
+            if raw_val is None:
+                continue
+            raw_val += arrays.value[arrays.apply(X_val), 0]
+            val_loss = self._loss(y_val, raw_val)
+            self.validation_score_.append(val_loss)
+            if val_loss < best_loss - self.tol:
+                best_loss, best_round = val_loss, len(self.estimators_)
+            elif (
+                self.n_iter_no_change is not None
+                and len(self.estimators_) - best_round >= self.n_iter_no_change
+            ):
+                break
+
+        if self.n_iter_no_change is not None and best_round > 0:
+            del self.estimators_[best_round:]
+        self.best_iteration_ = len(self.estimators_)
+        self._stacked = _stack_trees(self.estimators_) if self.estimators_ else None
+        return self
+
+    def _raw_predict(self, X: np.ndarray) -> np.ndarray:
+        """``init_`` plus the (already shrunk) leaf values of every tree."""
+        raw = np.full(X.shape[0], self.init_)
+        if self._stacked is None:
+            return raw
+        forest, roots = self._stacked
+        n_trees = roots.size
+        for start in range(0, X.shape[0], self.batch_size):
+            batch = X[start : start + self.batch_size]
+            size = batch.shape[0]
+            rows = np.tile(np.arange(size), n_trees)
+            leaves = forest.descend(batch, rows, np.repeat(roots, size))
+            raw[start : start + size] += (
+                forest.value[leaves, 0].reshape(n_trees, size).sum(axis=0)
+            )
+        return raw
+
+
+class GradientBoostingRegressor(_GradientBoosting):
+    """Least-squares gradient boosting over shallow regression trees."""
+
+    def _encode_target(self, y: np.ndarray) -> np.ndarray:
+        return np.asarray(y, dtype=np.float64)
+
+    def _init_raw(self, y: np.ndarray) -> float:
+        return float(y.mean())
+
+    def _loss(self, y: np.ndarray, raw: np.ndarray) -> float:
+        return float(np.mean((y - raw) ** 2))
+
+    def _negative_gradient(self, y: np.ndarray, raw: np.ndarray) -> np.ndarray:
+        return y - raw
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        return self._raw_predict(X)
+
+
+class GradientBoostingClassifier(_GradientBoosting):
+    """Binary log-loss gradient boosting; raw scores are log-odds.
+
+    Trees are grown on the residuals ``y - p`` and each leaf then takes the
+    Newton step ``sum(y - p) / sum(p * (1 - p))`` over its training rows.
+    """
+
+    def _set_target(self, y: np.ndarray) -> np.ndarray:
+        self.classes_ = np.unique(y)
+        if self.classes_.size != 2:  # noqa: PLR2004
+            raise ValueError("GradientBoostingClassifier needs exactly 2 classes.")
+        return self._encode_target(y)
+
+    def _encode_target(self, y: np.ndarray) -> np.ndarray:
+        return (np.asarray(y) == self.classes_[1]).astype(np.float64)
+
+    def _init_raw(self, y: np.ndarray) -> float:
+        p = np.clip(y.mean(), 1e-12, 1 - 1e-12)
+        return float(np.log(p / (1 - p)))
+
+    def _loss(self, y: np.ndarray, raw: np.ndarray) -> float:
+        # log(1 + exp(raw)) - y * raw, computed without overflow
+        return float(np.mean(np.logaddexp(0.0, raw) - y * raw))
+
+    def _negative_gradient(self, y: np.ndarray, raw: np.ndarray) -> np.ndarray:
+        return y - _sigmoid(raw)
+
+    def _fit_leaves(
+        self,
+        tree: TreeArrays,
+        leaves: np.ndarray,
+        weight: np.ndarray,
+        y: np.ndarray,
+        raw: np.ndarray,
+    ) -> None:
+        p = _sigmoid(raw)
+        n_nodes = tree.n_nodes
+        numerator = np.bincount(leaves, weights=weight * (y - p), minlength=n_nodes)
+        denominator = np.bincount(
+            leaves, weights=weight * p * (1 - p), minlength=n_nodes
+        )
+        with np.errstate(divide="ignore", invalid="ignore"):
+            step = numerator / denominator
+        fitted = denominator > 0
+        tree.value[fitted, 0] = step[fitted]
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        """Probabilities of ``classes_[0]`` and ``classes_[1]``."""
+        p = _sigmoid(self._raw_predict(X))
+        return np.column_stack([1 - p, p])
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        return self.classes_[(self._raw_predict(X) > 0).astype(int)]
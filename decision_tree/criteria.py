@@ -0,0 +1,114 @@
+import abc
+
+import numpy as np
+
+
+class Criterion(abc.ABC):
+    """Node impurity computed from additive sufficient statistics.
+
+    `sample_stats` gives one row of statistics per training sample; a node's
+    statistics are the column sums over its samples. Because they are
+    additive, the statistics of every candidate split come from one
+    cumulative sum over sorted samples (or over histogram bins), and all
+    methods below work on arrays of such rows at once (last axis = stats).
+    """
+
+    is_classifier = True
+
+    @abc.abstractmethod
+    def sample_stats(self, y: np.ndarray, n_classes: int) -> np.ndarray:
+        """Per-sample statistics; classifiers receive labels as 0..n_classes-1."""
+
+    @abc.abstractmethod
+    def count(self, stats: np.ndarray) -> np.ndarray:
+        """Number of samples behind each row of statistics."""
+
+    @abc.abstractmethod
+    def impurity(self, stats: np.ndarray) -> np.ndarray:
+        """Impurity of each row of statistics (0 for empty nodes)."""
+
+    @abc.abstractmethod
+    def node_value(self, stats: np.ndarray) -> np.ndarray:
+        """Prediction vector stored in a node with these statistics."""
+
+    @abc.abstractmethod
+    def category_order(self, stats: np.ndarray, parent: np.ndarray) -> np.ndarray:
+        """Sort key of the categories (rows of ``stats``) of a node ``parent``.
+
+        Categorical splits only try left sets that are prefixes of this
+        order, which contain the optimal split for regression and two classes.
+        """
+
+
+def _row_sum(a: np.ndarray) -> np.ndarray:
+    """Sum over the short last axis; matmul is far faster than ``sum(axis=-1)``."""
+    return a @ np.ones(a.shape[-1])
+
+
+class ClassificationCriterion(Criterion):
+    """Statistics are per-class sample counts; values are class proportions."""
+
+    def sample_stats(self, y: np.ndarray, n_classes: int) -> np.ndarray:
+        return np.eye(n_classes)[y]
+
+    def count(self, stats: np.ndarray) -> np.ndarray:
+        return _row_sum(stats)
+
+    def _proportions(self, stats: np.ndarray) -> np.ndarray:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return stats / self.count(stats)[..., None]
+
+    def node_value(self, stats: np.ndarray) -> np.ndarray:
+        return self._proportions(stats)
+
+    def category_order(self, stats: np.ndarray, parent: np.ndarray) -> np.ndarray:
+        # Share of the node's majority class; a heuristic beyond two classes
+        return self._proportions(stats)[..., np.argmax(parent)]
+
+
+class Gini(ClassificationCriterion):
+    def impurity(self, stats: np.ndarray) -> np.ndarray:
+        n = self.count(stats)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            gini = 1.0 - _row_sum(stats * stats) / (n * n)
+        # Empty partitions have zero impurity
+        return np.where(n > 0, gini, 0.0)
+
+
+class Entropy(ClassificationCriterion):
+    def impurity(self, stats: np.ndarray) -> np.ndarray:
+        p = self._proportions(stats)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            terms = np.where(p > 0, -p * np.log2(p), 0.0)
+        return _row_sum(terms)
+
+
+class MSE(Criterion):
+    """Regression by variance reduction; statistics are ``(1, y, y**2)``."""
+
+    is_classifier = False
+
+    def sample_stats(self, y: np.ndarray, n_classes: int) -> np.ndarray:
+        y = np.asarray(y, dtype=float)
+        return np.column_stack([np.ones_like(y), y, y * y])
+
+    def count(self, stats: np.ndarray) -> np.ndarray:
+        return stats[..., 0]
+
+    def impurity(self, stats: np.ndarray) -> np.ndarray:
+        n = stats[..., 0]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            mean = stats[..., 1] / n
+            variance = stats[..., 2] / n - mean**2
+        # Clip the rounding error of E[y^2] - E[y]^2 on (near-)constant nodes
+        return np.where(n > 0, np.maximum(variance, 0.0), 0.0)
+
+    def node_value(self, stats: np.ndarray) -> np.ndarray:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return stats[..., 1:2] / stats[..., 0:1]
+
+    def category_order(self, stats: np.ndarray, parent: np.ndarray) -> np.ndarray:
+        return stats[..., 1] / stats[..., 0]
+
+
+CRITERIA = {"gini": Gini, "entropy": Entropy, "mse": MSE}
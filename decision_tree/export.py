@@ -0,0 +1,232 @@
+import json
+import math
+import os
+from dataclasses import fields
+from typing import Any, Callable, Dict, List, Sequence, Union
+
+import numpy as np
+
+from arrayfile import read_arrays, write_arrays
+
+from .binning import categorical_mask
+from .criteria import CRITERIA
+from .tree import LEAF, DecisionTree, TreeArrays, _category_bits
+
+PathLike = Union[str, os.PathLike]
+
+MAGIC = b"DTMODEL\0"
+FORMAT_VERSION = 1
+# Constructor parameters kept with a saved tree
+_PARAMS = (
+    "max_depth",
+    "min_samples_split",
+    "splitter",
+    "max_bins",
+    "criterion",
+    "max_features",
+    "min_impurity_decrease",
+    "max_leaf_nodes",
+    "ccp_alpha",
+    "categorical_features",
+)
+# CPython refuses more than 100 levels of indentation in one function
+MAX_CODEGEN_DEPTH = 90
+
+
+def _params(model: DecisionTree) -> Dict[str, Any]:
+    params = {name: getattr(model, name) for name in _PARAMS}
+    if params["categorical_features"] is not None:
+        params["categorical_features"] = np.asarray(
+            params["categorical_features"]
+        ).tolist()
+    return params
+
+
+def _check_fitted(model: DecisionTree) -> None:
+    if model.tree_ is None:
+        raise ValueError("Model has not been fitted yet.")
+    if model.criterion_.is_classifier and model.classes_.dtype.hasobject:
+        raise ValueError("Only numeric or fixed-width string labels can be saved.")
+
+
+def _restore(
+    params: Dict[str, Any], n_features: int, classes: Any, tree: TreeArrays
+) -> DecisionTree:
+    """A `DecisionTree` holding ``tree``, ready for inference."""
+    model = DecisionTree(**params)
+    model.criterion_ = CRITERIA[model.criterion]()
+    model.n_features_ = n_features
+    model.categorical_ = categorical_mask(model.categorical_features, n_features)
+    if classes is not None:
+        model.classes_ = np.asarray(classes)
+    model.tree_ = tree
+    return model
+
+
+def save_model(path: PathLike, model: DecisionTree) -> None:
+    """Write a fitted tree to ``path`` as an `arrayfile`.
+
+    The header holds the constructor parameters; the arrays are
+    ``classes_`` (classifiers only) and the `TreeArrays` fields.
+    """
+    _check_fitted(model)
+    arrays = {"classes": model.classes_} if model.criterion_.is_classifier else {}
+    for field in fields(TreeArrays):
+        arrays[field.name] = getattr(model.tree_, field.name)
+    header = {"params": _params(model), "n_features": model.n_features_}
+    write_arrays(path, MAGIC, FORMAT_VERSION, header, arrays)
+
+
+def load_model(path: PathLike, mmap: bool = True) -> DecisionTree:
+    """Load a tree written by `save_model`, ready for inference.
+
+    With ``mmap=True`` the node arrays are memory-mapped read-only. `prune`
+    and `truncate` still work; they return in-memory copies.
+    """
+    header, arrays = read_arrays(
+        path, MAGIC, FORMAT_VERSION, "decision tree", mmap=mmap
+    )
+    classes = arrays.pop("classes", None)
+    return _restore(
+        header["params"], header["n_features"], classes, TreeArrays(**arrays)
+    )
+
+
+def to_json(model: DecisionTree, indent: Union[int, None] = None) -> str:
+    """JSON document of a fitted tree: parameters, classes and a flat node list.
+
+    Nodes are listed by index (node 0 is the root) with ``value``,
+    ``impurity`` and ``n_samples``; internal nodes add ``feature``,
+    ``left``, ``right``, ``missing_left`` and either ``threshold`` (null
+    for +inf, which splits values from missing ones) or ``categories``.
+    The output is strict JSON, and `from_json` reads it back.
+    """
+    _check_fitted(model)
+    tree = model.tree_
+    nodes: List[Dict[str, Any]] = []
+    for node in range(tree.n_nodes):
+        entry: Dict[str, Any] = {
+            "value": tree.value[node].tolist(),
+            "impurity": float(tree.impurity[node]),
+            "n_samples": float(tree.n_samples[node]),
+        }
+        if tree.feature[node] != LEAF:
+            entry["feature"] = int(tree.feature[node])
+            if tree.is_categorical[node]:
+                entry["categories"] = tree.categories(node).tolist()
+            else:
+                threshold = float(tree.threshold[node])
+                entry["threshold"] = threshold if math.isfinite(threshold) else None
+            entry["left"] = int(tree.left[node])
+            entry["right"] = int(tree.right[node])
+            entry["missing_left"] = bool(tree.missing_left[node])
+        nodes.append(entry)
+    document = {
+        "format_version": FORMAT_VERSION,
+        "params": _params(model),
+        "n_features": model.n_features_,
+        "classes": (
+            model.classes_.tolist() if model.criterion_.is_classifier else None
+        ),
+        "nodes": nodes,
+    }
+    return json.dumps(document, indent=indent, allow_nan=False)
+
+
+def _threshold(node: Dict[str, Any]) -> float:
+    # Leaves and categorical nodes carry no threshold; null is +inf
+    if "threshold" not in node:
+        return np.nan
+    return np.inf if node["threshold"] is None else node["threshold"]
+
+
+def from_json(text: str) -> DecisionTree:
+    """Rebuild a tree exported by `to_json`."""
+    document = json.loads(text)
+    if document.get("format_version") != FORMAT_VERSION:
+        raise ValueError(
+            f"Unsupported model format version {document.get('format_version')}."
+        )
+    nodes = document["nodes"]
+    tree = TreeArrays(
+        feature=np.array([n.get("feature", LEAF) for n in nodes], dtype=np.int32),
+        threshold=np.array([_threshold(n) for n in nodes], dtype=np.float64),
+        left=np.array([n.get("left", LEAF) for n in nodes], dtype=np.int32),
+        right=np.array([n.get("right", LEAF) for n in nodes], dtype=np.int32),
+        value=np.array([n["value"] for n in nodes], dtype=np.float64),
+        impurity=np.array([n["impurity"] for n in nodes], dtype=np.float64),
+        n_samples=np.array([n["n_samples"] for n in nodes], dtype=np.float64),
+        missing_left=np.array(
+            [n.get("missing_left", False) for n in nodes], dtype=bool
+        ),
+        is_categorical=np.array(["categories" in n for n in nodes], dtype=bool),
+        category_bits=np.array(
+            [_category_bits(n.get("categories", [])) for n in nodes], dtype=np.uint64
+        ),
+    )
+    return _restore(
+        document["params"], document["n_features"], document["classes"], tree
+    )
+
+
+def _literal(value: float) -> str:
+    return repr(float(value)) if math.isfinite(value) else 'float("inf")'
+
+
+def export_python(model: DecisionTree, name: str = "predict_one") -> str:
+    """Source of a function ``name(x)`` predicting one row with nested ifs.
+
+    ``x`` is any sequence of feature values (a list is fastest). The
+    function returns the class label, or the mean for regression, with no
+    loops or array operations, so scoring a row costs a handful of
+    comparisons. Missing values (NaN) and categorical splits route exactly
+    as in `TreeArrays.descend`.
+    """
+    _check_fitted(model)
+    tree = model.tree_
+    if tree.node_depth().max() > MAX_CODEGEN_DEPTH:
+        raise ValueError(
+            f"Trees deeper than {MAX_CODEGEN_DEPTH} levels cannot be exported "
+            "as Python code."
+        )
+    lines = [f"def {name}(x):"]
+    # (node, indentation depth), or a ready "else:" line
+    stack: List[Any] = [(0, 1)]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, str):
+            lines.append(item)
+            continue
+        node, depth = item
+        indent = "    " * depth
+        if tree.feature[node] == LEAF:
+            prediction = model._predict_value(tree.value[node])
+            lines.append(f"{indent}return {prediction.item()!r}")
+            continue
+        x = f"x[{tree.feature[node]}]"
+        if tree.is_categorical[node]:
+            categories = ", ".join(str(c) for c in tree.categories(node))
+            test = f"{x} in {{{categories}}}"
+            if tree.missing_left[node]:
+                test += f" or {x} != {x}"
+        elif tree.missing_left[node]:
+            # NaN fails every comparison, so "not >" also holds for NaN
+            test = f"not {x} > {_literal(tree.threshold[node])}"
+        else:
+            test = f"{x} <= {_literal(tree.threshold[node])}"
+        lines.append(f"{indent}if {test}:")
+        stack += [
+            (tree.right[node], depth + 1),
+            f"{indent}else:",
+            (tree.left[node], depth + 1),
+        ]
+    return "\n".join(lines) + "\n"
+
+
+def compile_predictor(
+    model: DecisionTree, name: str = "predict_one"
+) -> Callable[[Sequence[float]], Any]:
+    """Compile `export_python` into a single-row prediction function."""
+    namespace: Dict[str, Any] = {}
+    exec(compile(export_python(model, name), f"<{name}>", "exec"), namespace)
+    return namespace[name]
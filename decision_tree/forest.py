@@ -0,0 +1,225 @@
+import contextlib
+import functools
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import fields
+from multiprocessing.shared_memory import SharedMemory
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from .binning import MAX_BINS, bin_features, categorical_mask, compute_bin_edges
+from .criteria import CRITERIA
+from .tree import DecisionTree, TreeArrays
+
+# name -> (shared memory block, shape, dtype, order)
+_ArraySpec = Tuple[str, Tuple[int, ...], str, str]
+
+# Training data of the current pool worker, attached by `_attach`
+_worker_data: Dict[str, object] = {}
+_worker_blocks: List[SharedMemory] = []
+
+
+@contextlib.contextmanager
+def _shared_arrays(arrays: Dict[str, np.ndarray]) -> Iterator[Dict[str, _ArraySpec]]:
+    """Copy ``arrays`` into shared memory blocks, unlinked on exit.
+
+    Yields picklable specs that `_attach` turns back into array views.
+    """
+    blocks, specs = [], {}
+    try:
+        for name, arr in arrays.items():
+            order = (
+                "F" if arr.flags.f_contiguous and not arr.flags.c_contiguous else "C"
+            )
+            block = SharedMemory(create=True, size=max(arr.nbytes, 1))
+            blocks.append(block)
+            view = np.ndarray(arr.shape, arr.dtype, buffer=block.buf, order=order)
+            view[...] = arr
+            specs[name] = (block.name, arr.shape, arr.dtype.str, order)
+        yield specs
+    finally:
+        for block in blocks:
+            block.close()
+            block.unlink()
+
+
+def _attach(specs: Dict[str, _ArraySpec], objects: Dict[str, object]) -> None:
+    """Pool initializer: map the shared training arrays into this worker."""
+    for name, (block_name, shape, dtype, order) in specs.items():
+        block = SharedMemory(name=block_name)
+        _worker_blocks.append(block)
+        _worker_data[name] = np.ndarray(shape, dtype, buffer=block.buf, order=order)
+    _worker_data.update(objects)
+
+
+def _fit_tree(
+    params: dict,
+    seed: np.random.SeedSequence,
+    bootstrap: bool,
+    data: Optional[Dict[str, object]] = None,
+) -> TreeArrays:
+    """Grow one forest member (runs inside pool workers).
+
+    The bootstrap sample is drawn as per-row counts and passed as sample
+    weights, so the shared training matrix is never sliced or copied.
+    """
+    data = _worker_data if data is None else data
+    y = data["y"]
+    bootstrap_seed, tree_seed = seed.spawn(2)
+    weight = None
+    if bootstrap:
+        n_samples = y.shape[0]
+        draws = np.random.default_rng(bootstrap_seed).integers(0, n_samples, n_samples)
+        weight = np.bincount(draws, minlength=n_samples)
+    tree = DecisionTree(**params, random_state=tree_seed)
+    if "X_binned" in data:
+        tree.fit_binned(data["X_binned"], data["bin_edges"], y, weight)
+    else:
+        tree.fit(data["X"], y, weight)
+    return tree.tree_
+
+
+def _stack_trees(trees: List[TreeArrays]) -> Tuple[TreeArrays, np.ndarray]:
+    """Concatenate trees into one set of node arrays; return it and the roots."""
+    sizes = np.array([tree.n_nodes for tree in trees])
+    roots = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+
+    def children(name: str) -> np.ndarray:
+        # Shift child indices by each tree's offset; leaves stay LEAF
+        return np.concatenate(
+            [
+                np.where(getattr(tree, name) >= 0, getattr(tree, name) + root, -1)
+                for tree, root in zip(trees, roots)
+            ]
+        ).astype(np.int32)
+
+    forest = TreeArrays(
+        **{
+            field.name: (
+                children(field.name)
+                if field.name in ("left", "right")
+                else np.concatenate([getattr(tree, field.name) for tree in trees])
+            )
+            for field in fields(TreeArrays)
+        }
+    )
+    return forest, roots.astype(np.intp)
+
+
+class RandomForest:
+    """
+    Bagged ensemble of `DecisionTree`s with per-split feature subsampling.
+
+    Every tree gets its own child of ``np.random.SeedSequence(random_state)``
+    for its bootstrap sample and feature draws, so a forest depends only on
+    ``random_state``, never on ``n_jobs`` or scheduling order.
+
+    With ``n_jobs > 1`` trees are grown in a process pool. The training
+    matrix (or, for ``splitter="hist"``, the ``uint8`` bin codes, computed
+    once for all trees) is placed in shared memory and mapped by every
+    worker instead of being pickled to each of them.
+
+    All trees are stored in one set of node arrays and walked together, so
+    prediction is vectorized across rows and trees. ``batch_size`` rows are
+    scored at a time, bounding memory by ``batch_size * n_estimators`` pairs.
+
+    NaNs and ``categorical_features`` are handled natively, as in `DecisionTree`.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        n_estimators: int = 100,
+        max_depth: int = 10,
+        min_samples_split: int = 2,
+        *,
+        max_features: Optional[Union[int, float, str]] = "sqrt",
+        bootstrap: bool = True,
+        splitter: str = "best",
+        max_bins: int = MAX_BINS,
+        criterion: str = "gini",
+        n_jobs: Optional[int] = None,
+        random_state: Optional[int] = None,
+        batch_size: int = 4096,
+        categorical_features: Optional[Sequence[int]] = None,
+    ):
+        self.n_estimators = n_estimators
+        self.max_depth = max_depth
+        self.min_samples_split = min_samples_split
+        self.max_features = max_features
+        self.bootstrap = bootstrap
+        self.splitter = splitter
+        self.max_bins = max_bins
+        self.criterion = criterion
+        self.n_jobs = n_jobs
+        self.random_state = random_state
+        self.batch_size = batch_size
+        self.categorical_features = categorical_features
+        self.trees_: List[TreeArrays] = []
+
+    def fit(self, X: np.ndarray, y: np.ndarray) -> "RandomForest":
+        if self.criterion not in CRITERIA:
+            raise ValueError(f"Unknown criterion {self.criterion!r}.")
+        self.is_classifier_ = CRITERIA[self.criterion].is_classifier
+        if self.is_classifier_:
+            # Trees see codes 0..n_classes-1, so every tree has every class
+            self.classes_, y = np.unique(y, return_inverse=True)
+        else:
+            y = np.asarray(y, dtype=np.float64)
+
+        data: Dict[str, np.ndarray] = {"y": y}
+        objects: Dict[str, object] = {}
+        if self.splitter == "hist":
+            categorical = categorical_mask(self.categorical_features, X.shape[1])
+            objects["bin_edges"] = compute_bin_edges(X, self.max_bins, categorical)
+            data["X_binned"] = bin_features(X, objects["bin_edges"])
+        elif self.splitter == "best":
+            data["X"] = np.asarray(X, dtype=np.float64)
+        else:
+            raise ValueError(f"Unknown splitter {self.splitter!r}.")
+
+        params = {
+            "max_depth": self.max_depth,
+            "min_samples_split": self.min_samples_split,
+            "splitter": self.splitter,
+            "max_bins": self.max_bins,
+            "criterion": self.criterion,
+            "max_features": self.max_features,
+            "categorical_features": self.categorical_features,
+        }
+        seeds = np.random.SeedSequence(self.random_state).spawn(self.n_estimators)
+        fit_tree = functools.partial(_fit_tree, params, bootstrap=self.bootstrap)
+        if self.n_jobs is None or self.n_jobs <= 1:
+            self.trees_ = [fit_tree(seed, data={**data, **objects}) for seed in seeds]
+        else:
+            with _shared_arrays(data) as specs, ProcessPoolExecutor(
+                max_workers=self.n_jobs, initializer=_attach, initargs=(specs, objects)
+            ) as pool:
+                self.trees_ = list(pool.map(fit_tree, seeds))
+        self.forest_, self.roots_ = _stack_trees(self.trees_)
+        return self
+
+    def _mean_value(self, X: np.ndarray) -> np.ndarray:
+        """Node value averaged over all trees, one row per sample."""
+        n_samples, n_trees = X.shape[0], self.roots_.size
+        out = np.empty((n_samples, self.forest_.value.shape[1]))
+        for start in range(0, n_samples, self.batch_size):
+            batch = X[start : start + self.batch_size]
+            size = batch.shape[0]
+            rows = np.tile(np.arange(size), n_trees)
+            node = np.repeat(self.roots_, size)
+            leaves = self.forest_.descend(batch, rows, node)
+            values = self.forest_.value[leaves].reshape(n_trees, size, -1)
+            out[start : start + size] = values.mean(axis=0)
+        return out
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        value = self._mean_value(X)
+        if self.is_classifier_:
+            return self.classes_[np.argmax(value, axis=1)]
+        return value[:, 0]
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        """Tree-averaged class proportions, columns in `classes_`."""
+        if not self.is_classifier_:
+            raise ValueError("predict_proba needs a classification criterion.")
+        return self._mean_value(X)
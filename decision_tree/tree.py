@@ -1,114 +1,968 @@
-from typing import Optional, Tuple
+import contextlib
+import copy
+import heapq
+import itertools
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, fields
+from typing import (
+    Any,
+    Callable,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
 
 import numpy as np
 
+from .binning import MAX_BINS, bin_features, categorical_mask, compute_bin_edges
+from .criteria import CRITERIA, Criterion
 
-class Node:
-    def __init__(
+LEAF = -1
+
+# Categorical splits store their left categories as a bitset of this many
+# uint64 words per node, so category codes must be below MAX_CATEGORIES
+CATEGORY_WORDS = 4
+MAX_CATEGORIES = 64 * CATEGORY_WORDS
+
+# Nodes smaller than this search their features serially even with n_jobs
+PARALLEL_MIN_SAMPLES = 4096
+
+
+def _in_category_set(bits: np.ndarray, x: np.ndarray) -> np.ndarray:
+    """Whether category ``x[i]`` is set in bitset row ``bits[i]``."""
+    valid = (x >= 0) & (x < MAX_CATEGORIES)
+    code = np.where(valid, x, 0).astype(np.intp)
+    word = bits[np.arange(code.size), code >> 6]
+    return valid & ((word >> (code & 63).astype(np.uint64)) & np.uint64(1) == 1)
+
+
+def _category_bits(categories: np.ndarray) -> np.ndarray:
+    """Bitset row with the given category codes set."""
+    bits = np.zeros(CATEGORY_WORDS, dtype=np.uint64)
+    codes = np.asarray(categories, dtype=np.intp)
+    np.bitwise_or.at(bits, codes >> 6, np.uint64(1) << (codes & 63).astype(np.uint64))
+    return bits
+
+
+def _check_categories(values: np.ndarray) -> None:
+    values = values[~np.isnan(values)]
+    if np.any((values < 0) | (values >= MAX_CATEGORIES) | (values % 1 != 0)):
+        raise ValueError(
+            f"Categorical features must hold integer codes in [0, {MAX_CATEGORIES}) "
+            "or NaN."
+        )
+
+
+@dataclass
+class TreeArrays:
+    """A fitted tree as parallel per-node arrays; node 0 is the root.
+
+    Internal nodes send ``x[feature] <= threshold`` to ``left`` and the rest
+    to ``right``. Categorical nodes (``is_categorical``) instead send the
+    categories set in their row of ``category_bits`` left (code ``c`` is bit
+    ``c % 64`` of word ``c // 64``); unseen categories go right. Missing
+    values (NaN) go left where ``missing_left`` is set, else right.
+    Leaves have ``feature == left == right == LEAF``. Row
+    ``value[node]`` is the prediction vector of every node, internal nodes
+    included: class proportions for classifiers, ``[mean]`` for regression.
+    ``impurity`` and ``n_samples`` (weighted) describe each node's training
+    samples. Children are always stored after their parent.
+    """
+
+    feature: np.ndarray
+    threshold: np.ndarray
+    left: np.ndarray
+    right: np.ndarray
+    value: np.ndarray
+    impurity: np.ndarray
+    n_samples: np.ndarray
+    missing_left: np.ndarray
+    is_categorical: np.ndarray
+    category_bits: np.ndarray
+
+    @property
+    def n_nodes(self) -> int:
+        return self.feature.size
+
+    def apply(self, X: np.ndarray) -> np.ndarray:
+        """Leaf index reached by every row of ``X``.
+
+        All rows descend together, one tree level per iteration, so the
+        Python loop runs ``depth`` times rather than once per row.
+        """
+        return self.descend(X, None, np.zeros(X.shape[0], dtype=np.intp))
+
+    def descend(
+        self, X: np.ndarray, rows: Optional[np.ndarray], node: np.ndarray
+    ) -> np.ndarray:
+        """Move each ``(X[rows[i]], node[i])`` pair down to a leaf.
+
+        ``rows=None`` pairs ``node[i]`` with ``X[i]``. Starting nodes need not
+        be roots, which lets several trees stored in one set of arrays be
+        walked in the same level-by-level loop. ``node`` is updated in place
+        and returned.
+        """
+        if rows is None:
+            rows = np.arange(node.size)
+        has_categorical = self.is_categorical.any()
+        active = np.flatnonzero(self.feature[node] != LEAF)
+        while active.size:
+            current = node[active]
+            x = X[rows[active], self.feature[current]]
+            go_left = x <= self.threshold[current]
+            if has_categorical:
+                categorical = self.is_categorical[current]
+                go_left[categorical] = _in_category_set(
+                    self.category_bits[current[categorical]], x[categorical]
+                )
+            missing = np.isnan(x)
+            if missing.any():
+                go_left[missing] = self.missing_left[current[missing]]
+            node[active] = np.where(go_left, self.left[current], self.right[current])
+            active = active[self.feature[node[active]] != LEAF]
+        return node
+
+    def categories(self, node: int) -> np.ndarray:
+        """Category codes a categorical node sends left."""
+        codes = np.arange(MAX_CATEGORIES)
+        bits = np.broadcast_to(self.category_bits[node], (codes.size, CATEGORY_WORDS))
+        return codes[_in_category_set(bits, codes)]
+
+    def node_depth(self) -> np.ndarray:
+        """Depth of every node; the root has depth 0."""
+        depth = np.zeros(self.n_nodes, dtype=np.intp)
+        for node in np.flatnonzero(self.feature != LEAF):
+            depth[[self.left[node], self.right[node]]] = depth[node] + 1
+        return depth
+
+    def subtree(self, keep_split: np.ndarray) -> "TreeArrays":
+        """Copy in which only internal nodes with ``keep_split`` still split.
+
+        Other nodes become leaves and their descendants are dropped; the
+        remaining nodes are renumbered in pre-order.
+        """
+        is_split = keep_split & (self.feature != LEAF)
+        kept, stack = [], [0]
+        while stack:
+            node = stack.pop()
+            kept.append(node)
+            if is_split[node]:
+                stack += [self.right[node], self.left[node]]
+        kept = np.array(kept)
+        new_id = np.full(self.n_nodes, LEAF, dtype=np.int32)
+        new_id[kept] = np.arange(kept.size)
+        split = is_split[kept]
+        arrays = {field.name: getattr(self, field.name)[kept] for field in fields(self)}
+        arrays.update(
+            feature=np.where(split, arrays["feature"], LEAF).astype(np.int32),
+            threshold=np.where(split, arrays["threshold"], np.nan),
+            left=np.where(split, new_id[arrays["left"]], LEAF).astype(np.int32),
+            right=np.where(split, new_id[arrays["right"]], LEAF).astype(np.int32),
+            missing_left=arrays["missing_left"] & split,
+            is_categorical=arrays["is_categorical"] & split,
+            category_bits=np.where(
+                split[:, None], arrays["category_bits"], np.uint64(0)
+            ),
+        )
+        return TreeArrays(**arrays)
+
+
+class _TreeBuilder:
+    """Accumulates nodes, parents before children, while a tree is grown."""
+
+    def __init__(self) -> None:
+        self.feature: List[int] = []
+        self.threshold: List[float] = []
+        self.left: List[int] = []
+        self.right: List[int] = []
+        self.value: List[np.ndarray] = []
+        self.impurity: List[float] = []
+        self.n_samples: List[float] = []
+        self.missing_left: List[bool] = []
+        self.category_bits: List[Optional[np.ndarray]] = []
+
+    def add_node(self, value: np.ndarray, impurity: float, n_samples: float) -> int:
+        """Append a leaf predicting ``value``; return its index."""
+        self.feature.append(LEAF)
+        self.threshold.append(np.nan)
+        self.left.append(LEAF)
+        self.right.append(LEAF)
+        self.value.append(value)
+        self.impurity.append(impurity)
+        self.n_samples.append(n_samples)
+        self.missing_left.append(False)
+        self.category_bits.append(None)
+        return len(self.value) - 1
+
+    def set_split(  # noqa: PLR0913
         self,
-        feature: Optional[int] = None,
-        threshold: Optional[float] = None,
-        left: Optional["Node"] = None,
-        right: Optional["Node"] = None,
+        node: int,
+        feature: int,
+        threshold: float,
+        left: int,
+        right: int,
         *,
-        label: Optional[int] = None,
-    ):
-        self.feature = feature
-        self.threshold = threshold
-        self.left = left
-        self.right = right
-        self.label = label
+        missing_left: bool = False,
+        categories: Optional[np.ndarray] = None,
+    ) -> None:
+        """Turn leaf ``node`` into an internal node.
+
+        With ``categories`` (the codes sent left) the split is categorical.
+        """
+        self.feature[node] = feature
+        self.threshold[node] = threshold
+        self.left[node] = left
+        self.right[node] = right
+        self.missing_left[node] = missing_left
+        if categories is not None:
+            self.category_bits[node] = _category_bits(categories)
 
-    def is_leaf(self) -> bool:
-        return self.label is not None
+    def build(self) -> TreeArrays:
+        category_bits = np.zeros((len(self.feature), CATEGORY_WORDS), dtype=np.uint64)
+        for node, bits in enumerate(self.category_bits):
+            if bits is not None:
+                category_bits[node] = bits
+        return TreeArrays(
+            feature=np.array(self.feature, dtype=np.int32),
+            threshold=np.array(self.threshold, dtype=np.float64),
+            left=np.array(self.left, dtype=np.int32),
+            right=np.array(self.right, dtype=np.int32),
+            value=np.array(self.value, dtype=np.float64),
+            impurity=np.array(self.impurity, dtype=np.float64),
+            n_samples=np.array(self.n_samples, dtype=np.float64),
+            missing_left=np.array(self.missing_left, dtype=bool),
+            is_categorical=np.array(
+                [bits is not None for bits in self.category_bits], dtype=bool
+            ),
+            category_bits=category_bits,
+        )
+
+
+class _Split(NamedTuple):
+    """A node's best split; ``threshold`` is a bin for the histogram splitter.
+
+    Categorical splits have ``categories`` (codes, or bins, sent left) and a
+    NaN threshold.
+    """
+
+    feature: int
+    threshold: Any
+    gain: float
+    missing_left: bool = False
+    categories: Optional[np.ndarray] = None
 
 
 class DecisionTree:
     """
-    Simple CART-style binary decision tree (no pruning yet).
+    Simple CART-style binary decision tree.
+
+    ``criterion`` picks the impurity engine from `criteria.CRITERIA`:
+    ``"gini"`` or ``"entropy"`` for classification with any number of
+    classes, ``"mse"`` for regression. Nodes store class proportions
+    (see `predict_proba`) or the target mean.
+
+    ``splitter="best"`` searches every distinct value of every feature.
+    ``splitter="hist"`` first buckets each feature into at most ``max_bins``
+    quantile bins (a ``uint8`` matrix) and searches bin boundaries using
+    per-node histograms, which is much faster and lighter on large data.
+
+    ``max_features`` (an int, a fraction, ``"sqrt"`` or ``"log2"``) searches
+    only a random subset of the features at each split, drawn from
+    ``random_state``; the default searches all of them.
+
+    Growth never copies ``X``: the exact splitter sorts every feature once
+    at the root and hands each child the stable partition of its parent's
+    per-feature row orders, and the histogram splitter works on row indices
+    into the binned matrix. With ``n_jobs > 1`` the per-feature work of
+    large nodes (split search, histograms, the root sort) runs on a thread
+    pool; NumPy releases the GIL in these kernels, so threads share ``X``.
+
+    Growth stops at ``max_depth``, below ``min_samples_split`` samples, and
+    at splits whose weighted impurity decrease ``n_node / n * gain`` is
+    under ``min_impurity_decrease``. With ``max_leaf_nodes`` the tree grows
+    best-first, always splitting the leaf with the largest weighted
+    decrease, until it has that many leaves. ``ccp_alpha > 0`` applies
+    minimal cost-complexity pruning after growth; `cost_complexity_pruning_path`,
+    `prune` and `truncate` derive smaller trees from one fit without refitting.
+
+    Missing values (NaN) need no imputation: split search scores sending a
+    node's NaN rows left and right and keeps the better side as the split's
+    default direction (with no NaNs at a node, they go to the larger child).
+    Columns listed in ``categorical_features`` (indices or a boolean mask)
+    hold integer category codes in ``[0, 256)`` and are split into category
+    sets instead: categories are sorted by a target statistic (the mean, or
+    the share of the node's majority class) and the best prefix of that
+    order goes left, so no one-hot encoding is needed.
     """
 
-    def __init__(self, max_depth: int = 3, min_samples_split: int = 2):
+    def __init__(  # noqa: PLR0913
+        self,
+        max_depth: Optional[int] = 3,
+        min_samples_split: int = 2,
+        splitter: str = "best",
+        max_bins: int = MAX_BINS,
+        *,
+        criterion: str = "gini",
+        max_features: Optional[Union[int, float, str]] = None,
+        random_state: Optional[Union[int, np.random.SeedSequence]] = None,
+        n_jobs: Optional[int] = None,
+        min_impurity_decrease: float = 0.0,
+        max_leaf_nodes: Optional[int] = None,
+        ccp_alpha: float = 0.0,
+        categorical_features: Optional[Sequence[int]] = None,
+    ):
         self.max_depth = max_depth
         self.min_samples_split = min_samples_split
-        self.root: Optional[Node] = None
+        self.splitter = splitter
+        self.max_bins = max_bins
+        self.criterion = criterion
+        self.max_features = max_features
+        self.random_state = random_state
+        self.n_jobs = n_jobs
+        self.min_impurity_decrease = min_impurity_decrease
+        self.max_leaf_nodes = max_leaf_nodes
+        self.ccp_alpha = ccp_alpha
+        self.categorical_features = categorical_features
+        self.tree_: Optional[TreeArrays] = None
+        self._pool: Optional[ThreadPoolExecutor] = None
+
+    def fit(
+        self,
+        X: np.ndarray,
+        y: np.ndarray,
+        sample_weight: Optional[np.ndarray] = None,
+    ) -> "DecisionTree":
+        """Grow the tree on ``X, y``.
 
-    def fit(self, X: np.ndarray, y: np.ndarray) -> "DecisionTree":
-        self.root = self._grow(X, y, depth=0)
+        ``sample_weight`` multiplies each row's statistics, so integer
+        weights act like repeated rows (e.g. bootstrap counts) and rows
+        with weight 0 are left out. ``min_samples_split`` then applies to
+        the weighted sample count.
+        """
+        if self.splitter == "hist":
+            categorical = categorical_mask(self.categorical_features, X.shape[1])
+            edges = compute_bin_edges(X, self.max_bins, categorical)
+            return self.fit_binned(bin_features(X, edges), edges, y, sample_weight)
+        if self.splitter != "best":
+            raise ValueError(f"Unknown splitter {self.splitter!r}.")
+        stats = self._init_fit(X.shape[1], y, sample_weight)
+        for feat in np.flatnonzero(self.categorical_):
+            _check_categories(X[:, feat])
+        if sample_weight is None:
+            rows = np.arange(stats.shape[0])
+        else:
+            rows = np.flatnonzero(sample_weight)
+        with self._feature_pool():
+            self._grow(X, stats, self._presort(X, rows))
         return self
 
+    def fit_binned(
+        self,
+        X_binned: np.ndarray,
+        bin_edges: List[np.ndarray],
+        y: np.ndarray,
+        sample_weight: Optional[np.ndarray] = None,
+    ) -> "DecisionTree":
+        """Grow a histogram tree on codes from `binning.bin_features`.
+
+        Lets callers bin a dataset once and fit many trees on it. Rows are
+        selected through ``sample_weight`` (see `fit`) rather than by
+        slicing, so ``X_binned`` is never copied. ``bin_edges`` must flag the
+        same ``categorical_features`` as this tree.
+        """
+        stats = self._init_fit(X_binned.shape[1], y, sample_weight)
+        for feat in np.flatnonzero(self.categorical_):
+            _check_categories(bin_edges[feat])
+        self.bin_edges_ = bin_edges
+        self._n_edges = np.array([feat_edges.size for feat_edges in bin_edges])
+        if sample_weight is None:
+            idx = np.arange(stats.shape[0])
+        else:
+            idx = np.flatnonzero(sample_weight)
+        with self._feature_pool():
+            self._grow(X_binned, stats, (idx, self._histogram(X_binned, stats, idx)))
+        return self
+
+    @contextlib.contextmanager
+    def _feature_pool(self) -> Iterator[None]:
+        """Provide the thread pool of `_map_features` for one fit."""
+        if self.n_jobs is None or self.n_jobs <= 1:
+            yield
+            return
+        with ThreadPoolExecutor(max_workers=self.n_jobs) as pool:
+            self._pool = pool
+            try:
+                yield
+            finally:
+                self._pool = None
+
+    def _map_features(
+        self, func: Callable, features: Iterable[int], n_samples: int
+    ) -> List:
+        """``[func(feat) for feat in features]``, threaded for large nodes."""
+        if self._pool is None or n_samples < PARALLEL_MIN_SAMPLES:
+            return [func(feat) for feat in features]
+        return list(self._pool.map(func, features))
+
+    def _presort(self, X: np.ndarray, rows: np.ndarray) -> np.ndarray:
+        """Per-feature orders of ``rows``: ``order[f]`` sorts ``X[rows, f]``.
+
+        Stored as ``int32`` when possible, halving the largest fit-time array.
+        """
+        dtype = np.int32 if X.shape[0] < np.iinfo(np.int32).max else np.intp
+        order = np.empty((X.shape[1], rows.size), dtype=dtype)
+
+        def sort(feat: int) -> None:
+            order[feat] = rows[np.argsort(X[rows, feat], kind="stable")]
+
+        self._map_features(sort, range(X.shape[1]), rows.size)
+        return order
+
+    def _init_fit(
+        self, n_features: int, y: np.ndarray, sample_weight: Optional[np.ndarray]
+    ) -> np.ndarray:
+        """Reset fitted state and return the (weighted) per-sample statistics."""
+        if self.criterion not in CRITERIA:
+            raise ValueError(f"Unknown criterion {self.criterion!r}.")
+        if self.max_leaf_nodes is not None and self.max_leaf_nodes < 2:  # noqa: PLR2004
+            raise ValueError("max_leaf_nodes must be at least 2.")
+        self.criterion_: Criterion = CRITERIA[self.criterion]()
+        self.n_features_ = n_features
+        self.n_split_features_ = self._resolve_max_features(n_features)
+        self.categorical_ = categorical_mask(self.categorical_features, n_features)
+        self._rng = np.random.default_rng(self.random_state)
+        if self.criterion_.is_classifier:
+            self.classes_, y = np.unique(y, return_inverse=True)
+            stats = self.criterion_.sample_stats(y, self.classes_.size)
+        else:
+            stats = self.criterion_.sample_stats(y, 0)
+        if sample_weight is not None:
+            stats = stats * np.asarray(sample_weight, dtype=float)[:, None]
+        return stats
+
+    def _resolve_max_features(self, n_features: int) -> int:
+        max_features = self.max_features
+        if max_features is None:
+            return n_features
+        if max_features == "sqrt":
+            return max(1, int(np.sqrt(n_features)))
+        if max_features == "log2":
+            return max(1, int(np.log2(n_features)))
+        if isinstance(max_features, (int, np.integer)) and max_features >= 1:
+            return min(int(max_features), n_features)
+        if isinstance(max_features, float) and 0.0 < max_features <= 1.0:
+            return max(1, int(max_features * n_features))
+        raise ValueError(f"Invalid max_features {max_features!r}.")
+
+    def _split_features(self) -> np.ndarray:
+        """Sorted features to search at the next split."""
+        if self.n_split_features_ == self.n_features_:
+            return np.arange(self.n_features_)
+        return np.sort(
+            self._rng.choice(self.n_features_, self.n_split_features_, replace=False)
+        )
+
     def predict(self, X: np.ndarray) -> np.ndarray:
-        return np.array([self._predict_row(row, self.root) for row in X])
-
-    def _gini(self, y: np.ndarray) -> float:
-        if y.size == 0:
-            return 0.0
-        p1 = (y == 1).mean()
-        return 1.0 - (p1**2 + (1 - p1) ** 2)
-
-    def _best_split(self, X: np.ndarray, y: np.ndarray) -> Tuple[int, float, float]:
-        best_gain, best_feat, best_thresh = -1, -1, -1.0
-        parent_gini = self._gini(y)
-        n_samples = y.size
-        for feat in range(X.shape[1]):
-            thresholds = np.unique(X[:, feat])
-            for t in thresholds:
-                left_idx = X[:, feat] <= t
-                right_idx = ~left_idx
-                if (
-                    left_idx.sum() < self.min_samples_split
-                    or right_idx.sum() < self.min_samples_split
-                ):
-                    continue
-                g_left = self._gini(y[left_idx])
-                g_right = self._gini(y[right_idx])
-                gain = (
-                    parent_gini
-                    - (left_idx.sum() / n_samples) * g_left
-                    - (right_idx.sum() / n_samples) * g_right
+        return self._predict_value(self.tree_.value[self.tree_.apply(X)])
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        """Class proportions of the leaf each row lands in, columns in `classes_`."""
+        if not self.criterion_.is_classifier:
+            raise ValueError("predict_proba needs a classification criterion.")
+        return self.tree_.value[self.tree_.apply(X)]
+
+    def _predict_value(self, value: np.ndarray) -> np.ndarray:
+        """Map node value rows to predictions: majority class or mean."""
+        if self.criterion_.is_classifier:
+            # argmax takes the lowest class on ties, like rounding a 0.5 mean down
+            return self.classes_[np.argmax(value, axis=-1)]
+        return value[..., 0]
+
+    def _impurity(self, stats: np.ndarray) -> float:
+        """Impurity of the node formed by per-sample ``stats`` rows."""
+        return float(self.criterion_.impurity(stats.sum(axis=0)))
+
+    def _split_gain(
+        self, parent: np.ndarray, left: np.ndarray, parent_impurity: float
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Impurity decrease of splitting ``parent`` stats into ``left`` / rest.
+
+        ``left`` may hold any number of candidate splits (leading axes).
+        Returns ``(gain, n_left, n_right)``.
+        """
+        crit = self.criterion_
+        right = parent - left
+        n_samples = crit.count(parent)
+        n_left, n_right = crit.count(left), crit.count(right)
+        gain = (
+            parent_impurity
+            - (n_left / n_samples) * crit.impurity(left)
+            - (n_right / n_samples) * crit.impurity(right)
+        )
+        return gain, n_left, n_right
+
+    def _best_candidate(
+        self,
+        parent: np.ndarray,
+        left: np.ndarray,
+        missing: Optional[np.ndarray],
+        parent_impurity: float,
+    ) -> Tuple[float, int, bool]:
+        """Best of the candidate ``left`` statistics of a node.
+
+        ``missing`` holds the statistics of the node's rows with a missing
+        value, if any; each candidate is then scored with them sent right
+        and, added to ``left``, sent left. Returns ``(gain, candidate,
+        missing_left)``, with gain -1.0 if no candidate is valid. Ties go to
+        sending missing values right, then to the lowest candidate.
+        """
+        options = left[None] if missing is None else np.stack([left, left + missing])
+        gain, n_left, n_right = self._split_gain(parent, options, parent_impurity)
+        valid = (n_left >= self.min_samples_split) & (n_right >= self.min_samples_split)
+        if not valid.any():
+            return -1.0, -1, False
+        gain = np.where(valid, gain, -np.inf)
+        side, best = np.unravel_index(np.argmax(gain), gain.shape)
+        return float(gain[side, best]), int(best), bool(side)
+
+    def _categorical_split(
+        self,
+        cat_stats: np.ndarray,
+        parent: np.ndarray,
+        missing: Optional[np.ndarray],
+        parent_impurity: float,
+    ) -> Tuple[float, Optional[np.ndarray], bool]:
+        """Best left set of the categories whose statistics are ``cat_stats`` rows.
+
+        The node's categories are sorted by `Criterion.category_order` and
+        each prefix of that order is a candidate, so k categories cost k
+        candidates rather than 2**k. Returns ``(gain, categories,
+        missing_left)`` with the sorted row indices sent left, or
+        ``(-1.0, None, False)``.
+        """
+        crit = self.criterion_
+        present = np.flatnonzero(crit.count(cat_stats) > 0)
+        key = crit.category_order(cat_stats[present], parent)
+        ranked = present[np.argsort(key, kind="stable")]
+        left = np.cumsum(cat_stats[ranked], axis=0)
+        gain, best, missing_left = self._best_candidate(
+            parent, left, missing, parent_impurity
+        )
+        if best < 0:
+            return -1.0, None, False
+        return gain, np.sort(ranked[: best + 1]), missing_left
+
+    def _best_split(
+        self, X: np.ndarray, stats: np.ndarray, order: np.ndarray
+    ) -> _Split:
+        """Best split of a node by impurity decrease, or ``_Split(-1, -1.0, -1)``.
+
+        ``order[f]`` holds the node's rows sorted by feature ``f`` (see
+        `_presort`), NaNs last. Every distinct value is a candidate
+        ``x <= t`` threshold, and cumulative sums of the per-sample
+        statistics give the impurity of all of them in one vectorized pass
+        per feature; categorical features sum their statistics per category
+        instead (see `_categorical_split`). Ties go to the lowest feature,
+        then the lowest threshold.
+        """
+        best = _Split(-1, -1.0, -1)
+        parent = stats[order[0]].sum(axis=0)
+        parent_impurity = self.criterion_.impurity(parent)
+
+        def search(feat: int) -> _Split:
+            rows = order[feat]
+            xs = X[rows, feat]
+            n_valid = int(np.searchsorted(xs, np.nan))
+            missing = None
+            if n_valid < rows.size:
+                missing = stats[rows[n_valid:]].sum(axis=0)
+            if n_valid == 0:
+                return _Split(feat, -1.0, -1.0)
+            xs, node_stats = xs[:n_valid], stats[rows[:n_valid]]
+            if self.categorical_[feat]:
+                codes = xs.astype(np.intp)
+                cat_stats = np.column_stack(
+                    [np.bincount(codes, weights=col) for col in node_stats.T]
+                )
+                gain, categories, missing_left = self._categorical_split(
+                    cat_stats, parent, missing, parent_impurity
                 )
-                if gain > best_gain:
-                    best_gain, best_feat, best_thresh = gain, feat, t
-        return best_feat, best_thresh, best_gain
+                return _Split(feat, np.nan, gain, missing_left, categories)
+            # Last sorted position of each distinct value: "x <= xs[end]" splits
+            ends = np.flatnonzero(np.append(xs[1:] != xs[:-1], True))
+            left = np.cumsum(node_stats, axis=0)[ends]
+            gain, end, missing_left = self._best_candidate(
+                parent, left, missing, parent_impurity
+            )
+            if end < 0:
+                return _Split(feat, -1.0, -1.0)
+            # The last value can only split values from NaNs; match the
+            # histogram splitter's threshold for it
+            thresh = xs[ends[end]] if end < ends.size - 1 else np.inf
+            return _Split(feat, thresh, gain, missing_left)
+
+        features = self._split_features()
+        for split in self._map_features(search, features, order.shape[1]):
+            if split.gain > best.gain:
+                best = split._replace(feature=int(split.feature))
+        return best
+
+    def _grow(self, data: np.ndarray, stats: np.ndarray, root: Any) -> None:
+        """Grow ``tree_`` from the root's rows and apply ``ccp_alpha``.
+
+        ``data`` is ``X`` with per-feature row orders as node rows (exact
+        splitter) or the binned matrix with ``(idx, hist)`` (histogram
+        splitter). Every new node's best split is searched right away; a
+        stack then expands nodes depth-first, or a max-heap on the weighted
+        impurity decrease expands them best-first under ``max_leaf_nodes``.
+        """
+        builder = _TreeBuilder()
+        n_total = None
+        best_first = self.max_leaf_nodes is not None
+        frontier: List[tuple] = []
+        tie_break = itertools.count()
+        # Side of every row in the node being split (exact splitter)
+        is_left = np.zeros(stats.shape[0], dtype=bool)
+
+        def add(rows: Any, depth: int) -> int:
+            nonlocal n_total
+            node_stats = self._node_stats(stats, rows)
+            impurity = float(self.criterion_.impurity(node_stats))
+            count = float(self.criterion_.count(node_stats))
+            n_total = count if n_total is None else n_total
+            node = builder.add_node(
+                self.criterion_.node_value(node_stats), impurity, count
+            )
+            split = self._find_split(data, stats, rows, impurity, count, depth=depth)
+            if split is not None:
+                decrease = count / n_total * split.gain
+                if decrease >= self.min_impurity_decrease:
+                    item = (-decrease, next(tie_break), node, depth, rows, split)
+                    if best_first:
+                        heapq.heappush(frontier, item)
+                    else:
+                        frontier.append(item)
+            return node
 
-    def _grow(self, X: np.ndarray, y: np.ndarray, depth: int) -> Node:
-        # make leaf if pure or max depth reached
+        add(root, 0)
+        n_leaves = 1
+        while frontier and (not best_first or n_leaves < self.max_leaf_nodes):
+            item = heapq.heappop(frontier) if best_first else frontier.pop()
+            _, _, node, depth, rows, split = item
+            children = self._partition(data, stats, rows, split, is_left)
+            if children is None:
+                continue
+            left = add(children[0], depth + 1)
+            right = add(children[1], depth + 1)
+            thresh, categories = split.threshold, split.categories
+            if self.splitter == "hist":
+                edges = self.bin_edges_[split.feature]
+                if categories is not None:
+                    categories = edges[categories]
+                else:
+                    # The bin past the last edge splits values from NaNs
+                    thresh = edges[thresh] if thresh < edges.size else np.inf
+            builder.set_split(
+                node,
+                split.feature,
+                thresh,
+                left,
+                right,
+                missing_left=children[2],
+                categories=categories,
+            )
+            n_leaves += 1
+        self.tree_ = builder.build()
+        if self.ccp_alpha > 0:
+            self.tree_ = self.prune(self.ccp_alpha).tree_
+
+    def _node_stats(self, stats: np.ndarray, rows: Any) -> np.ndarray:
+        if self.splitter == "hist":
+            # Every feature's bins sum to the node statistics; use feature 0
+            return rows[1][0].sum(axis=0)
+        return stats[rows[0]].sum(axis=0)
+
+    def _find_split(  # noqa: PLR0913
+        self,
+        data: np.ndarray,
+        stats: np.ndarray,
+        rows: Any,
+        impurity: float,
+        count: float,
+        *,
+        depth: int,
+    ) -> Optional[_Split]:
+        """Best split of a node, if it splits."""
+        # keep the leaf if pure or max depth reached
         if (
-            depth >= self.max_depth
-            or self._gini(y) == 0.0
-            or y.size < self.min_samples_split
+            (self.max_depth is not None and depth >= self.max_depth)
+            or impurity == 0.0
+            or count < self.min_samples_split
         ):
-            label = int(np.round(y.mean()))
-            return Node(label=label)
+            return None
+        if self.splitter == "hist":
+            split = self._best_split_hist(rows[1], impurity)
+        else:
+            split = self._best_split(data, stats, rows)
+        # If no best split found or gain is not positive, keep the leaf
+        return split if split.gain > 0 else None
 
-        feat, thresh, gain = self._best_split(X, y)
-        if gain <= 0:  # If no best split found or gain is not positive, make a leaf
-            label = int(np.round(y.mean()))
-            return Node(label=label)
+    def _partition(
+        self,
+        data: np.ndarray,
+        stats: np.ndarray,
+        rows: Any,
+        split: _Split,
+        is_left: np.ndarray,
+    ) -> Optional[Tuple[Any, Any, bool]]:
+        """Rows of both children of a split and whether missing values go left.
+
+        ``is_left`` is a per-sample scratch buffer of the exact splitter.
+        Returns None if one side is empty.
+        """
+        if self.splitter == "hist":
+            idx, hist = rows
+            codes = data[idx, split.feature]
+            left_mask, missing_left = self._goes_left(
+                codes, split, codes > self._n_edges[split.feature]
+            )
+            if not np.any(left_mask) or not np.any(~left_mask):
+                return None
+            # Subtraction trick: only the smaller child's histogram is counted
+            left_idx, right_idx = idx[left_mask], idx[~left_mask]
+            if left_idx.size <= right_idx.size:
+                left_hist = self._histogram(data, stats, left_idx)
+                right_hist = hist - left_hist
+            else:
+                right_hist = self._histogram(data, stats, right_idx)
+                left_hist = hist - right_hist
+            return (left_idx, left_hist), (right_idx, right_hist), missing_left
 
-        left_mask = X[:, feat] <= thresh
+        order = rows
+        values = data[order[0], split.feature]
+        goes_left, missing_left = self._goes_left(values, split, np.isnan(values))
+        n_left = int(np.count_nonzero(goes_left))
         # Add a check to ensure that the split results in at least one sample
         # in each child node
-        if not np.any(left_mask) or not np.any(~left_mask):
-            label = int(np.round(y.mean()))
-            return Node(label=label)
-
-        left = self._grow(X[left_mask], y[left_mask], depth + 1)
-        right = self._grow(X[~left_mask], y[~left_mask], depth + 1)
-        return Node(feature=feat, threshold=thresh, left=left, right=right)
-
-    def _predict_row(self, x: np.ndarray, node: Node) -> int:
-        while not node.is_leaf():
-            node = node.left if x[node.feature] <= node.threshold else node.right
-        return node.label
-
-    def export_text(self, node: Optional[Node] = None, depth: int = 0) -> str:
-        if node is None:
-            node = self.root
-        indent = "  " * depth
-        if node.is_leaf():
-            return f"{indent}Predict {node.label}\n"
-        txt = f"{indent}X[{node.feature}] <= {node.threshold:.2f}?\n"
-        txt += self.export_text(node.left, depth + 1)
-        txt += self.export_text(node.right, depth + 1)
-        return txt
+        if n_left in (0, order.shape[1]):
+            return None
+        # Stable partition of every feature's order; only this node's rows
+        # of the shared flag buffer are written and read
+        is_left[order[0]] = goes_left
+        in_left = is_left[order]
+        n_features = order.shape[0]
+        left_order = order[in_left].reshape(n_features, n_left)
+        right_order = order[~in_left].reshape(n_features, -1)
+        return left_order, right_order, missing_left
+
+    @staticmethod
+    def _goes_left(
+        values: np.ndarray, split: _Split, missing: np.ndarray
+    ) -> Tuple[np.ndarray, bool]:
+        """Side of each of a node's rows, and the side of missing values."""
+        if split.categories is None:
+            goes_left = values <= split.threshold
+        else:
+            goes_left = np.isin(values, split.categories)
+        if missing.any():
+            goes_left[missing] = split.missing_left
+            return goes_left, split.missing_left
+        # No missing values seen here: later ones follow the larger child
+        return goes_left, 2 * int(np.count_nonzero(goes_left)) >= goes_left.size
+
+    def _histogram(
+        self, X_binned: np.ndarray, stats: np.ndarray, idx: np.ndarray
+    ) -> np.ndarray:
+        """Per-bin sums of the statistics of rows ``idx``.
+
+        Returns a float array of shape ``(n_features, max_bins, n_stats)``.
+        """
+        n_features = X_binned.shape[1]
+        n_stats = stats.shape[1]
+        hist = np.empty((n_features, self.max_bins, n_stats))
+        node_stats = stats[idx]
+
+        def count(feat: int) -> None:
+            codes = X_binned[idx, feat]
+            for s in range(n_stats):
+                hist[feat, :, s] = np.bincount(
+                    codes, weights=node_stats[:, s], minlength=self.max_bins
+                )
+
+        self._map_features(count, range(n_features), idx.size)
+        return hist
+
+    def _best_split_hist(self, hist: np.ndarray, parent_impurity: float) -> _Split:
+        """Best split of a node's histogram, or ``_Split(-1, -1, -1.0)``.
+
+        Same gain and tie-breaking as `_best_split`, over ``bin <= b``
+        boundaries. Each feature's NaN bin (see `binning.bin_features`) is
+        scored on both sides, and on features with NaNs the bin past the
+        last edge is a candidate too, splitting values from NaNs.
+        """
+        n_features = hist.shape[0]
+        features = np.arange(n_features)
+        n_edges = self._n_edges
+        crit = self.criterion_
+        missing_bin = n_edges + 1
+        missing = np.where(
+            (missing_bin < self.max_bins)[:, None],
+            hist[features, np.minimum(missing_bin, self.max_bins - 1)],
+            0.0,
+        )
+        has_missing = crit.count(missing) > 0
+        left = np.cumsum(hist, axis=1)
+        parent = left[0, -1]
+        if has_missing.any():
+            left = np.stack([left, left + missing[:, None]])
+        else:
+            left = left[None]
+        gain, n_left, n_right = self._split_gain(parent, left, parent_impurity)
+        searched = np.zeros(n_features, dtype=bool)
+        searched[self._split_features()] = True
+        valid = (
+            (n_left >= self.min_samples_split)
+            & (n_right >= self.min_samples_split)
+            & (np.arange(self.max_bins) < (n_edges + has_missing)[:, None])
+            & (searched & ~self.categorical_)[:, None]
+        )
+        # Per feature, row-major argmax over (side, bin): missing values
+        # right, then the lowest bin, wins ties
+        gain = np.where(valid, gain, -np.inf).transpose(1, 0, 2)
+        gain = gain.reshape(n_features, -1)
+        best = np.argmax(gain, axis=1)
+        feature_gain = gain[features, best]
+        categorical = {}
+        for feat in np.flatnonzero(self.categorical_ & searched):
+            cat_gain, categories, missing_left = self._categorical_split(
+                hist[feat, : n_edges[feat]],
+                parent,
+                missing[feat] if has_missing[feat] else None,
+                parent_impurity,
+            )
+            feature_gain[feat] = -np.inf if categories is None else cat_gain
+            categorical[feat] = (categories, missing_left)
+        # Lowest feature wins ties
+        feat = int(np.argmax(feature_gain))
+        if feature_gain[feat] == -np.inf:
+            return _Split(-1, -1, -1.0)
+        if feat in categorical:
+            categories, missing_left = categorical[feat]
+            return _Split(feat, np.nan, feature_gain[feat], missing_left, categories)
+        side, b = divmod(int(best[feat]), self.max_bins)
+        return _Split(feat, b, feature_gain[feat], bool(side))
+
+    def _with_tree(self, tree: TreeArrays) -> "DecisionTree":
+        model = copy.copy(self)
+        model.tree_ = tree
+        return model
+
+    def _weakest_links(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Minimal cost-complexity pruning sequence of the grown tree.
+
+        Repeatedly collapses the internal node ``t`` with the smallest
+        effective alpha ``(R(t) - R(T_t)) / (|leaves(T_t)| - 1)``, where
+        ``R(t)`` is the node's impurity weighted by its share of the
+        samples and ``R(T_t)`` the same summed over its subtree's leaves.
+        Collapsing a node only changes its ancestors, which are updated in
+        place. Returns the path's alphas and total leaf impurities, and per
+        node the alpha at which it stops splitting (inf for none).
+        """
+        tree = self.tree_
+        internal = np.flatnonzero(tree.feature != LEAF)
+        risk = tree.n_samples / tree.n_samples[0] * tree.impurity
+        parent = np.full(tree.n_nodes, LEAF)
+        parent[tree.left[internal]] = internal
+        parent[tree.right[internal]] = internal
+        subtree_risk = risk.copy()
+        n_leaves = np.ones(tree.n_nodes)
+        # Children come after parents, so reverse order is bottom-up
+        for node in internal[::-1]:
+            children = [tree.left[node], tree.right[node]]
+            subtree_risk[node] = subtree_risk[children].sum()
+            n_leaves[node] = n_leaves[children].sum()
+
+        active = tree.feature != LEAF
+        prune_alpha = np.full(tree.n_nodes, np.inf)
+        alphas, impurities = [0.0], [subtree_risk[0]]
+        while active.any():
+            with np.errstate(divide="ignore", invalid="ignore"):
+                effective = (risk - subtree_risk) / (n_leaves - 1)
+            effective = np.where(active, effective, np.inf)
+            weakest = int(np.argmin(effective))
+            # Rounding can make alphas dip slightly; keep the path monotone
+            alpha = max(effective[weakest], alphas[-1])
+            stack = [weakest]
+            while stack:
+                node = stack.pop()
+                if active[node]:
+                    active[node] = False
+                    prune_alpha[node] = alpha
+                    stack += [tree.left[node], tree.right[node]]
+            risk_change = risk[weakest] - subtree_risk[weakest]
+            leaf_change = n_leaves[weakest] - 1
+            node = weakest
+            while node != LEAF:
+                subtree_risk[node] += risk_change
+                n_leaves[node] -= leaf_change
+                node = parent[node]
+            if alpha > alphas[-1]:
+                alphas.append(alpha)
+                impurities.append(subtree_risk[0])
+            else:
+                impurities[-1] = subtree_risk[0]
+        return np.array(alphas), np.array(impurities), prune_alpha
+
+    def cost_complexity_pruning_path(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Effective alphas of the fitted tree and the total leaf impurity
+        (weighted by sample share) of the pruned tree at each of them.
+
+        ``prune(alphas[i])`` gives the i-th tree of the path; the last one is
+        the root alone. Computed from the grown tree alone, no refitting.
+        """
+        alphas, impurities, _ = self._weakest_links()
+        return alphas, impurities
+
+    def prune(self, ccp_alpha: float) -> "DecisionTree":
+        """Copy of this tree after minimal cost-complexity pruning at ``ccp_alpha``."""
+        _, _, prune_alpha = self._weakest_links()
+        return self._with_tree(self.tree_.subtree(prune_alpha > ccp_alpha))
+
+    def truncate(self, max_depth: int) -> "DecisionTree":
+        """Copy of this tree cut back to ``max_depth``.
+
+        Depth-first growth does not depend on the depth limit, so without
+        ``max_leaf_nodes`` and ``ccp_alpha`` this is the tree a fit with that
+        ``max_depth`` would grow (given the same ``max_features`` draws, i.e.
+        exactly so when ``max_features=None``). Otherwise it is only a
+        shallower copy: best-first growth spends its leaf budget differently
+        under a lower depth limit, and pruning a shallower tree may remove
+        different branches.
+        """
+        return self._with_tree(self.tree_.subtree(self.tree_.node_depth() < max_depth))
+
+    def export_text(self, node: int = 0, depth: int = 0) -> str:
+        """Indented text of the subtree at ``node``, one line per node."""
+        tree = self.tree_
+        lines = []
+        stack = [(node, depth)]
+        while stack:
+            node, depth = stack.pop()
+            indent = "  " * depth
+            if tree.feature[node] == LEAF:
+                lines.append(f"{indent}Predict {self._predict_value(tree.value[node])}")
+                continue
+            if tree.is_categorical[node]:
+                categories = ", ".join(str(c) for c in tree.categories(node))
+                lines.append(f"{indent}X[{tree.feature[node]}] in {{{categories}}}?")
+            else:
+                lines.append(
+                    f"{indent}X[{tree.feature[node]}] <= {tree.threshold[node]:.2f}?"
+                )
+            stack += [(tree.right[node], depth + 1), (tree.left[node], depth + 1)]
+        return "".join(line + "\n" for line in lines)
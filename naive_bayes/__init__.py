@@ -1,4 +1,11 @@
 from .datasets import load_toy_data
-from .model import MultinomialNB
+from .model import BernoulliNB, ComplementNB, MultinomialNB
+from .stats import CountStats
 
-__all__ = ["MultinomialNB", "load_toy_data"]
+__all__ = [
+    "BernoulliNB",
+    "ComplementNB",
+    "CountStats",
+    "MultinomialNB",
+    "load_toy_data",
+]
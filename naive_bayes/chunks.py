@@ -0,0 +1,50 @@
+import os
+from typing import Iterable, Iterator, Optional, Tuple, Union
+
+import numpy as np
+
+from .stats import sp
+
+PathLike = Union[str, os.PathLike]
+
+
+def load_matrix(path: PathLike):
+    """Open a ``.npy`` array memory-mapped, or load a sparse ``.npz`` matrix."""
+    if os.fspath(path).endswith(".npz"):
+        if sp is None:
+            raise ImportError("Reading sparse .npz shards requires scipy.")
+        return sp.load_npz(path).tocsr()
+    return np.load(path, mmap_mode="r")
+
+
+def iter_chunks(X, y: np.ndarray, chunk_size: int) -> Iterator[Tuple]:
+    """Yield ``(X_chunk, y_chunk)`` row blocks of at most ``chunk_size`` rows.
+
+    Dense chunks are plain ndarray views, so slicing a memory map reads only
+    that block from disk.
+    """
+    for start in range(0, X.shape[0], chunk_size):
+        stop = start + chunk_size
+        X_chunk = X[start:stop]
+        if not (sp is not None and sp.issparse(X_chunk)):
+            X_chunk = np.asarray(X_chunk)
+        yield X_chunk, np.asarray(y[start:stop])
+
+
+def iter_shards(
+    shards: Iterable[Tuple[PathLike, PathLike]], chunk_size: Optional[int] = None
+) -> Iterator[Tuple]:
+    """Yield ``(X_chunk, y_chunk)`` from ``(X_path, y_path)`` shards in turn.
+
+    ``X_path`` is a dense ``.npy`` array (memory-mapped, so only the rows
+    being read are paged in) or a sparse ``.npz`` matrix written by
+    ``scipy.sparse.save_npz``; ``y_path`` is a ``.npy`` label vector. With
+    ``chunk_size`` each shard is further split into row blocks; without it
+    every shard is yielded whole.
+    """
+    for X_path, y_path in shards:
+        X = load_matrix(X_path)
+        y = np.load(y_path, mmap_mode="r")
+        if X.shape[0] != y.shape[0]:
+            raise ValueError(f"{X_path} and {y_path} differ in number of rows.")
+        yield from iter_chunks(X, y, chunk_size or max(X.shape[0], 1))
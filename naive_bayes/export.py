@@ -0,0 +1,83 @@
+import os
+from typing import Optional, Union
+
+import numpy as np
+
+from arrayfile import read_arrays, write_arrays
+
+from .model import BernoulliNB, ComplementNB, MultinomialNB, _CountNB
+
+PathLike = Union[str, os.PathLike]
+
+MAGIC = b"NBMODEL\0"
+FORMAT_VERSION = 1
+_HEADS = {cls.__name__: cls for cls in (MultinomialNB, ComplementNB, BernoulliNB)}
+
+
+def save_model(path: PathLike, model: _CountNB, dtype: Optional[type] = None) -> None:
+    """Write the inference state of a fitted model to ``path``.
+
+    The `arrayfile` header names the head and its ``alpha`` and ``norm``;
+    the arrays are ``classes_``, ``class_log_prior_`` and
+    ``feature_log_prob_``. Heads whose scoring weights are not
+    ``feature_log_prob_`` itself (`BernoulliNB`) also store them, as
+    ``coef`` and ``intercept`` arrays after the others.
+
+    ``dtype`` quantizes the log-probabilities (``np.float32`` or
+    ``np.float16``); by default they are stored as the model holds them.
+    Raw counts are not stored, so a loaded model cannot `partial_fit`.
+    """
+    if model.feature_log_prob_ is None or model.class_log_prior_ is None:
+        raise ValueError("Model has not been fitted yet.")
+    if model.classes_.dtype.hasobject:
+        raise ValueError("Only numeric or fixed-width string labels can be saved.")
+    dtype = model.feature_log_prob_.dtype if dtype is None else np.dtype(dtype)
+    arrays = {
+        "classes": model.classes_,
+        "class_log_prior": model.class_log_prior_.astype(dtype),
+        "feature_log_prob": model.feature_log_prob_.astype(dtype),
+    }
+    coef, intercept = model._linear_model()
+    if coef is not model.feature_log_prob_:
+        # Derived scoring weights (BernoulliNB) are stored too, so loading
+        # maps them instead of rebuilding a full-size table per process
+        arrays["coef"] = coef.astype(dtype)
+        arrays["intercept"] = intercept.astype(dtype)
+    header = {
+        "head": type(model).__name__,
+        "alpha": model.alpha,
+        "norm": getattr(model, "norm", False),
+    }
+    write_arrays(path, MAGIC, FORMAT_VERSION, header, arrays)
+
+
+def load_model(path: PathLike, mmap: bool = True) -> _CountNB:
+    """Load a model written by `save_model`, ready for inference.
+
+    With ``mmap=True`` the log-probability table, and the scoring weights
+    if stored, are memory-mapped read-only. float16 tables are upcast to
+    float32 in memory, since matrix products in half precision are neither
+    fast nor accurate; they only save disk space.
+    """
+    header, arrays = read_arrays(
+        path, MAGIC, FORMAT_VERSION, "Naïve Bayes model", mmap=mmap
+    )
+    for name in ("feature_log_prob", "coef"):
+        if name in arrays and arrays[name].dtype == np.float16:
+            arrays[name] = arrays[name].astype(np.float32)
+    feature_log_prob = arrays["feature_log_prob"]
+    kwargs = {"norm": header["norm"]} if header["head"] == "ComplementNB" else {}
+    model = _HEADS[header["head"]](
+        header["alpha"], dtype=feature_log_prob.dtype.type, **kwargs
+    )
+    model.classes_ = np.asarray(arrays["classes"])
+    model.class_log_prior_ = np.asarray(arrays["class_log_prior"]).astype(
+        feature_log_prob.dtype
+    )
+    model.feature_log_prob_ = feature_log_prob
+    if "coef" in arrays:
+        model._linear = (
+            arrays["coef"],
+            np.asarray(arrays["intercept"]).astype(feature_log_prob.dtype),
+        )
+    return model
@@ -1,50 +1,344 @@
-from typing import Optional
+import abc
+import copy
+import functools
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, List, Optional, Sequence, Tuple
 
 import numpy as np
 
+from .chunks import iter_chunks, load_matrix
+from .stats import CountStats, _issparse
 
-class MultinomialNB:
-    """Bare-bones multinomial Naïve Bayes with Laplace smoothing."""
 
-    def __init__(self, alpha: float = 1.0) -> None:
-        self.alpha = alpha
-        self.class_log_prior_: Optional[np.ndarray] = None
-        self.feature_log_prob_: Optional[np.ndarray] = None
+def _logsumexp(a: np.ndarray) -> np.ndarray:
+    """``log(sum(exp(a)))`` over the last axis without overflow or underflow."""
+    a_max = a.max(axis=-1, keepdims=True)
+    return (a_max + np.log(np.exp(a - a_max).sum(axis=-1, keepdims=True)))[..., 0]
+
+
+def _shard_stats(X, y, chunk_size: Optional[int] = None) -> CountStats:
+    """Count one shard (runs inside pool workers).
+
+    File paths are opened here, memory-mapped for ``.npy``, so the shard's
+    data never has to be pickled and sent from the parent process.
+    """
+    if isinstance(X, (str, os.PathLike)):
+        X = load_matrix(X)
+    if isinstance(y, (str, os.PathLike)):
+        y = np.load(y, mmap_mode="r")
+    stats = CountStats.empty(np.unique(y), X.shape[1])
+    for X_chunk, y_chunk in iter_chunks(X, y, chunk_size or max(X.shape[0], 1)):
+        stats.update(X_chunk, y_chunk)
+    return stats
+
+
+class _CountNB(abc.ABC):
+    """Shared machinery of the count-based Naïve Bayes classifiers.
+
+    ``X`` may be a dense array or any scipy.sparse matrix (CSR preferred);
+    sparse input is never densified, so memory scales with its nonzeros.
+
+    Training only accumulates a `CountStats` in ``stats_``, so it can
+    continue chunk by chunk with `partial_fit`, and one `CountStats` can be
+    turned into any head with `from_stats`. ``class_log_prior_`` and
+    ``feature_log_prob_`` are derived from the counts lazily on first access
+    and cached until the counts or ``alpha`` change.
+
+    Every head scores linearly, ``jll = f(X) @ coef.T + intercept``.
+    Inference runs over row batches of ``batch_size`` (all rows at once by
+    default), so peak memory is bounded by one batch's likelihood matrix.
+    With ``n_jobs > 1`` batches are scored on a thread pool; the matrix
+    product releases the GIL, so threads run in parallel. ``dtype=np.float32``
+    stores the model in single precision, halving its memory and speeding up
+    the product.
+    """
+
+    def __init__(
+        self,
+        alpha: float = 1.0,
+        *,
+        batch_size: Optional[int] = None,
+        n_jobs: Optional[int] = None,
+        dtype: type = np.float64,
+    ) -> None:
+        self._alpha = alpha
+        self.batch_size = batch_size
+        self.n_jobs = n_jobs
+        self.dtype = dtype
+        self.stats_: Optional[CountStats] = None
+        self._class_log_prior: Optional[np.ndarray] = None
+        self._feature_log_prob: Optional[np.ndarray] = None
+        self._linear: Optional[Tuple[np.ndarray, np.ndarray]] = None
         # Add self.classes_ for consistency with scikit-learn and potential future use
         self.classes_: Optional[np.ndarray] = None
 
-    def fit(self, X: np.ndarray, y: np.ndarray) -> "MultinomialNB":
-        """Estimate P(class) and P(feature|class)."""
-        self.classes_ = np.unique(y)
-        n_classes = len(self.classes_)
+    @classmethod
+    def from_stats(cls, stats: CountStats, alpha: float = 1.0, **kwargs):
+        """Build a fitted model from counts gathered elsewhere.
 
-        # Map original class labels to 0..n_classes-1 for indexing
-        y_mapped = np.zeros_like(y, dtype=int)
-        for i, cls_label in enumerate(self.classes_):
-            y_mapped[y == cls_label] = i
+        ``stats`` is shared, not copied; `partial_fit` on the model updates it.
+        """
+        model = cls(alpha, **kwargs)
+        model._set_stats(stats)
+        return model
 
-        class_count = np.bincount(y_mapped, minlength=n_classes).astype(float)
-        self.class_log_prior_ = np.log(class_count / class_count.sum())
+    def _set_stats(self, stats: CountStats) -> None:
+        self.stats_ = stats
+        self.classes_ = stats.classes
+        self._class_log_prior = self._feature_log_prob = self._linear = None
 
-        feature_count = np.zeros((n_classes, X.shape[1]), dtype=float)
-        for i, cls_label in enumerate(self.classes_):
-            # Use y_mapped for consistent indexing with feature_count
-            feature_count[i] = X[y == cls_label].sum(axis=0) + self.alpha
+    @property
+    def alpha(self) -> float:
+        return self._alpha
 
-        self.feature_log_prob_ = np.log(
-            feature_count / feature_count.sum(axis=1, keepdims=True)
-        )
+    @alpha.setter
+    def alpha(self, value: float) -> None:
+        # Smoothing only enters feature_log_prob_; recompute it on next use
+        self._alpha = value
+        self._feature_log_prob = self._linear = None
+
+    @property
+    def class_count_(self) -> Optional[np.ndarray]:
+        return None if self.stats_ is None else self.stats_.class_count
+
+    @property
+    def feature_count_(self) -> Optional[np.ndarray]:
+        return None if self.stats_ is None else self.stats_.feature_count
+
+    @property
+    def class_log_prior_(self) -> Optional[np.ndarray]:
+        if self._class_log_prior is None and self.stats_ is not None:
+            class_count = self.stats_.class_count
+            # Classes not seen yet (partial_fit) get a log prior of -inf
+            with np.errstate(divide="ignore"):
+                self._class_log_prior = np.log(class_count / class_count.sum()).astype(
+                    self.dtype
+                )
+        return self._class_log_prior
+
+    @class_log_prior_.setter
+    def class_log_prior_(self, value: Optional[np.ndarray]) -> None:
+        self._class_log_prior = value
+        self._linear = None
+
+    @property
+    def feature_log_prob_(self) -> Optional[np.ndarray]:
+        if self._feature_log_prob is None and self.stats_ is not None:
+            self._feature_log_prob = self._compute_feature_log_prob(self.stats_).astype(
+                self.dtype
+            )
+        return self._feature_log_prob
+
+    @feature_log_prob_.setter
+    def feature_log_prob_(self, value: Optional[np.ndarray]) -> None:
+        self._feature_log_prob = value
+        self._linear = None
+
+    @abc.abstractmethod
+    def _compute_feature_log_prob(self, stats: CountStats) -> np.ndarray:
+        """Smoothed per-class feature log-probabilities from ``stats``."""
+
+    def _linear_terms(
+        self, feature_log_prob: np.ndarray, class_log_prior: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """``(coef, intercept)`` of the head's linear joint log-likelihood."""
+        return feature_log_prob, class_log_prior
+
+    def _transform(self, X):
+        """Map raw input to the features the linear scores are taken over."""
+        return X
+
+    def _linear_model(self) -> Tuple[np.ndarray, np.ndarray]:
+        if self._linear is None:
+            feature_log_prob, class_log_prior = (
+                self.feature_log_prob_,
+                self.class_log_prior_,
+            )
+            if feature_log_prob is None or class_log_prior is None:
+                raise ValueError("Model has not been fitted yet.")
+            self._linear = self._linear_terms(feature_log_prob, class_log_prior)
+        return self._linear
+
+    def fit(self, X, y: np.ndarray):
+        """Count ``(X, y)`` from scratch."""
+        self.stats_ = self.classes_ = None
+        return self.partial_fit(X, y, classes=np.unique(y))
+
+    def partial_fit(self, X, y: np.ndarray, classes: Optional[np.ndarray] = None):
+        """Add one chunk of samples to the running counts.
+
+        ``classes`` (every label that will ever appear) is required on the
+        first call, since a chunk may not contain all of them.
+        """
+        if self.stats_ is None:
+            if classes is None:
+                raise ValueError("classes must be passed on the first partial_fit.")
+            self._set_stats(CountStats.empty(classes, X.shape[1]))
+        self.stats_.update(X, y)
+        self._class_log_prior = self._feature_log_prob = self._linear = None
         return self
 
-    def _joint_log_likelihood(self, X: np.ndarray) -> np.ndarray:
-        if self.feature_log_prob_ is None or self.class_log_prior_ is None:
-            raise ValueError("Model has not been fitted yet.")
-        return (X @ self.feature_log_prob_.T) + self.class_log_prior_
+    def fit_parallel(
+        self,
+        X_shards: Sequence,
+        y_shards: Sequence,
+        workers: Optional[int] = None,
+        chunk_size: Optional[int] = None,
+    ):
+        """Fit on shards counted in parallel by a process pool.
 
-    def predict(self, X: np.ndarray) -> np.ndarray:
-        """Return class with highest posterior for each sample."""
-        if self.classes_ is None:
-            raise ValueError("Model has not been fitted yet.")
+        Each shard is an array, a sparse matrix or a path understood by
+        `load_matrix`; labels are arrays or ``.npy`` paths. Pass paths for
+        large shards: workers then memory-map them instead of receiving a
+        pickled copy. ``chunk_size`` bounds the rows a worker counts at once.
+        The per-shard counts are merged, so the result equals a `fit` on the
+        concatenated data. ``workers=1`` counts in-process.
+        """
+        count = functools.partial(_shard_stats, chunk_size=chunk_size)
+        if workers == 1:
+            parts = list(map(count, X_shards, y_shards))
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                parts = list(pool.map(count, X_shards, y_shards))
+        self._set_stats(functools.reduce(CountStats.merge, parts))
+        return self
+
+    def merge(self, other: "_CountNB"):
+        """Return a model trained on the union of both models' data.
+
+        Models fitted on different shards or machines combine exactly,
+        including when their classes differ. Settings are taken from ``self``.
+        """
+        if self.stats_ is None or other.stats_ is None:
+            raise ValueError("Both models must be fitted with counts to merge.")
+        model = copy.copy(self)
+        model._set_stats(self.stats_.merge(other.stats_))
+        return model
+
+    def _map_batches(self, func: Callable, X) -> List:
+        """Apply ``func`` to consecutive row batches of ``X``, in order."""
+        # Also fills the lazy caches before any worker thread reads them
+        self._linear_model()
+        # COO and friends cannot be sliced by row
+        X = X.tocsr() if _issparse(X) else np.asarray(X)
+        n_samples = X.shape[0]
+        size = self.batch_size or max(n_samples, 1)
+        batches = [X[i : i + size] for i in range(0, n_samples, size)] or [X]
+        if self.n_jobs is None or self.n_jobs <= 1 or len(batches) == 1:
+            return [func(batch) for batch in batches]
+        with ThreadPoolExecutor(max_workers=self.n_jobs) as pool:
+            return list(pool.map(func, batches))
+
+    def _joint_log_likelihood(self, X) -> np.ndarray:
+        # Cast one batch at a time so integer counts don't promote to float64;
+        # sparse @ dense yields a dense (n_samples, n_classes) ndarray
+        coef, intercept = self._linear_model()
+        X = self._transform(X).astype(self.dtype, copy=False)
+        return np.asarray(X @ coef.T) + intercept
+
+    def _log_proba(self, X) -> np.ndarray:
         jll = self._joint_log_likelihood(X)
+        return jll - _logsumexp(jll)[:, None]
+
+    def predict(self, X) -> np.ndarray:
+        """Return class with highest posterior for each sample."""
+        indices = self._map_batches(
+            lambda batch: np.argmax(self._joint_log_likelihood(batch), axis=1), X
+        )
         # Map indexed predictions back to original class labels
-        return self.classes_[np.argmax(jll, axis=1)]
+        return self.classes_[np.concatenate(indices)]
+
+    def predict_log_proba(self, X) -> np.ndarray:
+        """Return log P(class|x), one column per entry of ``classes_``."""
+        return np.concatenate(self._map_batches(self._log_proba, X))
+
+    def predict_proba(self, X) -> np.ndarray:
+        """Return P(class|x), one column per entry of ``classes_``."""
+        return np.exp(self.predict_log_proba(X))
+
+    def predict_top_k(self, X, k: int = 3) -> Tuple[np.ndarray, np.ndarray]:
+        """Return the ``k`` most probable classes per sample, best first.
+
+        Returns ``(labels, proba)``, both of shape ``(n_samples, k)``.
+        """
+        if k < 1:
+            raise ValueError("k must be at least 1.")
+        self._linear_model()  # raises if the model is not fitted
+        k = min(k, len(self.classes_))
+
+        def top_k(batch) -> Tuple[np.ndarray, np.ndarray]:
+            log_proba = self._log_proba(batch)
+            top = np.argpartition(-log_proba, k - 1, axis=1)[:, :k]
+            top_log_proba = np.take_along_axis(log_proba, top, axis=1)
+            order = np.argsort(-top_log_proba, axis=1)
+            return (
+                np.take_along_axis(top, order, axis=1),
+                np.take_along_axis(top_log_proba, order, axis=1),
+            )
+
+        results = self._map_batches(top_k, X)
+        indices = np.concatenate([idx for idx, _ in results])
+        log_proba = np.concatenate([lp for _, lp in results])
+        return self.classes_[indices], np.exp(log_proba)
+
+
+class MultinomialNB(_CountNB):
+    """Bare-bones multinomial Naïve Bayes with Laplace smoothing."""
+
+    def _compute_feature_log_prob(self, stats: CountStats) -> np.ndarray:
+        smoothed = stats.feature_count + self.alpha
+        return np.log(smoothed / smoothed.sum(axis=1, keepdims=True))
+
+
+class ComplementNB(_CountNB):
+    """Complement Naïve Bayes (Rennie et al., 2003) for imbalanced classes.
+
+    Each class is scored by how poorly it matches the word distribution of
+    all *other* classes, which is estimated from far more data than a small
+    class's own. ``norm=True`` additionally normalizes the weights per class.
+    """
+
+    def __init__(self, alpha: float = 1.0, *, norm: bool = False, **kwargs) -> None:
+        super().__init__(alpha, **kwargs)
+        self.norm = norm
+
+    def _compute_feature_log_prob(self, stats: CountStats) -> np.ndarray:
+        complement = stats.feature_count.sum(axis=0) - stats.feature_count + self.alpha
+        logged = np.log(complement / complement.sum(axis=1, keepdims=True))
+        if self.norm:
+            return logged / logged.sum(axis=1, keepdims=True)
+        return -logged
+
+    def _linear_terms(
+        self, feature_log_prob: np.ndarray, class_log_prior: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        # The prior only matters when there is no complement to compare with
+        if len(class_log_prior) == 1:
+            return feature_log_prob, class_log_prior
+        return feature_log_prob, np.zeros_like(class_log_prior)
+
+
+class BernoulliNB(_CountNB):
+    """Bernoulli Naïve Bayes over binary features (nonzero means present).
+
+    Unlike the multinomial model, it explicitly penalizes absent features.
+    ``feature_log_prob_`` is log P(feature present | class).
+    """
+
+    def _compute_feature_log_prob(self, stats: CountStats) -> np.ndarray:
+        present = stats.presence_count + self.alpha
+        return np.log(present / (stats.class_count[:, None] + 2 * self.alpha))
+
+    def _linear_terms(
+        self, feature_log_prob: np.ndarray, class_log_prior: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        # log P(x|c) = x @ (log p - log(1 - p)) + sum(log(1 - p))
+        log_absent = np.log1p(-np.exp(feature_log_prob))
+        return (
+            feature_log_prob - log_absent,
+            class_log_prior + log_absent.sum(axis=1),
+        )
+
+    def _transform(self, X):
+        return X > 0
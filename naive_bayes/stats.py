@@ -0,0 +1,100 @@
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+try:
+    import scipy.sparse as sp
+except ImportError:  # scipy is optional; it is only needed for sparse input
+    sp = None
+
+
+def _issparse(X) -> bool:
+    return sp is not None and sp.issparse(X)
+
+
+def _class_feature_sums(X, y_idx: np.ndarray, n_classes: int) -> np.ndarray:
+    """Per-class column sums of ``X`` as one one-hot matrix product.
+
+    For a scipy.sparse ``X`` the class indicator is sparse too, so the
+    product only touches the stored nonzeros and ``X`` is never densified.
+    """
+    n_samples = y_idx.size
+    if _issparse(X):
+        indicator = sp.csr_matrix(
+            (np.ones(n_samples), (y_idx, np.arange(n_samples))),
+            shape=(n_classes, n_samples),
+        )
+        return (indicator @ X).toarray()
+    indicator = np.zeros((n_classes, n_samples))
+    indicator[y_idx, np.arange(n_samples)] = 1.0
+    return indicator @ X
+
+
+@dataclass
+class CountStats:
+    """Sufficient statistics shared by all count-based Naïve Bayes heads.
+
+    ``class_count`` is the number of samples per class, ``feature_count`` the
+    per-class column sums of ``X`` and ``presence_count`` the per-class number
+    of samples in which each feature is nonzero. All three are additive, so
+    statistics gathered on separate chunks or workers combine with `merge`.
+    """
+
+    classes: np.ndarray
+    class_count: np.ndarray
+    feature_count: np.ndarray
+    presence_count: np.ndarray
+
+    @classmethod
+    def empty(cls, classes: np.ndarray, n_features: int) -> "CountStats":
+        classes = np.unique(classes)
+        shape = (len(classes), n_features)
+        return cls(classes, np.zeros(len(classes)), np.zeros(shape), np.zeros(shape))
+
+    @classmethod
+    def from_data(
+        cls, X, y: np.ndarray, classes: Optional[np.ndarray] = None
+    ) -> "CountStats":
+        """Count one dataset; ``classes`` defaults to the labels in ``y``."""
+        classes = np.unique(y) if classes is None else classes
+        return cls.empty(classes, X.shape[1]).update(X, y)
+
+    @property
+    def n_features(self) -> int:
+        return self.feature_count.shape[1]
+
+    def update(self, X, y: np.ndarray) -> "CountStats":
+        """Add the samples ``(X, y)`` to the counts in place."""
+        if X.shape[1] != self.n_features:
+            raise ValueError(f"Expected {self.n_features} features, got {X.shape[1]}.")
+
+        # Map original class labels to 0..n_classes-1 for indexing
+        y = np.asarray(y)
+        y_idx = np.minimum(np.searchsorted(self.classes, y), len(self.classes) - 1)
+        if not np.array_equal(self.classes[y_idx], y):
+            raise ValueError("y contains labels not in classes.")
+
+        n_classes = len(self.classes)
+        self.class_count += np.bincount(y_idx, minlength=n_classes)
+        self.feature_count += _class_feature_sums(X, y_idx, n_classes)
+        self.presence_count += _class_feature_sums(X > 0, y_idx, n_classes)
+        return self
+
+    def merge(self, other: "CountStats") -> "CountStats":
+        """Return the statistics of both datasets combined.
+
+        The classes of the result are the union of both sides', so shards
+        that happen to lack some labels still merge correctly.
+        """
+        if self.n_features != other.n_features:
+            raise ValueError("Cannot merge statistics over different features.")
+        merged = CountStats.empty(
+            np.union1d(self.classes, other.classes), self.n_features
+        )
+        for part in (self, other):
+            rows = np.searchsorted(merged.classes, part.classes)
+            merged.class_count[rows] += part.class_count
+            merged.feature_count[rows] += part.feature_count
+            merged.presence_count[rows] += part.presence_count
+        return merged
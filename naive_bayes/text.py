@@ -0,0 +1,87 @@
+import itertools
+import re
+import zlib
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, Iterator, List, Optional
+
+import numpy as np
+
+from .stats import sp
+
+TOKEN_PATTERN = re.compile(r"(?u)\b\w\w+\b")
+
+
+def tokenize(doc: str, lowercase: bool = True) -> List[str]:
+    """Split ``doc`` into word tokens of two or more characters."""
+    return TOKEN_PATTERN.findall(doc.lower() if lowercase else doc)
+
+
+def _hash_batch(docs: List[str], n_features: int, lowercase: bool):
+    """Count matrix of one batch of documents (runs inside pool workers)."""
+    indices: List[int] = []
+    indptr = [0]
+    for doc in docs:
+        # crc32 is stable across processes, unlike the salted built-in hash()
+        indices.extend(
+            zlib.crc32(token.encode("utf-8")) % n_features
+            for token in tokenize(doc, lowercase)
+        )
+        indptr.append(len(indices))
+    X = sp.csr_matrix(
+        (np.ones(len(indices)), np.array(indices, dtype=np.int64), indptr),
+        shape=(len(docs), n_features),
+    )
+    X.sum_duplicates()
+    return X
+
+
+class HashingVectorizer:
+    """Stateless bag-of-words vectorizer using the hashing trick.
+
+    Each token is hashed to one of ``n_features`` columns, so there is no
+    vocabulary to build or store and any stream of documents can be turned
+    into CSR count matrices (ready for `MultinomialNB`) in bounded memory.
+    Distinct tokens may share a column; a large ``n_features`` keeps such
+    collisions rare. Requires scipy.
+    """
+
+    def __init__(self, n_features: int = 2**20, lowercase: bool = True) -> None:
+        if sp is None:
+            raise ImportError("HashingVectorizer requires scipy.")
+        self.n_features = n_features
+        self.lowercase = lowercase
+
+    def transform(self, docs: Iterable[str]):
+        """Return the ``(n_docs, n_features)`` CSR count matrix of ``docs``."""
+        return _hash_batch(list(docs), self.n_features, self.lowercase)
+
+    def iter_batches(
+        self,
+        docs: Iterable[str],
+        batch_size: int = 1000,
+        n_jobs: Optional[int] = None,
+    ) -> Iterator:
+        """Yield CSR count matrices for consecutive batches of ``docs``.
+
+        With ``n_jobs > 1`` batches are tokenized in a process pool. At most
+        ``2 * n_jobs`` batches are in flight at once, so memory stays bounded
+        however long ``docs`` is, and batches are yielded in input order.
+        """
+        docs = iter(docs)
+        batches = iter(lambda: list(itertools.islice(docs, batch_size)), [])
+        if n_jobs is None or n_jobs <= 1:
+            for batch in batches:
+                yield _hash_batch(batch, self.n_features, self.lowercase)
+            return
+
+        with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+            pending: deque = deque()
+            for batch in batches:
+                pending.append(
+                    pool.submit(_hash_batch, batch, self.n_features, self.lowercase)
+                )
+                if len(pending) >= 2 * n_jobs:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
@@ -0,0 +1,112 @@
+from typing import Optional
+
+import numpy as np
+
+from .env import GridWorld
+from .qlearn import QLearningHyperparameters
+
+
+def td_update(
+    Q: np.ndarray,
+    states: np.ndarray,
+    actions: np.ndarray,
+    targets: np.ndarray,
+    alpha: float,
+) -> None:
+    """Apply one synchronous TD step to ``Q`` in place for a batch of transitions.
+
+    TD errors are computed against the Q-table as it was before the batch. When
+    the same (s, a) pair appears several times, its TD errors are accumulated
+    with ``np.add.at`` semantics and then averaged, so k identical transitions
+    move ``Q[s, a]`` exactly as far as a single sequential update would instead
+    of overshooting by a factor of k.
+
+    Args:
+        Q (np.ndarray): Q-table of shape (n_states, n_actions), updated in place.
+        states (np.ndarray): State IDs of the batch, shape (n,).
+        actions (np.ndarray): Actions taken, shape (n,).
+        targets (np.ndarray): TD targets ``r + gamma * max_a' Q[s', a']``.
+        alpha (float): Learning rate.
+    """
+    q_flat = Q.reshape(-1)
+    pairs = states * Q.shape[1] + actions
+    td = targets - q_flat[pairs]
+    unique_pairs, inverse = np.unique(pairs, return_inverse=True)
+    td_sum = np.bincount(inverse, weights=td, minlength=unique_pairs.size)
+    counts = np.bincount(inverse, minlength=unique_pairs.size)
+    q_flat[unique_pairs] += alpha * td_sum / counts
+
+
+def q_learning_batched(
+    env: GridWorld,
+    params: QLearningHyperparameters = QLearningHyperparameters(),
+    n_envs: int = 32,
+    log_returns: bool = False,
+    seed: Optional[int] = None,
+) -> np.ndarray:
+    """Tabular Q-learning over ``n_envs`` episodes running in lock-step.
+
+    Every iteration picks ε-greedy actions for all running episodes, steps them
+    with `GridWorld.batch_step` and applies a single vectorized `td_update`.
+    Finished episodes restart immediately until ``params.episodes`` episodes
+    have completed in total, so the episode budget matches `q_learning`.
+    Episodes are numbered in the order they start for `epsilon_at`.
+
+    Args:
+        env (GridWorld): The environment to learn from.
+        params (QLearningHyperparameters, optional): Hyperparameters for
+            Q-learning. Defaults to `QLearningHyperparameters()`.
+        n_envs (int, optional): Number of parallel episodes. Defaults to 32.
+        log_returns (bool, optional): Whether to log cumulative returns per
+            episode, in order of completion. Defaults to False.
+        seed (Optional[int], optional): Seed for the action-selection RNG.
+            Defaults to None.
+
+    Returns:
+        np.ndarray: The learned Q-table, a 2D array of shape (n_states, n_actions).
+                    If log_returns is True, also returns a list of cumulative rewards.
+    """
+    n_states, n_actions = env.n_states, env.n_actions
+    Q = np.zeros((n_states, n_actions))
+    returns_log = []
+    rng = np.random.default_rng(seed)
+
+    n_running = min(n_envs, params.episodes)
+    states = env.batch_reset(n_running)
+    cumulative_reward = np.zeros(n_running)
+    running = np.ones(n_running, dtype=bool)
+    # ε of the episode each slot is running (episodes numbered by start)
+    epsilon = np.array([params.epsilon_at(e) for e in range(n_running)])
+    started = n_running
+
+    while running.any():
+        idx = np.flatnonzero(running)
+        s = states[idx]
+        # ε-greedy for the whole batch
+        explore = rng.random(idx.size) < epsilon[idx]
+        a = np.where(
+            explore,
+            rng.integers(n_actions, size=idx.size),
+            np.argmax(Q[s], axis=1),
+        )
+        s_next, r, done = env.batch_step(s, a)
+        targets = r + params.gamma * np.max(Q[s_next], axis=1) * ~done
+        td_update(Q, s, a, targets, params.alpha)
+
+        states[idx] = s_next
+        cumulative_reward[idx] += r
+        finished = idx[done]
+        if log_returns:
+            returns_log.extend(cumulative_reward[finished].tolist())
+        # restart finished episodes while the episode budget lasts
+        n_restart = min(finished.size, params.episodes - started)
+        restart, stop = finished[:n_restart], finished[n_restart:]
+        states[restart] = env.batch_reset(n_restart)
+        epsilon[restart] = [params.epsilon_at(started + i) for i in range(n_restart)]
+        cumulative_reward[finished] = 0
+        running[stop] = False
+        started += n_restart
+
+    if log_returns:
+        return Q, returns_log
+    return Q
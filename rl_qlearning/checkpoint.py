@@ -0,0 +1,108 @@
+import json
+import os
+from dataclasses import asdict, dataclass
+from typing import Optional, Union
+
+import numpy as np
+
+from .env import GridWorld
+from .qlearn import QLearningHyperparameters, _initial_q, _run_episode
+
+PathLike = Union[str, os.PathLike]
+
+
+@dataclass
+class Checkpoint:
+    """Everything needed to resume `q_learning` exactly where it stopped.
+
+    ``env_rng_state`` is the environment's RNG (slips, random starts); with it
+    a resumed run reproduces an uninterrupted one bit for bit.
+    """
+
+    Q: np.ndarray
+    rng: np.random.Generator
+    episode: int
+    params: QLearningHyperparameters
+    env_rng_state: Optional[dict] = None
+
+
+def _generator_from_state(state: dict) -> np.random.Generator:
+    bit_generator = getattr(np.random, state["bit_generator"])()
+    bit_generator.state = state
+    return np.random.Generator(bit_generator)
+
+
+def save_checkpoint(path: PathLike, checkpoint: Checkpoint) -> None:
+    """Write ``checkpoint`` to ``path`` as an ``.npz`` archive.
+
+    The archive is written to a temporary file first and then renamed over
+    ``path``, so an interrupted save never corrupts the previous checkpoint.
+    """
+    tmp_path = f"{os.fspath(path)}.tmp"
+    with open(tmp_path, "wb") as f:
+        np.savez(
+            f,
+            Q=checkpoint.Q,
+            episode=checkpoint.episode,
+            rng_state=json.dumps(checkpoint.rng.bit_generator.state),
+            env_rng_state=json.dumps(checkpoint.env_rng_state),
+            params=json.dumps(asdict(checkpoint.params)),
+        )
+    os.replace(tmp_path, path)
+
+
+def load_checkpoint(path: PathLike) -> Checkpoint:
+    """Read a checkpoint written by `save_checkpoint`."""
+    with np.load(path) as data:
+        return Checkpoint(
+            Q=data["Q"],
+            rng=_generator_from_state(json.loads(str(data["rng_state"]))),
+            episode=int(data["episode"]),
+            params=QLearningHyperparameters(**json.loads(str(data["params"]))),
+            env_rng_state=json.loads(str(data["env_rng_state"])),
+        )
+
+
+def q_learning_resumable(
+    env: GridWorld,
+    path: PathLike,
+    params: QLearningHyperparameters = QLearningHyperparameters(),
+    every: int = 500,
+    seed: Optional[int] = None,
+) -> np.ndarray:
+    """`q_learning` that checkpoints to ``path`` and resumes from it.
+
+    If ``path`` holds a checkpoint, training continues from its Q-table, RNG
+    states and episode counter; otherwise it starts fresh from ``seed``. A
+    checkpoint is written every ``every`` episodes and after the last one,
+    so a killed run loses at most ``every`` episodes of work.
+
+    Args:
+        env (GridWorld): The environment to learn from.
+        path (PathLike): Checkpoint file to resume from and save to.
+        params (QLearningHyperparameters, optional): Hyperparameters for
+            Q-learning; ``params.episodes`` is the total including episodes
+            already done. Defaults to `QLearningHyperparameters()`.
+        every (int, optional): Checkpoint interval in episodes. Defaults to 500.
+        seed (Optional[int], optional): Seed for a fresh run. Defaults to None.
+
+    Returns:
+        np.ndarray: The learned Q-table, a 2D array of shape (n_states, n_actions).
+    """
+    if os.path.exists(path):
+        checkpoint = load_checkpoint(path)
+        Q = _initial_q(env, checkpoint.Q)
+        rng, start = checkpoint.rng, checkpoint.episode
+        if checkpoint.env_rng_state is not None:
+            env.rng = _generator_from_state(checkpoint.env_rng_state)
+    else:
+        Q, rng, start = _initial_q(env, None), np.random.default_rng(seed), 0
+
+    for episode in range(start, params.episodes):
+        _run_episode(env, Q, params, rng, params.epsilon_at(episode))
+        if (episode + 1) % every == 0 or episode + 1 == params.episodes:
+            save_checkpoint(
+                path,
+                Checkpoint(Q, rng, episode + 1, params, env.rng.bit_generator.state),
+            )
+    return Q
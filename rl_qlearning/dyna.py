@@ -0,0 +1,146 @@
+from typing import Optional
+
+import numpy as np
+
+from .batched import td_update
+from .env import GridWorld
+from .qlearn import QLearningHyperparameters
+from .replay import PrioritizedReplayBuffer, ReplayBuffer, TransitionBatch
+
+
+class TabularModel:
+    """Classic Dyna-Q model: the last observed outcome of every visited (s, a).
+
+    Outcomes live in flat (n_states * n_actions) arrays and the visited pairs
+    in a preallocated list, so recording is O(1) and sampling is vectorized.
+    It offers the same ``add``/``sample`` interface as `ReplayBuffer`.
+    """
+
+    def __init__(self, n_states: int, n_actions: int, seed=None) -> None:
+        self.n_actions = n_actions
+        n_pairs = n_states * n_actions
+        self.next_states = np.zeros(n_pairs, dtype=np.int64)
+        self.rewards = np.zeros(n_pairs)
+        self.dones = np.zeros(n_pairs, dtype=bool)
+        self.visited = np.zeros(n_pairs, dtype=bool)
+        self._pairs = np.zeros(n_pairs, dtype=np.int64)
+        self._n_visited = 0
+        self.rng = np.random.default_rng(seed)
+
+    def __len__(self) -> int:
+        return self._n_visited
+
+    def add(self, s: int, a: int, r: float, s_next: int, done: bool) -> None:
+        pair = s * self.n_actions + a
+        self.next_states[pair] = s_next
+        self.rewards[pair] = r
+        self.dones[pair] = done
+        if not self.visited[pair]:
+            self.visited[pair] = True
+            self._pairs[self._n_visited] = pair
+            self._n_visited += 1
+
+    def sample(self, batch_size: int) -> TransitionBatch:
+        """Draw visited (s, a) pairs uniformly and return their outcomes."""
+        pairs = self._pairs[self.rng.integers(self._n_visited, size=batch_size)]
+        states, actions = np.divmod(pairs, self.n_actions)
+        return TransitionBatch(
+            pairs,
+            states,
+            actions,
+            self.rewards[pairs],
+            self.next_states[pairs],
+            self.dones[pairs],
+            np.ones(batch_size),
+        )
+
+
+def dyna_q(  # noqa: PLR0913
+    env: GridWorld,
+    params: QLearningHyperparameters = QLearningHyperparameters(),
+    *,
+    planning_steps: int = 10,
+    buffer: Optional[ReplayBuffer] = None,
+    log_returns: bool = False,
+    seed: Optional[int] = None,
+) -> np.ndarray:
+    """Dyna-Q: Q-learning plus ``planning_steps`` simulated updates per real step.
+
+    After every real transition the agent performs one ordinary Q-learning
+    update and then replays ``planning_steps`` remembered transitions as one
+    vectorized `td_update`. Without a ``buffer`` the memory is the classic
+    tabular Dyna model, i.e. the last observed (s', r, done) for every visited
+    (s, a), kept in (n_states, n_actions) arrays. With a `ReplayBuffer` the
+    planning batch is sampled from stored real transitions instead, which
+    stays unbiased when moves slip; a `PrioritizedReplayBuffer` additionally
+    gets its priorities refreshed from the replayed TD errors.
+
+    Args:
+        env (GridWorld): The environment to learn from.
+        params (QLearningHyperparameters, optional): Hyperparameters for
+            Q-learning. Defaults to `QLearningHyperparameters()`.
+        planning_steps (int, optional): Simulated updates per real step.
+            Defaults to 10.
+        buffer (Optional[ReplayBuffer], optional): Replay memory to plan from.
+            Defaults to None (tabular model).
+        log_returns (bool, optional): Whether to log cumulative returns per
+            episode. Defaults to False.
+        seed (Optional[int], optional): Seed for ε-greedy and model sampling.
+            Defaults to None.
+
+    Returns:
+        np.ndarray: The learned Q-table, a 2D array of shape (n_states, n_actions).
+                    If log_returns is True, also returns a list of cumulative rewards.
+    """
+    Q = np.zeros((env.n_states, env.n_actions))
+    returns_log = []
+    rng = np.random.default_rng(seed)
+    memory = buffer
+    if memory is None:
+        memory = TabularModel(env.n_states, env.n_actions, seed=rng)
+
+    for episode in range(params.episodes):
+        epsilon = params.epsilon_at(episode)
+        s = env.reset()
+        done = False
+        cumulative_reward = 0
+        while not done:
+            # ε-greedy
+            if rng.random() < epsilon:
+                a = int(rng.integers(env.n_actions))
+            else:
+                a = int(np.argmax(Q[s]))
+            s_next, r, done = env.step(a)
+            target = r + params.gamma * np.max(Q[s_next]) * (not done)
+            Q[s, a] += params.alpha * (target - Q[s, a])
+            memory.add(s, a, r, s_next, done)
+            if planning_steps > 0:
+                _plan(Q, memory, planning_steps, params)
+            s = s_next
+            cumulative_reward += r
+        if log_returns:
+            returns_log.append(cumulative_reward)
+
+    if log_returns:
+        return Q, returns_log
+    return Q
+
+
+def _plan(
+    Q: np.ndarray,
+    memory: ReplayBuffer,
+    planning_steps: int,
+    params: QLearningHyperparameters,
+) -> None:
+    """Replay ``planning_steps`` remembered transitions as one batched update."""
+    batch = memory.sample(planning_steps)
+    s, a = batch.states, batch.actions
+    targets = (
+        batch.rewards
+        + params.gamma * np.max(Q[batch.next_states], axis=1) * ~batch.dones
+    )
+    td = targets - Q[s, a]
+    # importance weights scale the step: move towards Q + w * td
+    td_update(Q, s, a, Q[s, a] + batch.weights * td, params.alpha)
+    if isinstance(memory, PrioritizedReplayBuffer):
+        memory.update_priorities(batch.indices, td)
@@ -1,4 +1,7 @@
-from typing import Tuple
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+import numpy as np
 
 ACTION_SPACE = {
     0: (-1, 0),  # N
@@ -7,31 +10,179 @@ ACTION_SPACE = {
     3: (0, -1),
 }  # W
 
+# Cell codes of a layout array.
+EMPTY, WALL, GOAL, HAZARD, START = 0, 1, 2, 3, 4
+
+
+@dataclass(frozen=True)
+class Rewards:
+    """Reward for entering an ordinary cell, a goal and a hazard.
+
+    Set ``step=0`` for sparse-reward tasks where only terminal cells pay out.
+    """
+
+    step: float = -1
+    goal: float = 10
+    hazard: float = -10
+
 
 class GridWorld:
-    """Deterministic 4x4 GridWorld with step cost -1 and goal +10."""
+    """GridWorld with walls, goals, hazards and slippery moves.
+
+    The default is the deterministic 4x4 open grid with step cost -1 and goal
+    +10 starting in (0, 0). Arbitrary layouts come from `from_layout`.
+
+    All dynamics live in flat per-state lookup tables computed once per layout
+    (``next_state[s, a]``, ``reward[s']``, ``terminal[s']``), so `step` is an
+    O(1) array index and a 1000x1000 grid (10^6 states) needs a few tens of MB
+    rather than one Python object per cell. Moving off the grid or into a wall
+    leaves the agent in place; entering a goal or hazard ends the episode.
+    """
 
-    def __init__(self, size: int = 4, goal: Tuple[int, int] = (3, 3)) -> None:
-        """Initialize the GridWorld environment.
+    def __init__(
+        self,
+        size: int = 4,
+        goal: Tuple[int, int] = (3, 3),
+        *,
+        slip: float = 0.0,
+        seed: Optional[int] = None,
+    ) -> None:
+        """Initialize an open size x size GridWorld.
 
         Args:
             size (int, optional): The size of the grid (size x size). Defaults to 4.
             goal (Tuple[int, int], optional): The (row, col) coordinates of the goal
                                               state. Defaults to (3, 3).
+            slip (float, optional): Probability that an action is replaced by a
+                uniformly random one. Defaults to 0.0 (deterministic).
+            seed (Optional[int], optional): Seed for slips and random starts.
+                Defaults to None.
+        """
+        layout = np.full((size, size), EMPTY, dtype=np.int8)
+        layout[goal] = GOAL
+        self._build(layout, slip, None, Rewards(), seed)
+
+    @classmethod
+    def from_layout(
+        cls,
+        layout: np.ndarray,
+        *,
+        slip: float = 0.0,
+        start_probs: Optional[np.ndarray] = None,
+        rewards: Rewards = Rewards(),
+        seed: Optional[int] = None,
+    ) -> "GridWorld":
+        """Build a GridWorld from a 2D array of cell codes.
+
+        Args:
+            layout (np.ndarray): Array of ``EMPTY``, ``WALL``, ``GOAL``,
+                ``HAZARD`` and ``START`` codes, e.g. loaded with ``np.load``.
+                It must contain at least one goal.
+            slip (float, optional): Probability that an action is replaced by a
+                uniformly random one. Defaults to 0.0.
+            start_probs (Optional[np.ndarray], optional): Start distribution of
+                the same shape as ``layout``. Defaults to uniform over the
+                ``START`` cells, or (0, 0) if there are none.
+            rewards (Rewards, optional): Reward per cell type.
+                Defaults to `Rewards()`.
+            seed (Optional[int], optional): Seed for slips and random starts.
+                Defaults to None.
+
+        Returns:
+            GridWorld: The environment.
         """
-        self.size = size
-        self.goal = goal
-        self.state = (0, 0)
+        env = cls.__new__(cls)
+        env._build(np.asarray(layout), slip, start_probs, rewards, seed)
+        return env
+
+    def _build(
+        self,
+        layout: np.ndarray,
+        slip: float,
+        start_probs: Optional[np.ndarray],
+        rewards: Rewards,
+        seed: Optional[int],
+    ) -> None:
+        """Validate ``layout`` and precompute the lookup tables."""
+        if layout.ndim != 2:  # noqa: PLR2004
+            raise ValueError("layout must be a 2D array of cell codes.")
+        if not 0.0 <= slip <= 1.0:
+            raise ValueError("slip must be a probability in [0, 1].")
+        goals = np.argwhere(layout == GOAL)
+        if goals.size == 0:
+            raise ValueError("layout must contain at least one GOAL cell.")
+
+        self.layout = layout.astype(np.int8)
+        self.n_rows, self.n_cols = layout.shape
+        # `size` is the row stride of state IDs (the side of a square grid).
+        self.size = self.n_cols
+        self.n_states, self.n_actions = layout.size, len(ACTION_SPACE)
+        self.goal = (int(goals[0, 0]), int(goals[0, 1]))
+        self.slip = slip
+        self.rewards = rewards
+        self.rng = np.random.default_rng(seed)
+
+        cells = self.layout.reshape(-1)
+        index_dtype = np.int32 if self.n_states < 2**31 else np.int64
+        states = np.arange(self.n_states, dtype=index_dtype)
+        rows, cols = np.divmod(states, self.n_cols)
+        deltas = np.array([ACTION_SPACE[a] for a in range(self.n_actions)])
+        nr = rows[:, None] + deltas[:, 0].astype(index_dtype)
+        nc = cols[:, None] + deltas[:, 1].astype(index_dtype)
+        inside = (nr >= 0) & (nr < self.n_rows) & (nc >= 0) & (nc < self.n_cols)
+        target = np.where(inside, nr * self.n_cols + nc, states[:, None])
+        blocked = cells[target] == WALL
+        self._next_state = np.where(blocked, states[:, None], target)
+
+        reward_values = np.array([rewards.step, rewards.goal, rewards.hazard])
+        kind = np.select([cells == GOAL, cells == HAZARD], [1, 2], default=0)
+        self._reward = reward_values[kind]
+        self._terminal = (cells == GOAL) | (cells == HAZARD)
+
+        if start_probs is None:
+            start_probs = (cells == START).astype(float)
+            if not start_probs.any():
+                start_probs[0] = 1.0
+        start_probs = np.asarray(start_probs, dtype=float).reshape(-1)
+        if start_probs.size != self.n_states or (start_probs < 0).any():
+            raise ValueError("start_probs must be non-negative, one per cell.")
+        self._start_states = np.flatnonzero(start_probs).astype(index_dtype)
+        if self._start_states.size == 0:
+            raise ValueError("start_probs must put mass on at least one cell.")
+        start_cells = cells[self._start_states]
+        if (start_cells == WALL).any() or self._terminal[self._start_states].any():
+            raise ValueError("Start cells must not be walls, goals or hazards.")
+        cdf = np.cumsum(start_probs[self._start_states])
+        self._start_cdf = cdf / cdf[-1]
+        self._s = int(self._start_states[0])
+
+    @property
+    def state(self) -> Tuple[int, int]:
+        """Current (row, col) of the agent."""
+        return divmod(self._s, self.n_cols)
+
+    @state.setter
+    def state(self, rc: Tuple[int, int]) -> None:
+        self._s = self._state_id(rc)
+
+    def seed(self, seed: Optional[int] = None) -> None:
+        """Reseed the RNG behind slips and random starts."""
+        self.rng = np.random.default_rng(seed)
 
     def reset(self) -> int:
-        self.state = (0, 0)
-        return self._state_id(self.state)
+        if self._start_states.size == 1:
+            self._s = int(self._start_states[0])
+        else:
+            self._s = int(self.batch_reset(1)[0])
+        return self._s
 
     def step(self, action: int) -> Tuple[int, int, bool]:
         """Take an action in the environment.
 
         The agent moves one step in the specified direction. If the move
-        goes off the grid, the agent stays in its current position.
+        goes off the grid or into a wall, the agent stays in its current
+        position. With probability ``slip`` the action is first replaced by
+        a uniformly random one.
 
         Args:
             action (int): The action to take, corresponding to an index in ACTION_SPACE
@@ -40,19 +191,84 @@ class GridWorld:
         Returns:
             Tuple[int, int, bool]: A tuple containing:
                 - next_state_id (int): The ID of the state after taking the action.
-                - reward (int): The reward received for taking the action (-1 for a
-                                normal step, +10 if the goal is reached).
-                - done (bool): True if the goal state is reached, False otherwise.
+                - reward (int): The reward for entering the new cell (-1 for a
+                                normal step, +10 for a goal by default).
+                - done (bool): True if a goal or hazard was entered, False otherwise.
+        """
+        if self.slip and self.rng.random() < self.slip:
+            action = self.rng.integers(self.n_actions)
+        s = int(self._next_state[self._s, action])
+        self._s = s
+        return s, self._reward[s], bool(self._terminal[s])
+
+    def batch_reset(self, n: int) -> np.ndarray:
+        """Return a start state ID for each of ``n`` parallel episodes."""
+        if self._start_states.size == 1:
+            return np.full(n, self._start_states[0], dtype=np.int64)
+        picks = np.searchsorted(self._start_cdf, self.rng.random(n), side="right")
+        return self._start_states[np.minimum(picks, self._start_states.size - 1)]
+
+    def batch_step(
+        self, states: np.ndarray, actions: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Vectorized counterpart of `step` for a batch of independent episodes.
+
+        Unlike `step`, this does not touch ``self.state``; the caller owns the
+        batch of current state IDs.
+
+        Args:
+            states (np.ndarray): Current state IDs, shape (n,).
+            actions (np.ndarray): Action index for each state, shape (n,).
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray, np.ndarray]: Next state IDs, rewards and
+            done flags, each of shape (n,).
         """
-        dr, dc = ACTION_SPACE[action]
-        r, c = self.state
-        nr, nc = max(0, min(self.size - 1, r + dr)), max(0, min(self.size - 1, c + dc))
-        self.state = (nr, nc)
-        done = self.state == self.goal
-        reward = 10 if done else -1
-        return self._state_id(self.state), reward, done
+        if self.slip:
+            slipped = self.rng.random(len(states)) < self.slip
+            random_actions = self.rng.integers(self.n_actions, size=len(states))
+            actions = np.where(slipped, random_actions, actions)
+        next_states = self._next_state[states, actions]
+        return next_states, self._reward[next_states], self._terminal[next_states]
+
+    def transition_table(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Export the transition model as (n_states, n_actions) lookup tables.
+
+        This is the sparse form of the P[s, a, s'] tensor: each (s, a) has a
+        single intended successor, so storage is O(n_states * n_actions) and
+        scales to grids far too large for `transition_tensor`. With ``slip``
+        > 0 the executed action is instead uniform with probability ``slip``.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray, np.ndarray]: ``next_state[s, a]``,
+            ``reward[s, a]`` and ``done[s, a]`` (the move ends the episode).
+            ``next_state`` is a read-only view of the environment's own table.
+        """
+        next_states = self._next_state.view()
+        next_states.setflags(write=False)
+        return next_states, self._reward[next_states], self._terminal[next_states]
+
+    def transition_tensor(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Dense transition tensor P[s, a, s'] and expected reward R[s, a].
+
+        Memory is O(n_states**2 * n_actions); prefer `transition_table` for
+        anything but small grids.
+        """
+        next_states, rewards, _ = self.transition_table()
+        P = np.zeros((self.n_states, self.n_actions, self.n_states))
+        s, a = np.indices(next_states.shape)
+        P[s, a, next_states] = 1.0
+        R = rewards.astype(float)
+        if self.slip:
+            P = (1 - self.slip) * P + self.slip * P.mean(axis=1, keepdims=True)
+            R = (1 - self.slip) * R + self.slip * R.mean(axis=1, keepdims=True)
+        return P, R
+
+    def terminal_mask(self) -> np.ndarray:
+        """Boolean mask over state IDs marking states that end an episode."""
+        return self._terminal.copy()
 
     # helpers
     def _state_id(self, rc: Tuple[int, int]) -> int:
         """Convert (row, col) coordinates to a unique state ID."""
-        return rc[0] * self.size + rc[1]
+        return rc[0] * self.n_cols + rc[1]
@@ -0,0 +1,105 @@
+import time
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+import numpy as np
+
+
+@dataclass
+class TrainingMetrics:
+    """Per-episode training statistics in preallocated arrays.
+
+    Every array has one slot per budgeted episode; only the first
+    ``n_episodes`` slots are filled (fewer than the budget after an early
+    stop). ``elapsed`` is wall time since training started, in seconds.
+    """
+
+    returns: np.ndarray
+    lengths: np.ndarray
+    td_abs_mean: np.ndarray
+    td_abs_max: np.ndarray
+    q_delta_norm: np.ndarray
+    epsilon: np.ndarray
+    elapsed: np.ndarray
+    n_episodes: int = 0
+
+    @classmethod
+    def allocate(cls, episodes: int) -> "TrainingMetrics":
+        return cls(
+            returns=np.zeros(episodes),
+            lengths=np.zeros(episodes, dtype=np.int64),
+            td_abs_mean=np.zeros(episodes),
+            td_abs_max=np.zeros(episodes),
+            q_delta_norm=np.zeros(episodes),
+            epsilon=np.zeros(episodes),
+            elapsed=np.zeros(episodes),
+        )
+
+    @property
+    def steps_per_second(self) -> float:
+        """Average environment steps per second over the episodes so far."""
+        if self.n_episodes == 0:
+            return 0.0
+        return float(self.lengths[: self.n_episodes].sum()) / float(
+            self.elapsed[self.n_episodes - 1]
+        )
+
+
+class TrainingMonitor:
+    """Instrumentation hook for `q_learning`.
+
+    Pass one as ``q_learning(..., monitor=monitor)``. It fills
+    ``monitor.metrics`` during training, calls ``callback(metrics, episode)``
+    every ``every`` episodes and after the last budgeted one (a truthy return
+    value stops training), and optionally stops once the policy has
+    stabilized: when the Frobenius norm of the per-episode Q-table change
+    stays at or below ``stop_tol`` for ``patience`` consecutive episodes.
+    """
+
+    def __init__(
+        self,
+        every: int = 100,
+        callback: Optional[Callable[[TrainingMetrics, int], Optional[bool]]] = None,
+        stop_tol: Optional[float] = None,
+        patience: int = 20,
+    ) -> None:
+        if every < 1:
+            raise ValueError("every must be at least 1.")
+        if patience < 1:
+            raise ValueError("patience must be at least 1.")
+        self.every = every
+        self.callback = callback
+        self.stop_tol = stop_tol
+        self.patience = patience
+        self.metrics: Optional[TrainingMetrics] = None
+        self._start = 0.0
+        self._calm_episodes = 0
+
+    def start(self, episodes: int) -> None:
+        """Allocate metric arrays for a run of ``episodes`` episodes."""
+        self.metrics = TrainingMetrics.allocate(episodes)
+        self._start = time.perf_counter()
+        self._calm_episodes = 0
+
+    def record(self, stats, epsilon: float) -> bool:
+        """Store one episode's `EpisodeStats`; return True to stop training."""
+        m = self.metrics
+        i = m.n_episodes
+        m.returns[i] = stats.reward
+        m.lengths[i] = stats.length
+        m.td_abs_mean[i] = stats.td_abs_sum / max(stats.length, 1)
+        m.td_abs_max[i] = stats.td_abs_max
+        m.q_delta_norm[i] = stats.q_delta_norm
+        m.epsilon[i] = epsilon
+        m.elapsed[i] = time.perf_counter() - self._start
+        m.n_episodes = i + 1
+
+        stop = False
+        due = m.n_episodes % self.every == 0 or m.n_episodes == m.returns.size
+        if self.callback is not None and due:
+            stop = bool(self.callback(m, m.n_episodes))
+        if self.stop_tol is not None:
+            calm = stats.q_delta_norm <= self.stop_tol
+            self._calm_episodes = self._calm_episodes + 1 if calm else 0
+            stop = stop or self._calm_episodes >= self.patience
+        return stop
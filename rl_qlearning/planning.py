@@ -0,0 +1,145 @@
+from dataclasses import dataclass
+from typing import Tuple
+
+import numpy as np
+
+from .env import GridWorld
+
+
+@dataclass
+class PlanningStats:
+    """Convergence report of a planner.
+
+    ``iterations`` counts Bellman-optimality sweeps for value iteration and
+    policy-improvement steps for policy iteration; ``evaluation_sweeps`` counts
+    the policy-evaluation sweeps spent by policy iteration.
+    """
+
+    iterations: int
+    delta: float
+    converged: bool
+    evaluation_sweeps: int = 0
+
+
+def _discounted_model(
+    env: GridWorld, gamma: float
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Transition table with ``gamma`` folded into a per-(s, a) discount."""
+    next_state, reward, done = env.transition_table()
+    return next_state, reward.astype(float), np.where(done, 0.0, gamma)
+
+
+def _backup(V: np.ndarray, model: Tuple[np.ndarray, ...], slip: float) -> np.ndarray:
+    """One-step lookahead Q[s, a] = E[r + gamma * V[s']] for every (s, a).
+
+    With probability ``slip`` the executed action is uniform over all actions,
+    so the expectation mixes the intended backup with the per-state mean.
+    """
+    next_state, reward, discount = model
+    Q = reward + discount * V[next_state]
+    if slip:
+        Q = (1 - slip) * Q + slip * Q.mean(axis=1, keepdims=True)
+    return Q
+
+
+def value_iteration(
+    env: GridWorld,
+    gamma: float = 0.9,
+    tol: float = 1e-8,
+    max_iter: int = 10_000,
+) -> Tuple[np.ndarray, PlanningStats]:
+    """Compute the optimal Q-table of a known GridWorld by value iteration.
+
+    Each sweep is a single vectorized Bellman-optimality backup over the
+    `GridWorld.transition_table`, so its cost is O(n_states * n_actions).
+
+    Args:
+        env (GridWorld): The environment whose model is planned over.
+        gamma (float, optional): Discount factor (< 1). Defaults to 0.9.
+        tol (float, optional): Stop once the max-norm change of V drops below
+            this. Defaults to 1e-8.
+        max_iter (int, optional): Maximum number of sweeps. Defaults to 10_000.
+
+    Returns:
+        Tuple[np.ndarray, PlanningStats]: The Q-table, of the same shape as the
+        one `q_learning` returns and usable with `greedy_policy`, and the
+        convergence stats.
+    """
+    model = _discounted_model(env, gamma)
+    terminal = env.terminal_mask()
+    V = np.zeros(terminal.size)
+    delta = np.inf
+    for iteration in range(1, max_iter + 1):
+        Q = _backup(V, model, env.slip)
+        Q[terminal] = 0.0
+        V_new = Q.max(axis=1)
+        delta = float(np.abs(V_new - V).max())
+        V = V_new
+        if delta < tol:
+            return Q, PlanningStats(iteration, delta, converged=True)
+    return Q, PlanningStats(max_iter, delta, converged=False)
+
+
+def policy_iteration(
+    env: GridWorld,
+    gamma: float = 0.9,
+    tol: float = 1e-8,
+    max_iter: int = 1_000,
+) -> Tuple[np.ndarray, PlanningStats]:
+    """Compute the optimal Q-table of a known GridWorld by policy iteration.
+
+    Policies are evaluated with vectorized iterative sweeps (warm-started from
+    the previous value function) rather than a dense linear solve, so memory
+    stays O(n_states * n_actions). Ties in the improvement step keep the
+    current action, which guarantees termination. If a policy's evaluation
+    does not settle within ``max_iter`` sweeps (e.g. ``gamma=1`` with a policy
+    that never reaches a terminal, whose values diverge), planning stops and
+    reports ``converged=False``.
+
+    Args:
+        env (GridWorld): The environment whose model is planned over.
+        gamma (float, optional): Discount factor (< 1). Defaults to 0.9.
+        tol (float, optional): Policy-evaluation tolerance on the max-norm
+            change of V. Defaults to 1e-8.
+        max_iter (int, optional): Maximum number of improvement steps, and
+            of evaluation sweeps per policy. Defaults to 1_000.
+
+    Returns:
+        Tuple[np.ndarray, PlanningStats]: The Q-table of the final policy and
+        the convergence stats.
+    """
+    model = _discounted_model(env, gamma)
+    next_state, reward, discount = model
+    terminal = env.terminal_mask()
+    states = np.arange(terminal.size)
+    policy = np.zeros(terminal.size, dtype=np.int64)
+    V = np.zeros(terminal.size)
+    sweeps = 0
+    for iteration in range(1, max_iter + 1):
+        # evaluate the current policy
+        ns_pi, r_pi = next_state[states, policy], reward[states, policy]
+        discount_pi = discount[states, policy]
+        delta = np.inf
+        for _ in range(max_iter):
+            V_new = r_pi + discount_pi * V[ns_pi]
+            if env.slip:
+                V_new = (1 - env.slip) * V_new + env.slip * _backup(V, model, 0.0).mean(
+                    axis=1
+                )
+            V_new[terminal] = 0.0
+            delta = float(np.abs(V_new - V).max())
+            V = V_new
+            sweeps += 1
+            if delta < tol:
+                break
+        # improve it greedily, keeping the current action on ties
+        Q = _backup(V, model, env.slip)
+        Q[terminal] = 0.0
+        if delta >= tol:
+            return Q, PlanningStats(iteration, delta, False, sweeps)
+        best = Q.argmax(axis=1)
+        improved = Q[states, best] > Q[states, policy] + tol
+        if not improved.any():
+            return Q, PlanningStats(iteration, delta, True, sweeps)
+        policy = np.where(improved, best, policy)
+    return Q, PlanningStats(max_iter, delta, False, sweeps)
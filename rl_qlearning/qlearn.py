@@ -1,9 +1,11 @@
+import math
 from dataclasses import dataclass
-from typing import List
+from typing import List, NamedTuple, Optional, Union
 
 import numpy as np
 
-from .env import ACTION_SPACE, GridWorld
+from .env import GridWorld
+from .metrics import TrainingMonitor
 
 
 @dataclass
@@ -12,12 +14,35 @@ class QLearningHyperparameters:
     gamma: float = 0.9
     epsilon: float = 0.1
     episodes: int = 5000
+    # ε decays geometrically per episode down to epsilon_min; 1.0 keeps it fixed
+    epsilon_decay: float = 1.0
+    epsilon_min: float = 0.0
 
+    def epsilon_at(self, episode: int) -> float:
+        """Exploration rate used in the given (0-based) episode."""
+        if self.epsilon_decay == 1.0:
+            return self.epsilon
+        return max(self.epsilon_min, self.epsilon * self.epsilon_decay**episode)
 
-def q_learning(
+
+class EpisodeStats(NamedTuple):
+    """Summary of one training episode, as returned by `_run_episode`."""
+
+    reward: float
+    length: int
+    td_abs_sum: float
+    td_abs_max: float
+    q_delta_norm: float
+
+
+def q_learning(  # noqa: PLR0913
     env: GridWorld,
     params: QLearningHyperparameters = QLearningHyperparameters(),
     log_returns: bool = False,
+    seed: Optional[Union[int, np.random.SeedSequence]] = None,
+    q_init: Optional[np.ndarray] = None,
+    *,
+    monitor: Optional[TrainingMonitor] = None,
 ) -> np.ndarray:
     """Perform tabular Q-learning to find the optimal Q-function.
 
@@ -28,38 +53,87 @@ def q_learning(
             Defaults to `QLearningHyperparameters()`.
         log_returns (bool, optional): Whether to log cumulative returns per episode.
                                       Defaults to False.
+        seed (Optional[Union[int, np.random.SeedSequence]], optional): Seed for
+            the ε-greedy RNG; runs with the same seed are reproducible.
+            Defaults to None (fresh OS entropy).
+        q_init (Optional[np.ndarray], optional): Q-table to warm-start from,
+            e.g. one restored with `load_checkpoint` or ``np.load``; it is
+            copied, not modified. Defaults to None (all zeros).
+        monitor (Optional[TrainingMonitor], optional): Collects per-episode
+            metrics (returns, lengths, TD errors, Q-table deltas, ε, wall
+            time), streams them to a callback and may stop training early.
+            The return value is unaffected. Defaults to None.
 
     Returns:
         np.ndarray: The learned Q-table, a 2D array of shape (n_states, n_actions).
                     If log_returns is True, also returns a list of cumulative rewards.
     """
-    n_states, n_actions = env.size**2, len(ACTION_SPACE)
-    Q = np.zeros((n_states, n_actions))
+    Q = _initial_q(env, q_init)
     returns_log = []
 
-    rng = np.random.default_rng()
+    rng = np.random.default_rng(seed)
+    if monitor is not None:
+        monitor.start(params.episodes)
     for episode in range(params.episodes):
-        s = env.reset()
-        done = False
-        cumulative_reward = 0
-        while not done:
-            # ε-greedy
-            if rng.random() < params.epsilon:
-                a = rng.integers(n_actions)
-            else:
-                a = int(np.argmax(Q[s]))
-            s_next, r, done = env.step(a)
-            Q[s, a] += params.alpha * (r + params.gamma * np.max(Q[s_next]) - Q[s, a])
-            s = s_next
-            cumulative_reward += r
+        epsilon = params.epsilon_at(episode)
+        stats = _run_episode(env, Q, params, rng, epsilon)
         if log_returns:
-            returns_log.append(cumulative_reward)
+            returns_log.append(stats.reward)
+        if monitor is not None and monitor.record(stats, epsilon):
+            break
 
     if log_returns:
         return Q, returns_log
     return Q
 
 
+def _initial_q(env: GridWorld, q_init: Optional[np.ndarray]) -> np.ndarray:
+    """Fresh zero Q-table, or a float copy of ``q_init`` checked against env."""
+    shape = (env.n_states, env.n_actions)
+    if q_init is None:
+        return np.zeros(shape)
+    if q_init.shape != shape:
+        raise ValueError(f"q_init has shape {q_init.shape}, expected {shape}.")
+    return np.array(q_init, dtype=float)
+
+
+def _run_episode(
+    env: GridWorld,
+    Q: np.ndarray,
+    params: QLearningHyperparameters,
+    rng: np.random.Generator,
+    epsilon: float,
+) -> EpisodeStats:
+    """Run one ε-greedy episode, updating ``Q`` in place; summarize it."""
+    n_actions = Q.shape[1]
+    s = env.reset()
+    done = False
+    cumulative_reward = 0
+    steps, td_abs_sum, td_abs_max = 0, 0.0, 0.0
+    q_before = {}  # first value of every touched entry, for the delta norm
+    while not done:
+        # ε-greedy
+        if rng.random() < epsilon:
+            a = rng.integers(n_actions)
+        else:
+            a = int(Q[s].argmax())
+        s_next, r, done = env.step(a)
+        q_sa = Q[s, a]
+        td = r + params.gamma * Q[s_next].max() - q_sa
+        q_before.setdefault((s, a), q_sa)
+        Q[s, a] = q_sa + params.alpha * td
+        s = s_next
+        cumulative_reward += r
+        steps += 1
+        td_abs = abs(td)
+        td_abs_sum += td_abs
+        td_abs_max = max(td_abs_max, td_abs)
+    q_delta_norm = math.sqrt(sum((Q[sa] - q) ** 2 for sa, q in q_before.items()))
+    return EpisodeStats(
+        cumulative_reward, steps, float(td_abs_sum), float(td_abs_max), q_delta_norm
+    )
+
+
 def greedy_policy(Q: np.ndarray) -> List[int]:
     """Extract the greedy policy from a Q-table.
 
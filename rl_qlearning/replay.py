@@ -0,0 +1,162 @@
+import math
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+
+@dataclass
+class TransitionBatch:
+    """A sampled batch of transitions plus their buffer slots.
+
+    ``weights`` are importance-sampling corrections; they are all ones for
+    uniform sampling.
+    """
+
+    indices: np.ndarray
+    states: np.ndarray
+    actions: np.ndarray
+    rewards: np.ndarray
+    next_states: np.ndarray
+    dones: np.ndarray
+    weights: np.ndarray
+
+
+class ReplayBuffer:
+    """Fixed-capacity ring buffer of (s, a, r, s', done) transitions.
+
+    Storage is preallocated as one NumPy array per field, so adding and
+    sampling never allocate per transition; once full, the oldest
+    transitions are overwritten.
+    """
+
+    def __init__(self, capacity: int, seed: Optional[int] = None) -> None:
+        if capacity <= 0:
+            raise ValueError("capacity must be positive.")
+        self.capacity = capacity
+        self.states = np.zeros(capacity, dtype=np.int64)
+        self.actions = np.zeros(capacity, dtype=np.int64)
+        self.rewards = np.zeros(capacity)
+        self.next_states = np.zeros(capacity, dtype=np.int64)
+        self.dones = np.zeros(capacity, dtype=bool)
+        self.rng = np.random.default_rng(seed)
+        self._size = 0
+        self._pos = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(self, s, a, r, s_next, done) -> np.ndarray:
+        """Append one transition, or a batch given as equal-length arrays.
+
+        Returns:
+            np.ndarray: The buffer slots that were written.
+        """
+        s = np.atleast_1d(s)
+        a, r, s_next, done = (np.broadcast_to(v, s.shape) for v in (a, r, s_next, done))
+        # only the newest `capacity` transitions of an oversized batch survive
+        keep = slice(max(0, s.size - self.capacity), None)
+        slots = (self._pos + np.arange(s.size)[keep]) % self.capacity
+        self.states[slots] = s[keep]
+        self.actions[slots] = a[keep]
+        self.rewards[slots] = r[keep]
+        self.next_states[slots] = s_next[keep]
+        self.dones[slots] = done[keep]
+        self._pos = (self._pos + s.size) % self.capacity
+        self._size = min(self._size + s.size, self.capacity)
+        return slots
+
+    def sample(self, batch_size: int) -> TransitionBatch:
+        """Draw ``batch_size`` stored transitions uniformly with replacement."""
+        if self._size == 0:
+            raise ValueError("Cannot sample from an empty buffer.")
+        indices = self.rng.integers(self._size, size=batch_size)
+        return self._gather(indices, np.ones(batch_size))
+
+    def _gather(self, indices: np.ndarray, weights: np.ndarray) -> TransitionBatch:
+        return TransitionBatch(
+            indices,
+            self.states[indices],
+            self.actions[indices],
+            self.rewards[indices],
+            self.next_states[indices],
+            self.dones[indices],
+            weights,
+        )
+
+
+class PrioritizedReplayBuffer(ReplayBuffer):
+    """Replay buffer sampling transitions proportionally to their TD error.
+
+    Transition i is drawn with probability p_i^alpha / sum_j p_j^alpha, where
+    p_i = |TD error| + eps; new transitions get the largest priority written
+    so far, so each is replayed at least once with high probability.
+
+    The scaled priorities p_i^alpha are kept in a two-level sum tree: blocks
+    of about sqrt(capacity) slots plus one running sum per block. Writing
+    priorities only re-sums the blocks they touch, and a draw picks a block
+    from the block sums and then a slot within it, so both cost
+    O(sqrt(capacity)) per transition instead of O(capacity), with a handful
+    of vectorized calls per batch. ``alpha`` is applied when priorities are
+    written and must not change afterwards.
+    """
+
+    def __init__(
+        self,
+        capacity: int,
+        alpha: float = 0.6,
+        beta: float = 0.4,
+        seed: Optional[int] = None,
+    ) -> None:
+        super().__init__(capacity, seed)
+        self.alpha = alpha
+        self.beta = beta
+        self.eps = 1e-6
+        self.priorities = np.zeros(capacity)
+        self.max_priority = 1.0
+        block = max(1, math.isqrt(capacity))
+        n_blocks = -(-capacity // block)
+        self._scaled = np.zeros((n_blocks, block))
+        self._block_sums = np.zeros(n_blocks)
+
+    def add(self, s, a, r, s_next, done) -> np.ndarray:
+        slots = super().add(s, a, r, s_next, done)
+        self._set_priorities(slots, np.full(slots.size, self.max_priority))
+        return slots
+
+    def sample(self, batch_size: int) -> TransitionBatch:
+        """Draw transitions by priority, with normalized importance weights."""
+        if self._size == 0:
+            raise ValueError("Cannot sample from an empty buffer.")
+        cdf = np.cumsum(self._block_sums)
+        total = cdf[-1]
+        draws = self.rng.random(batch_size) * total
+        # Rounding may push a draw past the last block or slot with mass,
+        # so both searches stop at the first position reaching the total
+        blocks = np.minimum(
+            np.searchsorted(cdf, draws, side="right"), np.count_nonzero(cdf < total)
+        )
+        draws -= cdf[blocks] - self._block_sums[blocks]
+        within = np.cumsum(self._scaled[blocks], axis=1)
+        offsets = np.minimum(
+            np.count_nonzero(within <= draws[:, None], axis=1),
+            np.count_nonzero(within < within[:, -1:], axis=1),
+        )
+        indices = blocks * self._scaled.shape[1] + offsets
+        probs = self._scaled[blocks, offsets] / total
+        weights = (self._size * probs) ** -self.beta
+        return self._gather(indices, weights / weights.max())
+
+    def update_priorities(self, indices: np.ndarray, td_errors: np.ndarray) -> None:
+        """Set the priorities of replayed transitions from their new TD errors."""
+        priorities = np.abs(td_errors) + self.eps
+        self._set_priorities(np.asarray(indices), priorities)
+        self.max_priority = float(priorities.max(initial=self.max_priority))
+
+    def _set_priorities(self, slots: np.ndarray, priorities: np.ndarray) -> None:
+        """Write priorities and re-sum the blocks holding them."""
+        self.priorities[slots] = priorities
+        blocks, offsets = np.divmod(slots, self._scaled.shape[1])
+        self._scaled[blocks, offsets] = self.priorities[slots] ** self.alpha
+        blocks = np.unique(blocks)
+        self._block_sums[blocks] = self._scaled[blocks].sum(axis=1)
@@ -0,0 +1,54 @@
+import os
+from typing import Union
+
+import numpy as np
+
+PathLike = Union[str, os.PathLike]
+
+
+def greedy_actions(Q: np.ndarray) -> np.ndarray:
+    """Greedy action per state as a compact unsigned-integer array.
+
+    Unlike `greedy_policy`, this returns a NumPy array (``uint8`` for up to 256
+    actions) suitable for saving and memory-mapping.
+    """
+    dtype = np.min_scalar_type(Q.shape[1] - 1)
+    return np.argmax(Q, axis=1).astype(dtype)
+
+
+def save_policy(path: PathLike, Q: np.ndarray) -> None:
+    """Save the precomputed greedy policy of ``Q`` as a ``.npy`` file."""
+    np.save(path, greedy_actions(Q))
+
+
+def save_q_table(path: PathLike, Q: np.ndarray) -> None:
+    """Save the full Q-table as a ``.npy`` file."""
+    np.save(path, np.ascontiguousarray(Q))
+
+
+class PolicyServer:
+    """Answer action queries from a saved policy or Q-table without loading it.
+
+    The ``.npy`` file is memory-mapped read-only, so any number of worker
+    processes serving the same file share one copy in the OS page cache and
+    start instantly, even for 10^6-state grids. A 1D policy file (from
+    `save_policy`) answers with a single O(1) lookup; a 2D Q-table (from
+    `save_q_table`) takes the argmax of the queried rows only.
+    """
+
+    def __init__(self, path: PathLike) -> None:
+        self.table = np.load(path, mmap_mode="r")
+        if self.table.ndim not in (1, 2):
+            raise ValueError("Expected a 1D policy or a 2D Q-table.")
+
+    def act(self, state: int) -> int:
+        """Greedy action for one state ID."""
+        if self.table.ndim == 1:
+            return int(self.table[state])
+        return int(np.argmax(self.table[state]))
+
+    def act_batch(self, states: np.ndarray) -> np.ndarray:
+        """Greedy actions for an array of state IDs."""
+        if self.table.ndim == 1:
+            return np.asarray(self.table[states])
+        return np.argmax(self.table[states], axis=1)
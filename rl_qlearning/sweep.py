@@ -0,0 +1,172 @@
+import copy
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from .env import GridWorld
+from .qlearn import QLearningHyperparameters, _run_episode
+
+
+@dataclass
+class EarlyStopping:
+    """Abort runs whose recent returns show a clearly bad configuration.
+
+    Once ``grace`` episodes have been played, a run stops as soon as the mean
+    return over the last ``window`` episodes drops below ``min_return``.
+    """
+
+    min_return: float
+    window: int = 100
+    grace: int = 500
+
+
+@dataclass
+class SweepResult:
+    """Returns curves of a hyperparameter sweep, one row per (config, seed).
+
+    ``returns`` has shape (n_configs, n_seeds, max_episodes) and dtype float32;
+    episodes a run did not play (shorter budget or early stop) are NaN.
+    """
+
+    configs: List[QLearningHyperparameters]
+    returns: np.ndarray
+    episodes_run: np.ndarray
+
+    @property
+    def stopped(self) -> np.ndarray:
+        """Boolean (n_configs, n_seeds) mask of runs cut short by early stopping."""
+        budget = np.array([c.episodes for c in self.configs])
+        return self.episodes_run < budget[:, None]
+
+    def final_returns(self, window: int = 100) -> np.ndarray:
+        """Mean return over the last ``window`` played episodes of every run."""
+        final = np.empty(self.episodes_run.shape)
+        for idx, n in np.ndenumerate(self.episodes_run):
+            final[idx] = self.returns[idx][max(0, n - window) : n].mean()
+        return final
+
+    def best(self, window: int = 100) -> QLearningHyperparameters:
+        """Config with the highest seed-averaged final return."""
+        return self.configs[int(np.argmax(self.final_returns(window).mean(axis=1)))]
+
+
+def grid_search(space: Dict[str, Sequence]) -> List[QLearningHyperparameters]:
+    """Expand ``{"alpha": [...], "gamma": [...], ...}`` into every combination.
+
+    Fields missing from ``space`` keep their `QLearningHyperparameters` default.
+    """
+    names = list(space)
+    return [
+        QLearningHyperparameters(**dict(zip(names, values)))
+        for values in itertools.product(*(space[name] for name in names))
+    ]
+
+
+def random_search(
+    space: Dict[str, Union[Tuple[float, float], Sequence]],
+    n_samples: int,
+    seed: Optional[int] = None,
+) -> List[QLearningHyperparameters]:
+    """Draw ``n_samples`` configs at random from ``space``.
+
+    A ``(low, high)`` tuple is sampled uniformly (inclusive integers when both
+    bounds are ints, e.g. for ``episodes``); any other sequence is sampled as
+    a list of choices.
+    """
+    rng = np.random.default_rng(seed)
+    columns = {}
+    for name, values in space.items():
+        if isinstance(values, tuple):
+            low, high = values
+            if isinstance(low, int) and isinstance(high, int):
+                columns[name] = rng.integers(low, high + 1, size=n_samples).tolist()
+            else:
+                columns[name] = rng.uniform(low, high, size=n_samples).tolist()
+        else:
+            columns[name] = [
+                values[i] for i in rng.integers(len(values), size=n_samples)
+            ]
+    return [
+        QLearningHyperparameters(**{name: col[i] for name, col in columns.items()})
+        for i in range(n_samples)
+    ]
+
+
+def _run_config(
+    env: GridWorld,
+    params: QLearningHyperparameters,
+    seed: np.random.SeedSequence,
+    early_stopping: Optional[EarlyStopping],
+) -> np.ndarray:
+    """Train one run and return its per-episode returns as float32."""
+    agent_seed, env_seed = seed.spawn(2)
+    # Serial runs get the caller's env itself; never reseed it in place
+    env = copy.deepcopy(env)
+    env.seed(env_seed)
+    Q = np.zeros((env.n_states, env.n_actions))
+    rng = np.random.default_rng(agent_seed)
+    returns = np.empty(params.episodes, dtype=np.float32)
+    for episode in range(params.episodes):
+        stats = _run_episode(env, Q, params, rng, params.epsilon_at(episode))
+        returns[episode] = stats.reward
+        if (
+            early_stopping is not None
+            and episode + 1 >= max(early_stopping.grace, early_stopping.window)
+            and returns[episode + 1 - early_stopping.window : episode + 1].mean()
+            < early_stopping.min_return
+        ):
+            return returns[: episode + 1]
+    return returns
+
+
+def sweep(  # noqa: PLR0913
+    env: GridWorld,
+    configs: Sequence[QLearningHyperparameters],
+    *,
+    n_seeds: int = 1,
+    seed: Optional[int] = None,
+    workers: Optional[int] = None,
+    early_stopping: Optional[EarlyStopping] = None,
+) -> SweepResult:
+    """Train every config ``n_seeds`` times, fanning runs out over processes.
+
+    Each run gets its own child of ``np.random.SeedSequence(seed)`` (via
+    ``spawn``), so results depend only on ``seed`` and never on ``workers`` or
+    scheduling order.
+
+    Args:
+        env (GridWorld): Environment template; each run trains on its own copy.
+        configs (Sequence[QLearningHyperparameters]): Configs to evaluate, e.g.
+            from `grid_search` or `random_search`.
+        n_seeds (int, optional): Independent runs per config. Defaults to 1.
+        seed (Optional[int], optional): Root seed of the sweep. Defaults to None.
+        workers (Optional[int], optional): Size of the process pool; ``1`` runs
+            serially in this process. Defaults to None (one per CPU).
+        early_stopping (Optional[EarlyStopping], optional): Rule for aborting
+            clearly bad runs. Defaults to None.
+
+    Returns:
+        SweepResult: The returns curves of all runs.
+    """
+    configs = list(configs)
+    run_params = [params for params in configs for _ in range(n_seeds)]
+    seeds = np.random.SeedSequence(seed).spawn(len(run_params))
+    n_runs = len(run_params)
+    args = ([env] * n_runs, run_params, seeds, [early_stopping] * n_runs)
+    if workers == 1:
+        curves = list(map(_run_config, *args))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            curves = list(pool.map(_run_config, *args))
+
+    max_episodes = max(c.episodes for c in configs)
+    returns = np.full((len(configs), n_seeds, max_episodes), np.nan, dtype=np.float32)
+    episodes_run = np.zeros((len(configs), n_seeds), dtype=np.int64)
+    for i, curve in enumerate(curves):
+        config_idx, seed_idx = divmod(i, n_seeds)
+        returns[config_idx, seed_idx, : curve.size] = curve
+        episodes_run[config_idx, seed_idx] = curve.size
+    return SweepResult(configs, returns, episodes_run)
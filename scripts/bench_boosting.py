@@ -0,0 +1,76 @@
+# pragma: no cover
+"""
+Gradient boosting vs a single DecisionTree at equal wall time.
+The best single tree over a few depths sets the time budget; boosting then
+gets as many rounds as fit in that budget (rate measured on a short run).
+Usage: python -m scripts.bench_boosting
+"""
+
+import time
+
+import numpy as np
+
+from decision_tree.boosting import GradientBoostingClassifier, GradientBoostingRegressor
+from decision_tree.tree import DecisionTree
+
+N_TRAIN, N_TEST, N_FEATURES, PROBE_ROUNDS = 100_000, 50_000, 10, 10
+# (max_depth, learning_rate) of the boosted trees
+BOOSTER_CONFIGS = ((3, 0.3), (6, 0.5))
+
+
+def make_data(n_samples: int, rng: np.random.Generator):
+    X = rng.normal(size=(n_samples, N_FEATURES))
+    f = 2 * np.sin(X[:, 0]) + X[:, 1] * X[:, 2] + 0.5 * np.abs(X[:, 3])
+    return X, f
+
+
+def timed_fit(model, X, y):
+    start = time.perf_counter()
+    model.fit(X, y)
+    return model, time.perf_counter() - start
+
+
+rng = np.random.default_rng(0)
+X_tr, f_tr = make_data(N_TRAIN, rng)
+X_te, f_te = make_data(N_TEST, rng)
+tasks = {
+    "regression": (
+        f_tr + rng.normal(scale=0.5, size=N_TRAIN),
+        f_te,
+        "mse",
+        GradientBoostingRegressor,
+        lambda pred, truth: np.mean((pred - truth) ** 2),
+    ),
+    "classification": (
+        (f_tr + rng.normal(scale=0.5, size=N_TRAIN) > 0).astype(int),
+        (f_te > 0).astype(int),
+        "gini",
+        GradientBoostingClassifier,
+        lambda pred, truth: (pred == truth).mean(),
+    ),
+}
+
+print(f"{'task':>14} {'model':>22} {'fit s':>7} {'test score':>10}")
+for task, (y_tr, y_te, criterion, booster, score) in tasks.items():
+    results = []
+    for depth in (6, 8, 10, 12):
+        tree, seconds = timed_fit(
+            DecisionTree(max_depth=depth, splitter="hist", criterion=criterion),
+            X_tr,
+            y_tr,
+        )
+        results.append((score(tree.predict(X_te), y_te), depth, seconds))
+    # Lower MSE is better for regression, higher accuracy for classification
+    best = min(results) if task == "regression" else max(results)
+    tree_score, depth, budget = best
+    label = f"tree depth {depth}"
+    print(f"{task:>14} {label:>22} {budget:>7.2f} {tree_score:>10.4f}")
+
+    for max_depth, learning_rate in BOOSTER_CONFIGS:
+        params = {"max_depth": max_depth, "learning_rate": learning_rate}
+        _, probe = timed_fit(booster(PROBE_ROUNDS, **params), X_tr, y_tr)
+        rounds = max(1, int(budget / (probe / PROBE_ROUNDS)))
+        model, seconds = timed_fit(booster(rounds, **params), X_tr, y_tr)
+        boosted = score(model.predict(X_te), y_te)
+        label = f"boost d{max_depth} lr{learning_rate} x{rounds}"
+        print(f"{task:>14} {label:>22} {seconds:>7.2f} {boosted:>10.4f}")
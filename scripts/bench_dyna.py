@@ -0,0 +1,94 @@
+# pragma: no cover
+"""
+Sample efficiency of Dyna-Q and replay vs plain q_learning on a walled grid.
+Reports wall time and real environment steps until the 20-episode moving
+average return first reaches the target (optimal return minus a margin).
+Usage: python -m scripts.bench_dyna
+"""
+
+import time
+
+import numpy as np
+
+from rl_qlearning.dyna import dyna_q
+from rl_qlearning.env import GOAL, WALL, GridWorld
+from rl_qlearning.planning import value_iteration
+from rl_qlearning.qlearn import QLearningHyperparameters, q_learning
+from rl_qlearning.replay import PrioritizedReplayBuffer, ReplayBuffer
+
+SIZE, WINDOW, MARGIN = 12, 20, 8.0
+
+
+class CountingGridWorld(GridWorld):
+    """GridWorld that records the cumulative step count at every reset."""
+
+    def reset(self):
+        self.episode_start_steps.append(self.steps)
+        return super().reset()
+
+    def step(self, action):
+        self.steps += 1
+        return super().step(action)
+
+
+def make_env() -> CountingGridWorld:
+    layout = np.zeros((SIZE, SIZE), dtype=np.int8)
+    layout[: SIZE - 2, SIZE // 2] = WALL
+    layout[0, SIZE - 1] = GOAL
+    env = CountingGridWorld.from_layout(layout, seed=0)
+    env.steps, env.episode_start_steps = 0, []
+    return env
+
+
+def optimal_return(env: GridWorld) -> float:
+    Q, _ = value_iteration(env)
+    s, done, total = env.reset(), False, 0.0
+    while not done:
+        s, r, done = env.step(int(np.argmax(Q[s])))
+        total += r
+    return total
+
+
+target = optimal_return(make_env()) - MARGIN
+params = QLearningHyperparameters(episodes=1500, alpha=0.2, epsilon=0.1)
+runs = {
+    "q_learning": lambda e: q_learning(e, params, log_returns=True, seed=0),
+    "dyna k=5": lambda e: dyna_q(e, params, planning_steps=5, log_returns=True, seed=0),
+    "dyna k=20": lambda e: dyna_q(
+        e, params, planning_steps=20, log_returns=True, seed=0
+    ),
+    "replay k=20": lambda e: dyna_q(
+        e,
+        params,
+        planning_steps=20,
+        buffer=ReplayBuffer(50_000, seed=0),
+        log_returns=True,
+        seed=0,
+    ),
+    "prioritized k=20": lambda e: dyna_q(
+        e,
+        params,
+        planning_steps=20,
+        buffer=PrioritizedReplayBuffer(50_000, seed=0),
+        log_returns=True,
+        seed=0,
+    ),
+}
+
+print(f"target moving-average return: {target:.1f}")
+print(f"{'method':>18} {'episodes':>9} {'env steps':>10} {'wall s':>8}")
+for name, train in runs.items():
+    env = make_env()
+    start = time.perf_counter()
+    _, returns = train(env)
+    seconds = time.perf_counter() - start
+    moving = np.convolve(returns, np.ones(WINDOW) / WINDOW, mode="valid")
+    hits = np.flatnonzero(moving >= target)
+    if hits.size == 0:
+        print(f"{name:>18} {'-':>9} {'-':>10} {seconds:>8.2f}")
+        continue
+    episode = int(hits[0]) + WINDOW
+    steps = env.episode_start_steps[episode] if episode < len(returns) else env.steps
+    # wall time to target, assuming constant cost per real step
+    to_target = seconds * steps / env.steps
+    print(f"{name:>18} {episode:>9} {steps:>10,} {to_target:>8.2f}")
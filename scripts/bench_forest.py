@@ -0,0 +1,55 @@
+# pragma: no cover
+"""
+RandomForest fit time by n_jobs (trees grown in a process pool over shared
+memory), and prediction throughput of the stacked all-trees traversal vs
+predicting tree by tree.
+Usage: python -m scripts.bench_forest
+"""
+
+import os
+import time
+
+import numpy as np
+
+from decision_tree.forest import RandomForest
+
+N_TRAIN, N_PREDICT, N_FEATURES, N_TREES = 50_000, 200_000, 10, 64
+
+
+def predict_tree_by_tree(forest: RandomForest, X: np.ndarray) -> np.ndarray:
+    proba = np.mean([tree.value[tree.apply(X)] for tree in forest.trees_], axis=0)
+    return forest.classes_[np.argmax(proba, axis=1)]
+
+
+rng = np.random.default_rng(0)
+X = rng.normal(size=(N_TRAIN + N_PREDICT, N_FEATURES))
+y = (X[:, :3].sum(axis=1) + rng.normal(scale=0.5, size=X.shape[0]) > 0).astype(int)
+X_tr, y_tr, X_te, y_te = X[:N_TRAIN], y[:N_TRAIN], X[N_TRAIN:], y[N_TRAIN:]
+
+print(f"{os.cpu_count()} CPUs, {N_TREES} trees, {N_TRAIN:,} rows")
+print(f"{'splitter':>8} {'n_jobs':>6} {'fit s':>7} {'test acc':>8}")
+for splitter in ("best", "hist"):
+    for n_jobs in (1, 2, 4, 8):
+        forest = RandomForest(
+            n_estimators=N_TREES, splitter=splitter, n_jobs=n_jobs, random_state=0
+        )
+        start = time.perf_counter()
+        forest.fit(X_tr, y_tr)
+        seconds = time.perf_counter() - start
+        acc = (forest.predict(X_te) == y_te).mean()
+        print(f"{splitter:>8} {n_jobs:>6} {seconds:>7.2f} {acc:>8.3f}")
+
+# Bulk scoring, then many small requests where per-call loop overhead dominates
+for rows_per_call, n_rows in ((N_PREDICT, N_PREDICT), (16, 20_000)):
+    batches = [X_te[i : i + rows_per_call] for i in range(0, n_rows, rows_per_call)]
+    start = time.perf_counter()
+    slow = np.concatenate([predict_tree_by_tree(forest, b) for b in batches])
+    per_tree = n_rows / (time.perf_counter() - start)
+    start = time.perf_counter()
+    fast = np.concatenate([forest.predict(b) for b in batches])
+    stacked = n_rows / (time.perf_counter() - start)
+    assert (fast == slow).all()
+    print(
+        f"predict {rows_per_call:>7,} rows/call: tree by tree {per_tree:>9,.0f} "
+        f"rows/s, stacked {stacked:>9,.0f} rows/s"
+    )
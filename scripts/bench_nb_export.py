@@ -0,0 +1,84 @@
+# pragma: no cover
+"""
+Cold-start cost of a large MultinomialNB: pickle vs the binary export
+(memory-mapped, optionally quantized). Each load runs in a fresh process,
+which then scores one batch; reported are file size, load time and the
+process's new anonymous (unshareable) memory. Linux only (/proc).
+Usage: python -m scripts.bench_nb_export
+"""
+
+import os
+import pickle
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from naive_bayes.export import load_model, save_model
+from naive_bayes.model import MultinomialNB
+from naive_bayes.stats import CountStats
+
+N_CLASSES, N_FEATURES = 20, 500_000
+
+
+def anonymous_mb() -> float:
+    with open("/proc/self/smaps_rollup") as f:
+        for line in f:
+            if line.startswith("Anonymous:"):
+                return int(line.split()[1]) / 1024
+    return float("nan")
+
+
+def cold_start(kind: str, path: str):
+    """Load and score once in a fresh process; return (load s, anon MB)."""
+    X = np.random.default_rng(1).poisson(0.01, size=(64, N_FEATURES))
+    before = anonymous_mb()
+    start = time.perf_counter()
+    if kind == "pickle":
+        with open(path, "rb") as f:
+            model = pickle.load(f)
+    else:
+        model = load_model(path)
+    seconds = time.perf_counter() - start
+    model.predict(X)
+    return seconds, anonymous_mb() - before
+
+
+def main() -> None:
+    # Counts straight from a distribution: the stored tables look the same
+    rng = np.random.default_rng(0)
+    feature_count = rng.poisson(5.0, size=(N_CLASSES, N_FEATURES)).astype(float)
+    stats = CountStats(
+        np.arange(N_CLASSES),
+        rng.integers(100, 1000, N_CLASSES).astype(float),
+        feature_count,
+        feature_count,
+    )
+    model = MultinomialNB.from_stats(stats)
+    _ = model.feature_log_prob_
+
+    with tempfile.TemporaryDirectory() as tmp:
+        files = {"pickle": os.path.join(tmp, "model.pkl")}
+        with open(files["pickle"], "wb") as f:
+            pickle.dump(model, f, protocol=pickle.HIGHEST_PROTOCOL)
+        for name, dtype in (
+            ("nb float64", None),
+            ("nb float32", np.float32),
+            ("nb float16", np.float16),
+        ):
+            files[name] = os.path.join(tmp, f"{name.split()[1]}.nb")
+            save_model(files[name], model, dtype=dtype)
+
+        print(f"{'format':>11} {'size MB':>8} {'load ms':>8} {'anon MB':>8}")
+        for name, path in files.items():
+            kind = "pickle" if name == "pickle" else "nb"
+            # A fresh process per load; the file is already in the page cache
+            with ProcessPoolExecutor(max_workers=1) as pool:
+                seconds, anon = pool.submit(cold_start, kind, path).result()
+            size = os.path.getsize(path) / 2**20
+            print(f"{name:>11} {size:>8.1f} {seconds * 1e3:>8.1f} {anon:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+# pragma: no cover
+"""
+Throughput of HashingVectorizer feeding MultinomialNB.partial_fit, in
+documents per second, serially and with a process pool.
+Usage: python -m scripts.bench_nb_hashing
+"""
+
+import itertools
+import time
+
+import numpy as np
+
+from naive_bayes.model import MultinomialNB
+from naive_bayes.text import HashingVectorizer
+
+N_DOCS, WORDS_PER_DOC, VOCAB, BATCH = 200_000, 60, 50_000, 5_000
+N_CHECK = 1_000
+
+rng = np.random.default_rng(0)
+vocab = np.array([f"w{i}" for i in range(VOCAB)])
+labels = rng.integers(0, 2, size=N_DOCS)
+
+
+def documents():
+    """Synthetic corpus generated on the fly, never held in memory."""
+    for label in labels:
+        # spam draws from the low half of the vocabulary, ham from the high
+        words = rng.integers(0, VOCAB // 2, size=WORDS_PER_DOC) + label * VOCAB // 2
+        yield " ".join(vocab[words])
+
+
+vec = HashingVectorizer()
+print(f"{'n_jobs':>6} {'docs/s':>10} {'accuracy':>9}")
+for n_jobs in (1, 2, 4):
+    clf = MultinomialNB()
+    start, seen = time.perf_counter(), 0
+    for X in vec.iter_batches(documents(), batch_size=BATCH, n_jobs=n_jobs):
+        clf.partial_fit(X, labels[seen : seen + X.shape[0]], classes=[0, 1])
+        seen += X.shape[0]
+    seconds = time.perf_counter() - start
+    X_check = vec.transform(itertools.islice(documents(), N_CHECK))
+    accuracy = (clf.predict(X_check) == labels[:N_CHECK]).mean()
+    print(f"{n_jobs:>6} {N_DOCS / seconds:>10,.0f} {accuracy:>9.3f}")
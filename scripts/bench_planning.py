@@ -0,0 +1,40 @@
+# pragma: no cover
+"""
+Wall time to an optimal Q-table: value/policy iteration vs sampled q_learning.
+Usage: python -m scripts.bench_planning
+"""
+
+import time
+
+import numpy as np
+
+from rl_qlearning.env import GridWorld
+from rl_qlearning.planning import policy_iteration, value_iteration
+from rl_qlearning.qlearn import QLearningHyperparameters, q_learning
+
+# q_learning needs ever more episodes as the grid grows; beyond this size a
+# single run takes minutes, so it is only timed on the small layouts.
+MAX_Q_LEARNING_SIZE = 16
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+print(f"{'grid':>10} {'VI s':>8} {'VI it':>6} {'PI s':>8} {'PI it':>6} {'QL s':>8}")
+for size in (4, 16, 64, 256, 1000):
+    env = GridWorld(size=size, goal=(size - 1, size - 1))
+    (Q_vi, vi), t_vi = timed(lambda: value_iteration(env))
+    (Q_pi, pi), t_pi = timed(lambda: policy_iteration(env))
+    assert np.allclose(Q_vi, Q_pi, atol=1e-6)
+    t_ql = "-"
+    if size <= MAX_Q_LEARNING_SIZE:
+        params = QLearningHyperparameters(episodes=5000)
+        _, seconds = timed(lambda: q_learning(env, params, seed=0))
+        t_ql = f"{seconds:.2f}"
+    print(
+        f"{size:>4}x{size:<5} {t_vi:>8.3f} {vi.iterations:>6} "
+        f"{t_pi:>8.3f} {pi.iterations:>6} {t_ql:>8}"
+    )
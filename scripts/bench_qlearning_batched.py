@@ -0,0 +1,44 @@
+# pragma: no cover
+"""
+Environment steps per second: sequential q_learning vs q_learning_batched.
+Usage: python -m scripts.bench_qlearning_batched
+"""
+
+import time
+
+from rl_qlearning.batched import q_learning_batched
+from rl_qlearning.env import GridWorld
+from rl_qlearning.qlearn import QLearningHyperparameters, q_learning
+
+
+class CountingGridWorld(GridWorld):
+    """GridWorld that counts every environment step, scalar or batched."""
+
+    def __init__(self, size: int) -> None:
+        super().__init__(size=size, goal=(size - 1, size - 1))
+        self.steps = 0
+
+    def step(self, action):
+        self.steps += 1
+        return super().step(action)
+
+    def batch_step(self, states, actions):
+        self.steps += len(states)
+        return super().batch_step(states, actions)
+
+
+def steps_per_second(train, size: int) -> float:
+    env = CountingGridWorld(size)
+    start = time.perf_counter()
+    train(env)
+    return env.steps / (time.perf_counter() - start)
+
+
+params = QLearningHyperparameters(episodes=2000)
+print(f"{'grid':>6} {'q_learning':>14} {'batched x64':>14} {'speed-up':>9}")
+for size in (4, 8, 16):
+    serial = steps_per_second(lambda e: q_learning(e, params), size)
+    batched = steps_per_second(
+        lambda e: q_learning_batched(e, params, n_envs=64, seed=0), size
+    )
+    print(f"{size:>6} {serial:>14,.0f} {batched:>14,.0f} {batched / serial:>8.1f}x")
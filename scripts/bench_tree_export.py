@@ -0,0 +1,89 @@
+# pragma: no cover
+"""
+Single-row scoring latency of DecisionTree: the generic `predict` on a
+one-row array vs the function generated by `export.compile_predictor`
+(fed a NumPy row or a list), plus file size and time to load and score a
+batch for the binary format, pickle and JSON.
+Usage: python -m scripts.bench_tree_export
+"""
+
+import os
+import pickle
+import tempfile
+import time
+
+import numpy as np
+
+from decision_tree.export import (
+    compile_predictor,
+    from_json,
+    load_model,
+    save_model,
+    to_json,
+)
+from decision_tree.tree import DecisionTree
+
+N_TRAIN, N_FEATURES, N_ROWS = 50_000, 10, 2_000
+
+
+def per_call_us(func, rows) -> float:
+    start = time.perf_counter()
+    for row in rows:
+        func(row)
+    return (time.perf_counter() - start) / len(rows) * 1e6
+
+
+def load_pickle(path: str) -> DecisionTree:
+    with open(path, "rb") as f:
+        return pickle.load(f)
+
+
+def load_json(path: str) -> DecisionTree:
+    with open(path) as f:
+        return from_json(f.read())
+
+
+def main() -> None:
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(N_TRAIN, N_FEATURES))
+    y = (X[:, 0] * X[:, 1] + np.sin(X[:, 2]) > 0).astype(int)
+    X_new = rng.normal(size=(N_ROWS, N_FEATURES))
+    rows, lists = list(X_new), X_new.tolist()
+
+    print(
+        f"{'depth':>5} {'nodes':>6} {'predict us':>11} {'codegen us':>11} "
+        f"{'codegen(list) us':>17}"
+    )
+    for depth in (4, 8, 12):
+        clf = DecisionTree(max_depth=depth, splitter="hist").fit(X, y)
+        predict_one = compile_predictor(clf)
+        assert [predict_one(row) for row in lists] == clf.predict(X_new).tolist()
+        generic = per_call_us(lambda row: clf.predict(row[None]), rows)
+        codegen = per_call_us(predict_one, rows)
+        codegen_list = per_call_us(predict_one, lists)
+        print(
+            f"{depth:>5} {clf.tree_.n_nodes:>6} {generic:>11.1f} {codegen:>11.2f} "
+            f"{codegen_list:>17.2f}"
+        )
+
+    clf = DecisionTree(max_depth=None, splitter="hist").fit(X, y)
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = {name: os.path.join(tmp, name) for name in ("pickle", "json", "dt")}
+        with open(paths["pickle"], "wb") as f:
+            pickle.dump(clf, f, protocol=pickle.HIGHEST_PROTOCOL)
+        with open(paths["json"], "w") as f:
+            f.write(to_json(clf))
+        save_model(paths["dt"], clf)
+        loaders = {"pickle": load_pickle, "json": load_json, "dt": load_model}
+        print(f"\nfull tree, {clf.tree_.n_nodes} nodes")
+        print(f"{'format':>7} {'size KB':>8} {'load+predict ms':>16}")
+        for name, path in paths.items():
+            start = time.perf_counter()
+            loaders[name](path).predict(X_new)
+            seconds = time.perf_counter() - start
+            size = os.path.getsize(path) / 1024
+            print(f"{name:>7} {size:>8.0f} {seconds * 1e3:>16.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+# pragma: no cover
+"""
+DecisionTree fit time with the per-feature work of large nodes spread over
+1, 2, 4 and 8 threads, for both splitters. Speedup is bounded by the number
+of CPUs (printed first).
+Usage: python -m scripts.bench_tree_parallel
+"""
+
+import os
+import time
+
+import numpy as np
+
+from decision_tree.tree import DecisionTree
+
+N_SAMPLES, N_FEATURES, MAX_DEPTH = 500_000, 16, 8
+
+rng = np.random.default_rng(0)
+X = rng.normal(size=(N_SAMPLES, N_FEATURES))
+y = (X[:, 0] - 0.5 * X[:, 1] + 0.25 * X[:, 2] * X[:, 3] > 0).astype(int)
+
+print(f"{os.cpu_count()} CPUs, {N_SAMPLES:,} rows x {N_FEATURES} features")
+print(f"{'splitter':>8} {'n_jobs':>6} {'fit s':>7} {'speedup':>7}")
+for splitter in ("best", "hist"):
+    baseline = None
+    for n_jobs in (1, 2, 4, 8):
+        clf = DecisionTree(max_depth=MAX_DEPTH, splitter=splitter, n_jobs=n_jobs)
+        start = time.perf_counter()
+        clf.fit(X, y)
+        seconds = time.perf_counter() - start
+        baseline = baseline or seconds
+        print(f"{splitter:>8} {n_jobs:>6} {seconds:>7.2f} {baseline / seconds:>7.2f}")
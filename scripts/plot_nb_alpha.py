@@ -4,16 +4,18 @@ import numpy as np
 
 from naive_bayes.datasets import load_toy_data
 from naive_bayes.model import MultinomialNB
+from naive_bayes.model_selection import cross_validate_alphas, score_alphas
 
 X_tr, y_tr, X_te, y_te = load_toy_data()
 alphas = np.logspace(-2, 1, 9)
-acc = []
-for a in alphas:
-    clf = MultinomialNB(alpha=a).fit(X_tr, y_tr)
-    acc.append((clf.predict(X_te) == y_te).mean())
+# One fit: every alpha is scored from the same cached counts
+acc, _ = score_alphas(MultinomialNB().fit(X_tr, y_tr), X_te, y_te, alphas)
+cv = cross_validate_alphas(X_tr, y_tr, alphas, n_folds=5, seed=0)
 
-plt.semilogx(alphas, acc, marker="o")
+plt.semilogx(alphas, acc, marker="o", label="test")
+plt.semilogx(alphas, cv.mean_accuracy, marker="s", label="5-fold CV")
 plt.xlabel("Laplace alpha")
 plt.ylabel("Accuracy")
 plt.title("Naïve Bayes smoothing curve")
+plt.legend()
 plt.savefig("figures/nb_alpha_curve.png", dpi=200)
@@ -2,15 +2,22 @@
 import matplotlib.pyplot as plt
 
 from rl_qlearning.env import GridWorld
-from rl_qlearning.qlearn import q_learning
+from rl_qlearning.metrics import TrainingMonitor
+from rl_qlearning.qlearn import QLearningHyperparameters, q_learning
 
 env = GridWorld()
-_, returns = q_learning(
-    env, episodes=3000, epsilon=0.2, alpha=0.1, gamma=0.9, log_returns=True
-)  # Unpack Q and returns
-plt.plot(returns)
-plt.axhline(0, linestyle="--")
-plt.xlabel("Episode")
-plt.ylabel("Cumulative reward")
-plt.title("Q-learning convergence")
-plt.savefig("figures/qlearning_returns.png", dpi=200)
+monitor = TrainingMonitor()
+params = QLearningHyperparameters(episodes=3000, epsilon=0.2, alpha=0.1, gamma=0.9)
+q_learning(env, params, seed=0, monitor=monitor)
+metrics = monitor.metrics
+print(f"{metrics.steps_per_second:,.0f} env steps/s")
+
+fig, (ax_ret, ax_td) = plt.subplots(2, 1, sharex=True)
+ax_ret.plot(metrics.returns[: metrics.n_episodes])
+ax_ret.axhline(0, linestyle="--")
+ax_ret.set_ylabel("Cumulative reward")
+ax_ret.set_title("Q-learning convergence")
+ax_td.semilogy(metrics.q_delta_norm[: metrics.n_episodes])
+ax_td.set_xlabel("Episode")
+ax_td.set_ylabel("‖ΔQ‖ per episode")
+fig.savefig("figures/qlearning_returns.png", dpi=200)
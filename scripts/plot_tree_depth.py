@@ -1,18 +1,34 @@
 # pragma: no cover
+"""
+Depth and cost-complexity (alpha) studies of DecisionTree from a single fit:
+shallower trees come from `truncate`, pruned ones from `prune` along the
+alpha path of the fully grown tree.
+"""
+
 import matplotlib.pyplot as plt
 
 from decision_tree.datasets import load_toy_split
 from decision_tree.tree import DecisionTree
 
 X_tr, y_tr, X_te, y_te = load_toy_split()
-depths, acc = [], []
-for d in range(1, 7):
-    clf = DecisionTree(max_depth=d).fit(X_tr, y_tr)
-    acc.append((clf.predict(X_te) == y_te).mean())
-    depths.append(d)
+clf = DecisionTree(max_depth=6).fit(X_tr, y_tr)
+
+depths = list(range(1, 7))
+acc = [(clf.truncate(d).predict(X_te) == y_te).mean() for d in depths]
 
 plt.plot(depths, acc, marker="o")
 plt.xlabel("Max depth")
 plt.ylabel("Accuracy")
 plt.title("Decision-Tree depth study")
 plt.savefig("figures/tree_depth.png", dpi=200)
+
+alphas, impurities = clf.cost_complexity_pruning_path()
+alpha_acc = [(clf.prune(a).predict(X_te) == y_te).mean() for a in alphas]
+
+plt.figure()
+plt.step(alphas, alpha_acc, where="post", marker="o", label="test accuracy")
+plt.step(alphas, impurities, where="post", marker="o", label="total leaf impurity")
+plt.xlabel("ccp_alpha")
+plt.title("Decision-Tree cost-complexity pruning path")
+plt.legend()
+plt.savefig("figures/tree_ccp_alpha.png", dpi=200)
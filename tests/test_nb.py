@@ -1,7 +1,22 @@
+import numpy as np
+import pytest
+
+from naive_bayes.chunks import iter_chunks, iter_shards
 from naive_bayes.datasets import load_toy_data
-from naive_bayes.model import MultinomialNB
+from naive_bayes.export import load_model, save_model
+from naive_bayes.model import BernoulliNB, ComplementNB, MultinomialNB
+from naive_bayes.model_selection import (
+    cross_validate_alphas,
+    kfold_indices,
+    score_alphas,
+)
+from naive_bayes.stats import CountStats
+from naive_bayes.text import HashingVectorizer
 
 MIN_ACCURACY_NB = 0.90
+CHUNK_SIZE = 16
+HASH_FEATURES = 2**12
+IMBALANCED_POSITIVES = 5
 
 
 def test_multinomial_nb():
@@ -10,3 +25,395 @@ def test_multinomial_nb():
     y_pred = clf.predict(X_te)
     assert (y_pred == y_te).mean() >= MIN_ACCURACY_NB
     assert y_pred.shape == y_te.shape
+
+
+def test_csr_input_matches_dense():
+    sp = pytest.importorskip("scipy.sparse")
+    X_tr, y_tr, X_te, _ = load_toy_data()
+    dense = MultinomialNB(alpha=0.5).fit(X_tr, y_tr)
+    sparse = MultinomialNB(alpha=0.5).fit(sp.csr_matrix(X_tr), y_tr)
+    np.testing.assert_allclose(sparse.feature_log_prob_, dense.feature_log_prob_)
+    np.testing.assert_allclose(sparse.class_log_prior_, dense.class_log_prior_)
+    np.testing.assert_array_equal(
+        sparse.predict(sp.csr_matrix(X_te)), dense.predict(X_te)
+    )
+
+
+def test_sparse_million_features_stay_sparse():
+    sp = pytest.importorskip("scipy.sparse")
+    n_samples, n_features = 300, 1_000_000
+    rng = np.random.default_rng(0)
+    X = sp.random(n_samples, n_features, density=1e-4, format="csr", random_state=rng)
+    X.data = np.ceil(X.data * 3)
+    y = rng.choice(np.array(["ham", "spam", "promo"]), size=n_samples)
+    clf = MultinomialNB().fit(X, y)
+    assert clf.feature_log_prob_.shape == (len(clf.classes_), n_features)
+    y_pred = clf.predict(X)
+    assert set(y_pred) <= set(clf.classes_)
+    assert y_pred.shape == (n_samples,)
+
+
+def test_unfitted_model_raises():
+    with pytest.raises(ValueError, match="fitted"):
+        MultinomialNB().predict(np.zeros((1, 3)))
+
+
+def test_partial_fit_matches_fit():
+    X_tr, y_tr, X_te, _ = load_toy_data()
+    full = MultinomialNB().fit(X_tr, y_tr)
+    streamed = MultinomialNB()
+    for X_chunk, y_chunk in iter_chunks(X_tr, y_tr, chunk_size=CHUNK_SIZE):
+        streamed.partial_fit(X_chunk, y_chunk, classes=np.array([0, 1]))
+    np.testing.assert_allclose(streamed.feature_count_, full.feature_count_)
+    np.testing.assert_allclose(streamed.feature_log_prob_, full.feature_log_prob_)
+    np.testing.assert_array_equal(streamed.predict(X_te), full.predict(X_te))
+
+
+def test_log_probs_are_cached_until_counts_or_alpha_change():
+    X_tr, y_tr, _, _ = load_toy_data()
+    clf = MultinomialNB().partial_fit(X_tr[:10], y_tr[:10], classes=[0, 1])
+    first = clf.feature_log_prob_
+    assert clf.feature_log_prob_ is first
+    clf.partial_fit(X_tr[10:], y_tr[10:])
+    assert clf.feature_log_prob_ is not first
+    smoothed = clf.feature_log_prob_
+    clf.alpha = 0.1
+    assert clf.feature_log_prob_ is not smoothed
+    np.testing.assert_allclose(
+        clf.feature_log_prob_,
+        MultinomialNB(alpha=0.1).fit(X_tr, y_tr).feature_log_prob_,
+    )
+
+
+def test_partial_fit_validates_input():
+    X_tr, y_tr, _, _ = load_toy_data()
+    with pytest.raises(ValueError, match="classes"):
+        MultinomialNB().partial_fit(X_tr, y_tr)
+    clf = MultinomialNB().partial_fit(X_tr, y_tr, classes=[0, 1])
+    with pytest.raises(ValueError, match="not in classes"):
+        clf.partial_fit(X_tr[:2], np.array([0, 2]))
+    with pytest.raises(ValueError, match="features"):
+        clf.partial_fit(X_tr[:2, :5], y_tr[:2])
+
+
+def test_iter_shards_reads_npy_and_npz(tmp_path):
+    sp = pytest.importorskip("scipy.sparse")
+    X_tr, y_tr, _, _ = load_toy_data()
+    half = len(y_tr) // 2
+    np.save(tmp_path / "X0.npy", X_tr[:half])
+    np.save(tmp_path / "y0.npy", y_tr[:half])
+    sp.save_npz(tmp_path / "X1.npz", sp.csr_matrix(X_tr[half:]))
+    np.save(tmp_path / "y1.npy", y_tr[half:])
+    shards = [
+        (tmp_path / "X0.npy", tmp_path / "y0.npy"),
+        (tmp_path / "X1.npz", tmp_path / "y1.npy"),
+    ]
+
+    clf = MultinomialNB()
+    n_rows = 0
+    for X_chunk, y_chunk in iter_shards(shards, chunk_size=CHUNK_SIZE):
+        assert X_chunk.shape[0] <= CHUNK_SIZE
+        n_rows += X_chunk.shape[0]
+        clf.partial_fit(X_chunk, y_chunk, classes=[0, 1])
+    assert n_rows == len(y_tr)
+    np.testing.assert_allclose(
+        clf.feature_count_, MultinomialNB().fit(X_tr, y_tr).feature_count_
+    )
+
+    np.save(tmp_path / "y_all.npy", y_tr)
+    with pytest.raises(ValueError, match="rows"):
+        next(iter_shards([(tmp_path / "X0.npy", tmp_path / "y_all.npy")]))
+
+
+def test_hashing_vectorizer_counts_tokens():
+    pytest.importorskip("scipy")
+    n_free, n_tokens = 2, 4
+    vec = HashingVectorizer(n_features=HASH_FEATURES)
+    X = vec.transform(["Free money, FREE offer", "see you at lunch", ""])
+    assert X.shape == (3, HASH_FEATURES)
+    free = vec.transform(["free"]).indices[0]
+    assert X[0, free] == n_free
+    assert X[0].sum() == n_tokens
+    assert X[2].nnz == 0
+
+
+def test_hashing_vectorizer_batches_feed_partial_fit():
+    pytest.importorskip("scipy")
+    spam = ["win free money now", "free prize claim now", "cheap money offer"]
+    ham = ["lunch at noon today", "see the meeting notes", "notes from lunch"]
+    docs, labels = (spam + ham) * 5, np.array(([1] * 3 + [0] * 3) * 5)
+    vec = HashingVectorizer(n_features=HASH_FEATURES)
+
+    serial = list(vec.iter_batches(docs, batch_size=4))
+    pooled = list(vec.iter_batches(docs, batch_size=4, n_jobs=2))
+    assert len(serial) == len(pooled) == -(-len(docs) // 4)
+    for a, b in zip(serial, pooled):
+        assert (a != b).nnz == 0
+
+    clf = MultinomialNB()
+    start = 0
+    for X_batch in serial:
+        stop = start + X_batch.shape[0]
+        clf.partial_fit(X_batch, labels[start:stop], classes=[0, 1])
+        start = stop
+    y_pred = clf.predict(vec.transform(["free money prize", "meeting at lunch"]))
+    np.testing.assert_array_equal(y_pred, [1, 0])
+
+
+def test_predict_proba_is_normalized_and_stable():
+    X_tr, y_tr, X_te, _ = load_toy_data()
+    clf = MultinomialNB().fit(X_tr, y_tr)
+    proba = clf.predict_proba(X_te)
+    np.testing.assert_allclose(proba.sum(axis=1), 1.0)
+    np.testing.assert_array_equal(clf.classes_[proba.argmax(axis=1)], clf.predict(X_te))
+    # Huge counts overflow a naive exp(jll) / sum(exp(jll)) but not log-sum-exp
+    log_proba = clf.predict_log_proba(X_te * 10_000)
+    assert np.isfinite(log_proba).all()
+    np.testing.assert_allclose(np.exp(log_proba).sum(axis=1), 1.0)
+
+
+def test_batched_threaded_float32_inference_matches_default():
+    X_tr, y_tr, X_te, _ = load_toy_data()
+    reference = MultinomialNB().fit(X_tr, y_tr)
+    batched = MultinomialNB(batch_size=7, n_jobs=2, dtype=np.float32).fit(X_tr, y_tr)
+    assert batched.feature_log_prob_.dtype == np.float32
+    assert batched.predict_proba(X_te).dtype == np.float32
+    np.testing.assert_array_equal(batched.predict(X_te), reference.predict(X_te))
+    np.testing.assert_allclose(
+        batched.predict_proba(X_te), reference.predict_proba(X_te), atol=1e-5
+    )
+    assert batched.predict(X_te[:0]).shape == (0,)
+
+
+def test_predict_top_k():
+    rng = np.random.default_rng(0)
+    n_classes = 5
+    X = rng.poisson(1.0, size=(200, 30))
+    y = rng.integers(0, n_classes, size=200)
+    clf = MultinomialNB(batch_size=64).fit(X, y)
+    labels, proba = clf.predict_top_k(X, k=3)
+    assert labels.shape == proba.shape == (200, 3)
+    np.testing.assert_array_equal(labels[:, 0], clf.predict(X))
+    assert (np.diff(proba, axis=1) <= 0).all()
+    full_labels, full_proba = clf.predict_top_k(X, k=10)
+    assert full_labels.shape[1] == n_classes
+    np.testing.assert_allclose(full_proba.sum(axis=1), 1.0)
+    with pytest.raises(ValueError, match="k must"):
+        clf.predict_top_k(X, k=0)
+    with pytest.raises(ValueError, match="fitted"):
+        MultinomialNB().predict_top_k(X)
+
+
+def test_score_alphas_matches_refitting_each_alpha():
+    X_tr, y_tr, X_te, y_te = load_toy_data()
+    alphas = np.logspace(-2, 1, 5)
+    accuracy, log_loss = score_alphas(
+        MultinomialNB().fit(X_tr, y_tr), X_te, y_te, alphas
+    )
+    for a, acc, loss in zip(alphas, accuracy, log_loss):
+        clf = MultinomialNB(alpha=a).fit(X_tr, y_tr)
+        assert acc == (clf.predict(X_te) == y_te).mean()
+        expected = -clf.predict_log_proba(X_te)[np.arange(len(y_te)), y_te].mean()
+        np.testing.assert_allclose(loss, expected)
+
+
+def test_cross_validate_alphas():
+    X_tr, y_tr, _, _ = load_toy_data()
+    alphas = np.logspace(-2, 1, 4)
+    n_folds = 3
+    folds = kfold_indices(len(y_tr), n_folds, seed=0)
+    np.testing.assert_array_equal(
+        np.sort(np.concatenate([test for _, test in folds])), np.arange(len(y_tr))
+    )
+
+    serial = cross_validate_alphas(X_tr, y_tr, alphas, n_folds=n_folds, seed=0)
+    threaded = cross_validate_alphas(
+        X_tr, y_tr, alphas, n_folds=n_folds, seed=0, n_jobs=2
+    )
+    assert serial.accuracy.shape == serial.log_loss.shape == (n_folds, len(alphas))
+    np.testing.assert_array_equal(serial.log_loss, threaded.log_loss)
+    assert serial.mean_accuracy.min() >= MIN_ACCURACY_NB
+    assert serial.best_alpha in alphas
+    assert (
+        serial.mean_log_loss.min()
+        == serial.mean_log_loss[list(alphas).index(serial.best_alpha)]
+    )
+
+
+def test_score_alphas_sparse_and_unfitted():
+    sp = pytest.importorskip("scipy.sparse")
+    X_tr, y_tr, X_te, y_te = load_toy_data()
+    clf = MultinomialNB().fit(X_tr, y_tr)
+    dense = score_alphas(clf, X_te, y_te, [0.5, 1.0])
+    sparse = score_alphas(clf, sp.csr_matrix(X_te), y_te, [0.5, 1.0])
+    np.testing.assert_allclose(dense, sparse)
+    with pytest.raises(ValueError, match="fitted"):
+        score_alphas(MultinomialNB(), X_te, y_te, [1.0])
+
+
+def test_count_stats_merge():
+    X_tr, y_tr, _, _ = load_toy_data()
+    half = len(y_tr) // 2
+    merged = CountStats.from_data(X_tr[:half], y_tr[:half], classes=[0, 1]).merge(
+        CountStats.from_data(X_tr[half:], y_tr[half:], classes=[0, 1])
+    )
+    whole = CountStats.from_data(X_tr, y_tr)
+    np.testing.assert_array_equal(merged.class_count, whole.class_count)
+    np.testing.assert_array_equal(merged.feature_count, whole.feature_count)
+    np.testing.assert_array_equal(merged.presence_count, whole.presence_count)
+    assert whole.presence_count.sum() == (X_tr > 0).sum()
+    widened = whole.merge(CountStats.empty([1, 2], whole.n_features))
+    np.testing.assert_array_equal(widened.classes, [0, 1, 2])
+    np.testing.assert_array_equal(widened.class_count[:2], whole.class_count)
+    assert widened.class_count[2] == 0
+    with pytest.raises(ValueError, match="features"):
+        whole.merge(CountStats.empty([0, 1], whole.n_features + 1))
+
+
+def test_bernoulli_nb_matches_direct_formula():
+    X_tr, y_tr, X_te, y_te = load_toy_data()
+    clf = BernoulliNB().fit(X_tr, y_tr)
+    p = np.exp(clf.feature_log_prob_)
+    present = (X_te > 0)[:, None, :]
+    direct = np.where(present, np.log(p), np.log(1 - p)).sum(axis=2)
+    direct += clf.class_log_prior_
+    direct -= np.log(np.exp(direct).sum(axis=1, keepdims=True))
+    np.testing.assert_allclose(clf.predict_log_proba(X_te), direct)
+    assert (clf.predict(X_te) == y_te).mean() >= MIN_ACCURACY_NB
+
+
+def test_complement_nb_on_imbalanced_data():
+    X_tr, y_tr, X_te, y_te = load_toy_data()
+    keep = (y_tr == 0) | (np.cumsum(y_tr == 1) <= IMBALANCED_POSITIVES)
+    clf = ComplementNB().fit(X_tr[keep], y_tr[keep])
+    complement = clf.feature_count_[::-1] + 1.0
+    np.testing.assert_allclose(
+        clf.feature_log_prob_,
+        -np.log(complement / complement.sum(axis=1, keepdims=True)),
+    )
+    assert (clf.predict(X_te) == y_te).mean() >= MIN_ACCURACY_NB
+    normed = ComplementNB(norm=True).fit(X_tr, y_tr)
+    np.testing.assert_allclose(normed.feature_log_prob_.sum(axis=1), 1.0)
+    single = ComplementNB().fit(X_tr[y_tr == 1], y_tr[y_tr == 1])
+    np.testing.assert_array_equal(single.predict(X_te), np.ones(len(y_te)))
+
+
+def test_one_pass_trains_all_heads():
+    sp = pytest.importorskip("scipy.sparse")
+    X_tr, y_tr, X_te, _ = load_toy_data()
+    stats = CountStats.empty([0, 1], X_tr.shape[1])
+    for X_chunk, y_chunk in iter_chunks(sp.csr_matrix(X_tr), y_tr, CHUNK_SIZE):
+        stats.update(X_chunk, y_chunk)
+    for head in (MultinomialNB, ComplementNB, BernoulliNB):
+        from_stats = head.from_stats(stats, alpha=0.5)
+        fitted = head(alpha=0.5).fit(X_tr, y_tr)
+        np.testing.assert_allclose(
+            from_stats.feature_log_prob_, fitted.feature_log_prob_
+        )
+        np.testing.assert_allclose(
+            from_stats.predict_proba(sp.csr_matrix(X_te)), fitted.predict_proba(X_te)
+        )
+
+
+def test_fit_parallel_matches_fit(tmp_path):
+    sp = pytest.importorskip("scipy.sparse")
+    X_tr, y_tr, X_te, _ = load_toy_data()
+    X_shards, y_shards = np.array_split(X_tr, 3), np.array_split(y_tr, 3)
+    reference = MultinomialNB().fit(X_tr, y_tr)
+
+    pooled = MultinomialNB().fit_parallel(X_shards, y_shards, workers=2)
+    np.testing.assert_allclose(pooled.feature_count_, reference.feature_count_)
+    np.testing.assert_array_equal(pooled.predict(X_te), reference.predict(X_te))
+
+    np.save(tmp_path / "X0.npy", X_shards[0])
+    sp.save_npz(tmp_path / "X1.npz", sp.csr_matrix(X_shards[1]))
+    np.save(tmp_path / "y1.npy", y_shards[1])
+    paths = [tmp_path / "X0.npy", tmp_path / "X1.npz", X_shards[2]]
+    labels = [y_shards[0], tmp_path / "y1.npy", y_shards[2]]
+    from_paths = BernoulliNB().fit_parallel(
+        paths, labels, workers=1, chunk_size=CHUNK_SIZE
+    )
+    np.testing.assert_allclose(
+        from_paths.feature_log_prob_, BernoulliNB().fit(X_tr, y_tr).feature_log_prob_
+    )
+
+
+def test_merge_models_with_different_classes():
+    X_tr, y_tr, X_te, _ = load_toy_data()
+    y_multi = np.where(np.arange(len(y_tr)) % 5 == 0, 2, y_tr)
+    first = y_multi != y_multi.max()  # the second model alone sees class 2
+    a = ComplementNB(norm=True, dtype=np.float32).fit(X_tr[first], y_multi[first])
+    b = ComplementNB().fit(X_tr[~first], y_multi[~first])
+    merged = a.merge(b)
+    reference = ComplementNB(norm=True).fit(X_tr, y_multi)
+    assert merged.norm and merged.dtype == np.float32
+    assert a.stats_.class_count.sum() == first.sum()
+    np.testing.assert_array_equal(merged.classes_, [0, 1, 2])
+    np.testing.assert_allclose(merged.feature_count_, reference.feature_count_)
+    np.testing.assert_array_equal(merged.predict(X_te), reference.predict(X_te))
+    with pytest.raises(ValueError, match="fitted"):
+        a.merge(MultinomialNB())
+
+
+@pytest.mark.parametrize("head", [MultinomialNB, ComplementNB, BernoulliNB])
+def test_save_load_roundtrip(tmp_path, head):
+    X_tr, y_tr, X_te, _ = load_toy_data()
+    labels = np.array(["ham", "spam"])[y_tr]
+    model = head(alpha=0.5).fit(X_tr, labels)
+    save_model(tmp_path / "model.nb", model)
+    loaded = load_model(tmp_path / "model.nb")
+    assert type(loaded) is head
+    assert isinstance(loaded.feature_log_prob_, np.memmap)
+    np.testing.assert_array_equal(loaded.classes_, model.classes_)
+    np.testing.assert_array_equal(loaded.feature_log_prob_, model.feature_log_prob_)
+    np.testing.assert_allclose(loaded.predict_proba(X_te), model.predict_proba(X_te))
+    in_memory = load_model(tmp_path / "model.nb", mmap=False)
+    assert not isinstance(in_memory.feature_log_prob_, np.memmap)
+    np.testing.assert_array_equal(in_memory.predict(X_te), model.predict(X_te))
+
+
+def test_load_maps_bernoulli_weights(tmp_path):
+    X_tr, y_tr, X_te, _ = load_toy_data()
+    model = BernoulliNB().fit(X_tr, y_tr)
+    save_model(tmp_path / "model.nb", model)
+    loaded = load_model(tmp_path / "model.nb")
+    coef, intercept = loaded._linear_model()
+    # Scoring uses the mapped file, not a per-process copy
+    assert isinstance(coef, np.memmap)
+    np.testing.assert_allclose(coef, model._linear_model()[0])
+    np.testing.assert_allclose(intercept, model._linear_model()[1])
+    np.testing.assert_array_equal(loaded.predict(X_te), model.predict(X_te))
+    save_model(tmp_path / "small.nb", model, dtype=np.float16)
+    small = load_model(tmp_path / "small.nb")
+    assert small._linear_model()[0].dtype == np.float32
+    np.testing.assert_array_equal(small.predict(X_te), model.predict(X_te))
+
+
+@pytest.mark.parametrize("dtype", [np.float32, np.float16])
+def test_save_quantized(tmp_path, dtype):
+    X_tr, y_tr, X_te, _ = load_toy_data()
+    model = MultinomialNB().fit(X_tr, y_tr)
+    save_model(tmp_path / "full.nb", model)
+    save_model(tmp_path / "small.nb", model, dtype=dtype)
+    full_size = (tmp_path / "full.nb").stat().st_size
+    assert (tmp_path / "small.nb").stat().st_size < full_size
+    loaded = load_model(tmp_path / "small.nb")
+    assert loaded.feature_log_prob_.dtype == np.float32
+    np.testing.assert_array_equal(loaded.predict(X_te), model.predict(X_te))
+
+
+def test_load_rejects_bad_files(tmp_path):
+    X_tr, y_tr, _, _ = load_toy_data()
+    with pytest.raises(ValueError, match="fitted"):
+        save_model(tmp_path / "m.nb", MultinomialNB())
+    with pytest.raises(ValueError, match="labels"):
+        save_model(tmp_path / "m.nb", MultinomialNB().fit(X_tr, y_tr.astype(object)))
+    (tmp_path / "junk.nb").write_bytes(b"\0" * 64)
+    with pytest.raises(ValueError, match="not a saved"):
+        load_model(tmp_path / "junk.nb")
+    save_model(tmp_path / "m.nb", MultinomialNB().fit(X_tr, y_tr))
+    data = bytearray((tmp_path / "m.nb").read_bytes())
+    data[8] = 99
+    (tmp_path / "m.nb").write_bytes(bytes(data))
+    with pytest.raises(ValueError, match="version 99"):
+        load_model(tmp_path / "m.nb")
@@ -1,12 +1,42 @@
+from concurrent.futures import ProcessPoolExecutor
+
 import numpy as np
 import pytest
 
-from rl_qlearning.env import ACTION_SPACE, GridWorld
+from rl_qlearning.batched import q_learning_batched, td_update
+from rl_qlearning.checkpoint import (
+    Checkpoint,
+    load_checkpoint,
+    q_learning_resumable,
+    save_checkpoint,
+)
+from rl_qlearning.dyna import TabularModel, dyna_q
+from rl_qlearning.env import (
+    ACTION_SPACE,
+    EMPTY,
+    GOAL,
+    HAZARD,
+    START,
+    WALL,
+    GridWorld,
+    Rewards,
+)
+from rl_qlearning.metrics import TrainingMetrics, TrainingMonitor
+from rl_qlearning.planning import policy_iteration, value_iteration
 from rl_qlearning.qlearn import (
     QLearningHyperparameters,
     greedy_policy,
     q_learning,
 )
+from rl_qlearning.replay import PrioritizedReplayBuffer, ReplayBuffer
+from rl_qlearning.serving import PolicyServer, save_policy, save_q_table
+from rl_qlearning.sweep import EarlyStopping, grid_search, random_search, sweep
+
+# Shortest path from (0, 0) to (3, 3) and its return: five -1 steps then +10.
+OPTIMAL_STEPS_4X4 = 6
+OPTIMAL_RETURN_4X4 = 5
+# A transition whose TD error dwarfs the rest must dominate prioritized samples.
+MIN_PRIORITY_SHARE = 0.9
 
 
 @pytest.fixture
@@ -100,3 +130,534 @@ def test_greedy_policy_reaches_goal(q_table_learned: np.ndarray, env: GridWorld)
         )
     # If successful_reaches is 0 (and less than min_successful_trials),
     # the first assert would have failed.
+
+
+def test_batch_step_matches_step(env: GridWorld):
+    """Vectorized stepping agrees with the scalar `step` for every (s, a)."""
+    n_states, n_actions = env.size**2, len(ACTION_SPACE)
+    states = np.repeat(np.arange(n_states), n_actions)
+    actions = np.tile(np.arange(n_actions), n_states)
+    next_states, rewards, dones = env.batch_step(states, actions)
+    for s, a, ns, r, d in zip(states, actions, next_states, rewards, dones):
+        env.state = divmod(int(s), env.size)
+        assert env.step(int(a)) == (ns, r, d)
+
+
+def test_td_update_averages_duplicate_pairs():
+    """k copies of one transition move Q[s, a] as far as a single update."""
+    Q = np.zeros((2, 2))
+    states = np.array([0, 0, 0, 1])
+    actions = np.array([1, 1, 1, 0])
+    targets = np.array([1.0, 1.0, 4.0, -2.0])
+    td_update(Q, states, actions, targets, alpha=0.5)
+    np.testing.assert_allclose(Q, [[0.0, 1.0], [-1.0, 0.0]])
+
+
+def test_q_learning_batched_reaches_goal(env: GridWorld):
+    """The batched trainer learns a policy as good as the sequential one."""
+    params = QLearningHyperparameters(episodes=2000, alpha=0.1, epsilon=0.1)
+    Q, returns = q_learning_batched(
+        env, params=params, n_envs=16, log_returns=True, seed=0
+    )
+    assert Q.shape == (env.size**2, len(ACTION_SPACE))
+    assert len(returns) == params.episodes
+
+    policy = greedy_policy(Q)
+    state_id, done, steps = env.reset(), False, 0
+    while not done and steps < OPTIMAL_STEPS_4X4 * 3:
+        state_id, _, done = env.step(policy[state_id])
+        steps += 1
+    assert done
+    assert steps == OPTIMAL_STEPS_4X4
+    # late-training returns are statistically close to the optimum
+    assert np.mean(returns[-200:]) >= OPTIMAL_RETURN_4X4 - 2
+
+
+def test_q_learning_batched_is_seeded(env: GridWorld):
+    params = QLearningHyperparameters(episodes=50)
+    Q1 = q_learning_batched(env, params=params, n_envs=8, seed=3)
+    Q2 = q_learning_batched(env, params=params, n_envs=8, seed=3)
+    np.testing.assert_array_equal(Q1, Q2)
+
+
+def test_q_learning_seed_is_reproducible(env: GridWorld):
+    params = QLearningHyperparameters(episodes=100)
+    Q1, r1 = q_learning(env, params=params, log_returns=True, seed=7)
+    Q2, r2 = q_learning(env, params=params, log_returns=True, seed=7)
+    np.testing.assert_array_equal(Q1, Q2)
+    assert r1 == r2
+
+
+def test_grid_and_random_search_spaces():
+    configs = grid_search({"alpha": [0.1, 0.5], "epsilon": [0.05, 0.1, 0.2]})
+    assert len(configs) == len([0.1, 0.5]) * len([0.05, 0.1, 0.2])
+    assert {(c.alpha, c.epsilon) for c in configs} == {
+        (a, e) for a in (0.1, 0.5) for e in (0.05, 0.1, 0.2)
+    }
+
+    n_samples = 20
+    alpha_range, episodes_range = (0.05, 0.5), (100, 200)
+    space = {"alpha": alpha_range, "episodes": episodes_range, "gamma": [0.8, 0.9]}
+    sampled = random_search(space, n_samples=n_samples, seed=0)
+    assert len(sampled) == n_samples
+    assert all(alpha_range[0] <= c.alpha <= alpha_range[1] for c in sampled)
+    assert all(isinstance(c.episodes, int) for c in sampled)
+    assert all(episodes_range[0] <= c.episodes <= episodes_range[1] for c in sampled)
+    assert {c.gamma for c in sampled} <= {0.8, 0.9}
+    assert random_search(space, n_samples=n_samples, seed=0) == sampled
+
+
+def test_sweep_is_deterministic_across_workers(env: GridWorld):
+    configs = grid_search({"alpha": [0.1, 0.5], "episodes": [30, 60]})
+    n_seeds = 2
+    serial = sweep(env, configs, n_seeds=n_seeds, seed=1, workers=1)
+    pooled = sweep(env, configs, n_seeds=n_seeds, seed=1, workers=2)
+    assert serial.returns.shape == (len(configs), n_seeds, 60)
+    assert serial.returns.dtype == np.float32
+    np.testing.assert_array_equal(serial.returns, pooled.returns)
+    # shorter budgets are NaN-padded
+    assert np.isnan(serial.returns[0, :, 30:]).all()
+    assert not serial.stopped.any()
+    assert serial.best() in configs
+
+
+def test_sweep_early_stops_bad_configs(env: GridWorld):
+    good = QLearningHyperparameters(episodes=300, alpha=0.5, epsilon=0.1)
+    bad = QLearningHyperparameters(episodes=300, alpha=0.5, epsilon=1.0)
+    stopping = EarlyStopping(min_return=-10, window=20, grace=50)
+    result = sweep(env, [good, bad], seed=0, workers=1, early_stopping=stopping)
+    assert result.stopped.tolist() == [[False], [True]]
+    assert result.episodes_run[1, 0] < bad.episodes
+    final = result.final_returns(window=20)
+    assert final[0, 0] > final[1, 0]
+    assert result.best(window=20) == good
+
+
+def test_transition_exports_match_step(env: GridWorld):
+    next_state, reward, done = env.transition_table()
+    n_states, n_actions = env.size**2, len(ACTION_SPACE)
+    assert next_state.shape == reward.shape == done.shape == (n_states, n_actions)
+    for s in range(n_states):
+        for a in range(n_actions):
+            env.state = divmod(s, env.size)
+            assert env.step(a) == (next_state[s, a], reward[s, a], done[s, a])
+
+    P, R = env.transition_tensor()
+    assert P.shape == (n_states, n_actions, n_states)
+    np.testing.assert_allclose(P.sum(axis=2), 1.0)
+    np.testing.assert_array_equal(P.argmax(axis=2), next_state)
+    np.testing.assert_array_equal(R, reward)
+    assert env.terminal_mask().sum() == 1
+    with pytest.raises(ValueError, match="read-only"):
+        next_state[0, 0] = 0
+
+
+@pytest.mark.parametrize("planner", [value_iteration, policy_iteration])
+def test_planners_find_optimal_q(env: GridWorld, planner):
+    gamma = 0.9
+    Q, stats = planner(env, gamma=gamma)
+    assert stats.converged
+    assert Q.shape == (env.size**2, len(ACTION_SPACE))
+    # Bellman optimality holds for every non-terminal state
+    next_state, reward, done = env.transition_table()
+    V = Q.max(axis=1)
+    terminal = env.terminal_mask()
+    expected = reward + gamma * V[next_state] * ~done
+    np.testing.assert_allclose(Q[~terminal], expected[~terminal], atol=1e-6)
+
+    policy = greedy_policy(Q)
+    state_id, done_flag, steps = env.reset(), False, 0
+    while not done_flag and steps < OPTIMAL_STEPS_4X4 * 3:
+        state_id, _, done_flag = env.step(policy[state_id])
+        steps += 1
+    assert steps == OPTIMAL_STEPS_4X4
+
+
+def test_value_and_policy_iteration_agree():
+    big_env = GridWorld(size=12, goal=(7, 10))
+    Q_vi, _ = value_iteration(big_env)
+    Q_pi, pi_stats = policy_iteration(big_env)
+    np.testing.assert_allclose(Q_vi, Q_pi, atol=1e-6)
+    assert pi_stats.evaluation_sweeps > pi_stats.iterations
+
+
+def test_value_iteration_reports_non_convergence(env: GridWorld):
+    max_iter = 2
+    _, stats = value_iteration(env, max_iter=max_iter)
+    assert not stats.converged
+    assert stats.iterations == max_iter
+    _, stats = policy_iteration(env, max_iter=1)
+    assert not stats.converged
+
+
+def test_policy_iteration_stops_on_diverging_evaluation(env: GridWorld):
+    # gamma=1: the initial all-North policy never terminates, so V diverges
+    max_iter = 50
+    _, stats = policy_iteration(env, gamma=1.0, max_iter=max_iter)
+    assert not stats.converged
+    assert stats.evaluation_sweeps == max_iter
+    _, stats = value_iteration(env, gamma=1.0)
+    assert stats.converged
+
+
+@pytest.fixture
+def maze() -> np.ndarray:
+    """5x5 layout: a wall column with one gap, a hazard and two goals."""
+    layout = np.full((5, 5), EMPTY, dtype=np.int8)
+    layout[0:4, 2] = WALL
+    layout[4, 4] = GOAL
+    layout[0, 4] = GOAL
+    layout[2, 3] = HAZARD
+    layout[0, 0] = START
+    layout[4, 0] = START
+    return layout
+
+
+def test_layout_walls_goals_and_hazards(maze: np.ndarray):
+    env = GridWorld.from_layout(maze, seed=0)
+    assert env.n_states == maze.size
+    assert env.goal == (0, 4)
+    # walking east from (0, 1) bumps into the wall
+    env.state = (0, 1)
+    assert env.step(1) == (env._state_id((0, 1)), -1, False)
+    # stepping into the hazard ends the episode with its penalty
+    env.state = (2, 4)
+    s, r, done = env.step(3)
+    assert (s, done) == (env._state_id((2, 3)), True)
+    assert r == Rewards().hazard
+    # both goals are terminal
+    assert env.terminal_mask()[[env._state_id((0, 4)), env._state_id((4, 4))]].all()
+
+
+def test_layout_start_distribution(maze: np.ndarray):
+    env = GridWorld.from_layout(maze, seed=0)
+    starts = {env.reset() for _ in range(50)}
+    assert starts == {env._state_id((0, 0)), env._state_id((4, 0))}
+
+    probs = np.zeros(maze.shape)
+    probs[1, 1] = 1.0
+    env = GridWorld.from_layout(maze, start_probs=probs)
+    assert env.reset() == env._state_id((1, 1))
+    assert set(env.batch_reset(10).tolist()) == {env._state_id((1, 1))}
+
+
+def test_layout_validation(maze: np.ndarray):
+    with pytest.raises(ValueError, match="GOAL"):
+        GridWorld.from_layout(np.zeros((3, 3)))
+    with pytest.raises(ValueError, match="2D"):
+        GridWorld.from_layout(np.full(4, GOAL))
+    with pytest.raises(ValueError, match="slip"):
+        GridWorld.from_layout(maze, slip=1.5)
+    with pytest.raises(ValueError, match="one per cell"):
+        GridWorld.from_layout(maze, start_probs=np.ones(3))
+    with pytest.raises(ValueError, match="at least one cell"):
+        GridWorld.from_layout(maze, start_probs=np.zeros(maze.shape))
+    wall_start = np.zeros(maze.shape)
+    wall_start[0, 2] = 1.0
+    with pytest.raises(ValueError, match="walls"):
+        GridWorld.from_layout(maze, start_probs=wall_start)
+
+
+def test_slip_matches_transition_tensor():
+    slip = 0.4
+    env = GridWorld(size=3, goal=(2, 2), slip=slip, seed=0)
+    P, _ = env.transition_tensor()
+    np.testing.assert_allclose(P.sum(axis=2), 1.0)
+    n = 20_000
+    states = np.full(n, env._state_id((1, 1)))
+    next_states, _, _ = env.batch_step(states, np.ones(n, dtype=int))
+    freq = np.bincount(next_states, minlength=env.n_states) / n
+    np.testing.assert_allclose(freq, P[env._state_id((1, 1)), 1], atol=0.02)
+
+    env.seed(1)
+    moved = set()
+    for _ in range(100):
+        env.reset()
+        moved.add(env.step(1)[0])
+    assert len(moved) > 1
+
+
+@pytest.mark.parametrize("planner", [value_iteration, policy_iteration])
+def test_planners_handle_slip_and_layouts(maze: np.ndarray, planner):
+    gamma = 0.9
+    env = GridWorld.from_layout(maze, slip=0.2)
+    Q, stats = planner(env, gamma=gamma)
+    assert stats.converged
+    # Bellman optimality against the dense model
+    P, R = env.transition_tensor()
+    V = Q.max(axis=1)
+    V[env.terminal_mask()] = 0.0
+    expected = R + gamma * P @ V
+    live = ~env.terminal_mask() & (maze.reshape(-1) != WALL)
+    np.testing.assert_allclose(Q[live], expected[live], atol=1e-6)
+
+
+def test_million_state_grid_uses_flat_tables():
+    size = 1000
+    env = GridWorld(size=size, goal=(size - 1, size - 1))
+    assert env.n_states == size * size
+    next_state, _, _ = env.transition_table()
+    assert next_state.dtype == np.int32
+    assert next_state.nbytes == env.n_states * env.n_actions * 4
+    env.state = (size - 1, size - 2)
+    assert env.step(1) == (env.n_states - 1, 10, True)
+
+
+def test_sweep_with_slippery_env_is_deterministic():
+    env = GridWorld(slip=0.1)
+    configs = grid_search({"episodes": [40]})
+    serial = sweep(env, configs, n_seeds=2, seed=5, workers=1)
+    pooled = sweep(env, configs, n_seeds=2, seed=5, workers=2)
+    np.testing.assert_array_equal(serial.returns, pooled.returns)
+
+
+def test_serial_sweep_leaves_callers_env_untouched():
+    env = GridWorld(slip=0.1, seed=3)
+    rng_state, state = env.rng.bit_generator.state, env.state
+    sweep(env, grid_search({"episodes": [20]}), seed=0, workers=1)
+    assert env.rng.bit_generator.state == rng_state
+    assert env.state == state
+
+
+def test_replay_buffer_ring_semantics():
+    capacity = 4
+    buffer = ReplayBuffer(capacity, seed=0)
+    buffer.add(0, 1, -1.0, 1, False)
+    assert len(buffer) == 1
+    slots = buffer.add(np.arange(1, 6), 0, -1.0, np.arange(2, 7), False)
+    assert len(buffer) == capacity
+    # the oldest transitions were overwritten by the newest ones
+    assert sorted(buffer.states.tolist()) == [2, 3, 4, 5]
+    assert slots.size == capacity
+
+    batch = buffer.sample(32)
+    assert batch.states.shape == (32,)
+    np.testing.assert_array_equal(batch.next_states, batch.states + 1)
+    np.testing.assert_array_equal(batch.weights, 1.0)
+
+    with pytest.raises(ValueError, match="empty"):
+        ReplayBuffer(2).sample(1)
+    with pytest.raises(ValueError, match="capacity"):
+        ReplayBuffer(0)
+
+
+def test_prioritized_buffer_prefers_large_td_errors():
+    buffer = PrioritizedReplayBuffer(capacity=10, alpha=1.0, beta=1.0, seed=0)
+    with pytest.raises(ValueError, match="empty"):
+        buffer.sample(1)
+    slots = buffer.add(np.arange(10), 0, -1.0, np.arange(10), False)
+    surprising = 3
+    td_errors = np.full(10, 0.01)
+    td_errors[surprising] = 10.0
+    buffer.update_priorities(slots, td_errors)
+    batch = buffer.sample(1000)
+    hits = batch.states == surprising
+    assert hits.mean() > MIN_PRIORITY_SHARE
+    # the over-sampled transition gets the smallest importance weight
+    assert batch.weights[hits].max() < batch.weights.max()
+    # new transitions enter with the maximum priority
+    new_slot = buffer.add(42, 0, -1.0, 42, True)
+    assert buffer.priorities[new_slot] == buffer.priorities.max()
+
+
+def test_prioritized_sampling_matches_priorities():
+    capacity, alpha = 5, 0.5
+    buffer = PrioritizedReplayBuffer(capacity, alpha=alpha, beta=1.0, seed=1)
+    for start in range(0, 12, 3):
+        slots = buffer.add(np.arange(start, start + 3), 0, -1.0, 0, False)
+        buffer.update_priorities(slots, np.arange(1.0, 4.0) * (start + 1))
+    buffer.update_priorities(np.array([], dtype=int), np.array([]))
+    expected = buffer.priorities**alpha / (buffer.priorities**alpha).sum()
+    n_draws = 200_000
+    batch = buffer.sample(n_draws)
+    counts = np.bincount(batch.indices, minlength=capacity)
+    np.testing.assert_allclose(counts / n_draws, expected, atol=0.01)
+    # weights are (N * P(i))^-beta, normalized by their maximum
+    raw = 1.0 / (capacity * expected[batch.indices])
+    np.testing.assert_allclose(batch.weights, raw / raw.max())
+    # new transitions enter at the largest priority written so far
+    assert buffer.max_priority == pytest.approx(30.0 + buffer.eps)
+
+
+@pytest.mark.parametrize(
+    "buffer",
+    [None, ReplayBuffer(5000, seed=0), PrioritizedReplayBuffer(5000, seed=0)],
+)
+def test_dyna_q_learns_with_fewer_episodes(env: GridWorld, buffer):
+    params = QLearningHyperparameters(episodes=60, alpha=0.2, epsilon=0.1)
+    Q, returns = dyna_q(
+        env, params, planning_steps=20, buffer=buffer, log_returns=True, seed=0
+    )
+    assert len(returns) == params.episodes
+    policy = greedy_policy(Q)
+    state_id, done, steps = env.reset(), False, 0
+    while not done and steps < OPTIMAL_STEPS_4X4 * 3:
+        state_id, _, done = env.step(policy[state_id])
+        steps += 1
+    assert steps == OPTIMAL_STEPS_4X4
+
+
+def test_dyna_q_without_planning_is_q_learning(env: GridWorld):
+    params = QLearningHyperparameters(episodes=30)
+    Q_dyna = dyna_q(env, params, planning_steps=0, seed=4)
+    Q_plain = q_learning(env, params, seed=4)
+    np.testing.assert_allclose(Q_dyna, Q_plain)
+
+
+def test_tabular_model_keeps_last_outcome():
+    model = TabularModel(n_states=3, n_actions=2, seed=0)
+    model.add(0, 1, -1.0, 1, False)
+    model.add(0, 1, 5.0, 2, True)
+    assert len(model) == 1
+    batch = model.sample(4)
+    np.testing.assert_array_equal(batch.states, 0)
+    np.testing.assert_array_equal(batch.next_states, 2)
+    assert batch.dones.all()
+
+
+def test_q_learning_warm_start(env: GridWorld):
+    Q_star, _ = value_iteration(env)
+    params = QLearningHyperparameters(episodes=5, epsilon=0.0)
+    Q = q_learning(env, params, seed=0, q_init=Q_star)
+    # starting from the optimum, a few greedy episodes leave it in place
+    np.testing.assert_allclose(Q, Q_star, atol=1e-6)
+    assert Q is not Q_star
+    # q_init is positional, as it was when warm starts were added
+    np.testing.assert_array_equal(q_learning(env, params, False, 0, Q_star), Q)
+    with pytest.raises(ValueError, match="shape"):
+        q_learning(env, params, q_init=np.zeros((3, 4)))
+
+
+def test_checkpoint_round_trip(tmp_path):
+    rng = np.random.default_rng(3)
+    rng.random(5)
+    checkpoint = Checkpoint(
+        np.arange(8.0).reshape(2, 4), rng, 17, QLearningHyperparameters(alpha=0.3)
+    )
+    path = tmp_path / "ckpt.npz"
+    save_checkpoint(path, checkpoint)
+    restored = load_checkpoint(path)
+    np.testing.assert_array_equal(restored.Q, checkpoint.Q)
+    assert restored.episode == checkpoint.episode
+    assert restored.params == checkpoint.params
+    assert restored.env_rng_state is None
+    assert restored.rng.random() == rng.random()
+
+
+def test_resumed_training_matches_uninterrupted(tmp_path):
+    params = QLearningHyperparameters(episodes=80)
+    straight = q_learning_resumable(
+        GridWorld(slip=0.1, seed=1), tmp_path / "a.npz", params, every=20, seed=2
+    )
+
+    path = tmp_path / "b.npz"
+    half = QLearningHyperparameters(episodes=40)
+    q_learning_resumable(GridWorld(slip=0.1, seed=1), path, half, every=20, seed=2)
+    assert load_checkpoint(path).episode == half.episodes
+    # a fresh process would rebuild env and resume from the file alone
+    resumed = q_learning_resumable(GridWorld(slip=0.1), path, params, every=20)
+    np.testing.assert_array_equal(resumed, straight)
+    assert load_checkpoint(path).episode == params.episodes
+
+
+def _serve(path, states):
+    return PolicyServer(path).act_batch(states)
+
+
+def test_policy_server_memory_maps_tables(tmp_path, env: GridWorld):
+    Q, _ = value_iteration(env)
+    expected = np.array(greedy_policy(Q))
+
+    policy_path = tmp_path / "policy.npy"
+    save_policy(policy_path, Q)
+    server = PolicyServer(policy_path)
+    assert isinstance(server.table, np.memmap)
+    assert server.table.dtype == np.uint8
+    np.testing.assert_array_equal(server.act_batch(np.arange(env.n_states)), expected)
+    assert server.act(0) == expected[0]
+
+    q_path = tmp_path / "q.npy"
+    save_q_table(q_path, Q)
+    server = PolicyServer(q_path)
+    assert [server.act(s) for s in range(env.n_states)] == expected.tolist()
+
+    states = np.arange(env.n_states)
+    with ProcessPoolExecutor(max_workers=2) as pool:
+        answers = list(pool.map(_serve, [policy_path, q_path], [states, states]))
+    for answer in answers:
+        np.testing.assert_array_equal(answer, expected)
+
+    bad_path = tmp_path / "bad.npy"
+    np.save(bad_path, np.zeros((2, 2, 2)))
+    with pytest.raises(ValueError, match="policy"):
+        PolicyServer(bad_path)
+
+
+def test_epsilon_schedule():
+    params = QLearningHyperparameters(epsilon=0.5, epsilon_decay=0.5, epsilon_min=0.1)
+    assert [params.epsilon_at(e) for e in range(4)] == [0.5, 0.25, 0.125, 0.1]
+    assert (
+        QLearningHyperparameters().epsilon_at(1000) == QLearningHyperparameters.epsilon
+    )
+
+
+@pytest.mark.parametrize("trainer", ["batched", "dyna"])
+def test_epsilon_decay_applies_to_batched_and_dyna(env: GridWorld, trainer):
+    def late_return(decay):
+        params = QLearningHyperparameters(
+            episodes=300, alpha=0.2, epsilon=1.0, epsilon_decay=decay
+        )
+        if trainer == "batched":
+            _, returns = q_learning_batched(
+                env, params, n_envs=8, log_returns=True, seed=0
+            )
+        else:
+            _, returns = dyna_q(env, params, planning_steps=5, log_returns=True, seed=0)
+        return np.mean(returns[-50:])
+
+    # Fixed ε=1 keeps walking randomly; decayed ε ends up greedy and optimal
+    assert late_return(1.0) < 0
+    assert late_return(0.9) == OPTIMAL_RETURN_4X4
+
+
+def test_training_monitor_collects_metrics(env: GridWorld):
+    calls = []
+    monitor = TrainingMonitor(every=25, callback=lambda m, ep: calls.append(ep))
+    params = QLearningHyperparameters(episodes=110, epsilon_decay=0.99)
+    Q, returns = q_learning(env, params, log_returns=True, seed=0, monitor=monitor)
+
+    m = monitor.metrics
+    assert m.n_episodes == params.episodes
+    np.testing.assert_array_equal(m.returns, returns)
+    # each return is the +10 goal reward minus one per extra step
+    np.testing.assert_array_equal(m.returns, 11 - m.lengths)
+    assert (m.td_abs_max >= m.td_abs_mean).all()
+    assert (m.q_delta_norm > 0).all()
+    np.testing.assert_allclose(
+        m.epsilon, [params.epsilon_at(e) for e in range(params.episodes)]
+    )
+    assert (np.diff(m.elapsed) >= 0).all()
+    assert m.steps_per_second > 0
+    # streamed every 25 episodes, plus a final flush at the end of the budget
+    assert calls == [25, 50, 75, 100, 110]
+    assert Q.shape == (env.n_states, env.n_actions)
+
+
+def test_training_monitor_stops_early(env: GridWorld):
+    params = QLearningHyperparameters(episodes=3000, alpha=0.5, epsilon=0.0)
+    tol, patience = 1e-3, 5
+    monitor = TrainingMonitor(stop_tol=tol, patience=patience)
+    q_learning(env, params, seed=0, monitor=monitor)
+    n = monitor.metrics.n_episodes
+    assert n < params.episodes
+    assert (monitor.metrics.q_delta_norm[n - patience : n] <= tol).all()
+
+    stop_after = 20
+    stopper = TrainingMonitor(every=10, callback=lambda m, ep: ep >= stop_after)
+    q_learning(env, params, seed=0, monitor=stopper)
+    assert stopper.metrics.n_episodes == stop_after
+    assert TrainingMetrics.allocate(3).steps_per_second == 0.0
+    with pytest.raises(ValueError, match="every"):
+        TrainingMonitor(every=0)
+    with pytest.raises(ValueError, match="patience"):
+        TrainingMonitor(stop_tol=tol, patience=0)
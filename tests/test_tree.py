@@ -1,7 +1,72 @@
+import itertools
+import json
+
+import numpy as np
+import pytest
+
+from decision_tree import boosting, export
+from decision_tree import tree as tree_module
+from decision_tree.binning import bin_features, compute_bin_edges
+from decision_tree.boosting import GradientBoostingClassifier, GradientBoostingRegressor
+from decision_tree.criteria import CRITERIA
 from decision_tree.datasets import load_toy_split
-from decision_tree.tree import DecisionTree
+from decision_tree.export import (
+    compile_predictor,
+    export_python,
+    from_json,
+    load_model,
+    save_model,
+    to_json,
+)
+from decision_tree.forest import RandomForest
+from decision_tree.tree import LEAF, DecisionTree, _Split
 
 MIN_ACCURACY_TREE = 0.9
+MIN_ACCURACY_MULTICLASS = 0.8
+LABEL_NOISE = 0.1
+STEP_AT = 4.0
+ROUNDING = 1e-12
+
+
+class BruteForceTree(DecisionTree):
+    """Reference split search: every threshold rescored from boolean masks."""
+
+    def _best_split(self, X, stats, order):
+        rows = order[0]
+        X, stats = X[rows], stats[rows]
+        best_gain, best_feat, best_thresh = -1, -1, -1.0
+        parent_impurity = self._impurity(stats)
+        n_samples = stats.shape[0]
+        for feat in range(X.shape[1]):
+            for t in np.unique(X[:, feat]):
+                left_idx = X[:, feat] <= t
+                right_idx = ~left_idx
+                if (
+                    left_idx.sum() < self.min_samples_split
+                    or right_idx.sum() < self.min_samples_split
+                ):
+                    continue
+                gain = (
+                    parent_impurity
+                    - (left_idx.sum() / n_samples) * self._impurity(stats[left_idx])
+                    - (right_idx.sum() / n_samples) * self._impurity(stats[right_idx])
+                )
+                if gain > best_gain:
+                    best_gain, best_feat, best_thresh = gain, feat, t
+        return _Split(best_feat, best_thresh, best_gain)
+
+
+def _structure(clf, node=0):
+    """Exact (unrounded) nested representation of a fitted tree."""
+    tree = clf.tree_
+    if tree.feature[node] == LEAF:
+        return tuple(np.round(tree.value[node], 12))
+    return (
+        int(tree.feature[node]),
+        float(tree.threshold[node]),
+        _structure(clf, tree.left[node]),
+        _structure(clf, tree.right[node]),
+    )
 
 
 def test_dt_accuracy():
@@ -11,3 +76,654 @@ def test_dt_accuracy():
     acc = (y_pred == y_te).mean()
     assert acc >= MIN_ACCURACY_TREE
     assert y_pred.shape == y_te.shape
+
+
+@pytest.mark.parametrize("min_samples_split", [1, 2, 5])
+def test_sorted_split_search_matches_brute_force(min_samples_split):
+    X_tr, y_tr, _, _ = load_toy_split()
+    rng = np.random.default_rng(0)
+    # Integer-valued features exercise tied values and tied gains
+    X_int = rng.integers(0, 6, size=(200, 4)).astype(float)
+    y_int = (X_int[:, 0] + rng.integers(0, 3, size=200) > X_int[:, 1]).astype(int)
+    for X, y in ((X_tr, y_tr), (X_int, y_int)):
+        params = {"max_depth": 6, "min_samples_split": min_samples_split}
+        fast = DecisionTree(**params).fit(X, y)
+        reference = BruteForceTree(**params).fit(X, y)
+        assert fast.export_text() == reference.export_text()
+        assert _structure(fast) == _structure(reference)
+        np.testing.assert_array_equal(fast.predict(X), reference.predict(X))
+
+
+def test_hist_splitter_matches_exact_when_bins_cover_all_values():
+    X_tr, y_tr, X_te, y_te = load_toy_split()
+    rng = np.random.default_rng(1)
+    X_int = rng.integers(0, 20, size=(300, 3)).astype(float)
+    y_int = (X_int[:, 0] - X_int[:, 2] + rng.normal(size=300) > 0).astype(int)
+    for X, y in ((X_tr, y_tr), (X_int, y_int)):
+        exact = DecisionTree(max_depth=6, min_samples_split=3).fit(X, y)
+        hist = DecisionTree(max_depth=6, min_samples_split=3, splitter="hist").fit(X, y)
+        assert _structure(hist) == _structure(exact)
+    hist = DecisionTree(max_depth=10, min_samples_split=5, splitter="hist")
+    assert (hist.fit(X_tr, y_tr).predict(X_te) == y_te).mean() >= MIN_ACCURACY_TREE
+
+
+def test_hist_splitter_with_few_bins():
+    rng = np.random.default_rng(2)
+    X = rng.normal(size=(2000, 4))
+    y = (X[:, 1] > X[:, 1].mean()).astype(int)
+    max_bins = 16
+    edges = compute_bin_edges(X, max_bins)
+    binned = bin_features(X, edges)
+    assert binned.dtype == np.uint8
+    assert binned.max() < max_bins
+    assert all(feat_edges.size < max_bins for feat_edges in edges)
+    clf = DecisionTree(max_depth=4, splitter="hist", max_bins=max_bins).fit(X, y)
+    assert clf.tree_.feature[0] == 1
+    assert clf.tree_.threshold[0] in edges[1]
+    assert (clf.predict(X) == y).mean() >= MIN_ACCURACY_TREE
+
+
+def test_invalid_splitter_options():
+    X_tr, y_tr, _, _ = load_toy_split()
+    with pytest.raises(ValueError, match="splitter"):
+        DecisionTree(splitter="random").fit(X_tr, y_tr)
+    with pytest.raises(ValueError, match="max_bins"):
+        DecisionTree(splitter="hist", max_bins=1000).fit(X_tr, y_tr)
+
+
+def _walk(tree, row):
+    node = 0
+    while tree.feature[node] != LEAF:
+        go_left = row[tree.feature[node]] <= tree.threshold[node]
+        node = tree.left[node] if go_left else tree.right[node]
+    return node
+
+
+def test_flat_tree_vectorized_apply_matches_row_walk():
+    rng = np.random.default_rng(3)
+    X = rng.normal(size=(500, 5))
+    y = (np.sin(3 * X[:, 0]) + X[:, 1] > 0).astype(int)
+    clf = DecisionTree(max_depth=8).fit(X, y)
+    tree = clf.tree_
+    assert tree.n_nodes == tree.feature.size > 1
+    X_new = rng.normal(size=(300, 5))
+    leaves = tree.apply(X_new)
+    np.testing.assert_array_equal(leaves, [_walk(tree, row) for row in X_new])
+    assert (tree.feature[leaves] == LEAF).all()
+    np.testing.assert_array_equal(
+        clf.predict(X_new), clf.classes_[tree.value[leaves].argmax(axis=1)]
+    )
+
+
+def test_pure_labels_give_single_leaf():
+    X = np.arange(10.0).reshape(-1, 1)
+    clf = DecisionTree().fit(X, np.ones(10, dtype=int))
+    assert clf.tree_.n_nodes == 1
+    np.testing.assert_array_equal(clf.predict(X), np.ones(10))
+    assert clf.export_text() == "Predict 1\n"
+
+
+def _multiclass_data(seed=4, n=300):
+    rng = np.random.default_rng(seed)
+    X = rng.integers(0, 8, size=(n, 3))
+    labels = (X[:, 0] + X[:, 1]) // 3 % 3
+    noisy = rng.random(n) < LABEL_NOISE
+    labels[noisy] = rng.integers(0, 3, noisy.sum())
+    return X.astype(float), np.array(["a", "b", "c"])[labels]
+
+
+@pytest.mark.parametrize("criterion", ["gini", "entropy"])
+def test_multiclass_criteria_match_brute_force(criterion):
+    X, y = _multiclass_data()
+    params = {"max_depth": 5, "min_samples_split": 3, "criterion": criterion}
+    fast = DecisionTree(**params).fit(X, y)
+    reference = BruteForceTree(**params).fit(X, y)
+    assert _structure(fast) == _structure(reference)
+    hist = DecisionTree(splitter="hist", **params).fit(X, y)
+    assert _structure(hist) == _structure(fast)
+    np.testing.assert_array_equal(fast.classes_, ["a", "b", "c"])
+    assert set(fast.predict(X)) <= {"a", "b", "c"}
+    deep = DecisionTree(max_depth=20, min_samples_split=2, criterion=criterion)
+    assert (deep.fit(X, y).predict(X) == y).mean() > MIN_ACCURACY_MULTICLASS
+
+
+def test_predict_proba_is_leaf_class_distribution():
+    X, y = _multiclass_data(seed=5)
+    clf = DecisionTree(max_depth=3).fit(X, y)
+    proba = clf.predict_proba(X)
+    assert proba.shape == (y.size, 3)
+    np.testing.assert_allclose(proba.sum(axis=1), 1.0)
+    np.testing.assert_array_equal(clf.classes_[proba.argmax(axis=1)], clf.predict(X))
+    leaves = clf.tree_.apply(X)
+    leaf = leaves[0]
+    in_leaf = y[leaves == leaf]
+    expected = [(in_leaf == c).mean() for c in clf.classes_]
+    np.testing.assert_allclose(proba[0], expected)
+
+
+def test_regression_tree_with_mse():
+    rng = np.random.default_rng(6)
+    X = rng.integers(0, 10, size=(400, 2)).astype(float)
+    y = np.where(X[:, 0] > STEP_AT, 3.0, -1.0) + 0.5 * X[:, 1] + rng.normal(0, 0.1, 400)
+    params = {"max_depth": 4, "min_samples_split": 5, "criterion": "mse"}
+    fast = DecisionTree(**params).fit(X, y)
+    reference = BruteForceTree(**params).fit(X, y)
+    assert _structure(fast) == _structure(reference)
+    hist = DecisionTree(splitter="hist", **params).fit(X, y)
+    assert hist.tree_.feature[0] == fast.tree_.feature[0] == 0
+    assert fast.tree_.threshold[0] == STEP_AT
+    for clf in (fast, hist):
+        pred = clf.predict(X)
+        assert pred.dtype == np.float64
+        assert np.mean((pred - y) ** 2) < 0.1 * y.var()
+    # Leaf values are the mean target of their training rows
+    leaves = fast.tree_.apply(X)
+    leaf = leaves[0]
+    assert fast.predict(X[:1])[0] == pytest.approx(y[leaves == leaf].mean())
+    with pytest.raises(ValueError, match="classification"):
+        fast.predict_proba(X)
+
+
+def test_criterion_impurities():
+    counts = np.array([[5.0, 5.0], [10.0, 0.0], [2.0, 2.0]])
+    np.testing.assert_allclose(CRITERIA["gini"]().impurity(counts), [0.5, 0.0, 0.5])
+    np.testing.assert_allclose(CRITERIA["entropy"]().impurity(counts), [1.0, 0.0, 1.0])
+    three = np.array([4.0, 4.0, 4.0])
+    assert CRITERIA["gini"]().impurity(three) == pytest.approx(2 / 3)
+    assert CRITERIA["entropy"]().impurity(three) == pytest.approx(np.log2(3))
+    mse = CRITERIA["mse"]()
+    stats = mse.sample_stats(np.array([1.0, 2.0, 3.0, 6.0]), 0).sum(axis=0)
+    assert mse.impurity(stats) == pytest.approx(np.var([1, 2, 3, 6]))
+    assert mse.node_value(stats) == pytest.approx([3.0])
+    with pytest.raises(ValueError, match="criterion"):
+        DecisionTree(criterion="mae").fit(np.zeros((2, 1)), np.zeros(2))
+
+
+def test_integer_sample_weight_equals_repeated_rows():
+    X, y = _multiclass_data(seed=7, n=120)
+    weight = np.random.default_rng(7).integers(0, 3, size=y.size)
+    repeated = np.repeat(np.arange(y.size), weight)
+    for splitter in ("best", "hist"):
+        params = {"max_depth": 4, "min_samples_split": 4, "splitter": splitter}
+        weighted = DecisionTree(**params).fit(X, y, sample_weight=weight)
+        expanded = DecisionTree(**params).fit(X[repeated], y[repeated])
+        assert _structure(weighted) == _structure(expanded)
+
+
+def test_max_features_subsamples_split_candidates():
+    X, y = _multiclass_data(seed=8)
+    X = np.hstack([X, np.zeros((y.size, 5))])
+    clf = DecisionTree(max_depth=4, max_features=1, random_state=0).fit(X, y)
+    assert clf.n_split_features_ == 1
+    # Splits on constant columns are impossible, so some nodes stop early
+    full = DecisionTree(max_depth=4).fit(X, y)
+    assert clf.tree_.n_nodes < full.tree_.n_nodes
+    again = DecisionTree(max_depth=4, max_features=1, random_state=0).fit(X, y)
+    assert _structure(again) == _structure(clf)
+    for max_features, expected in (("sqrt", 2), ("log2", 3), (0.5, 4), (20, 8)):
+        clf = DecisionTree(max_features=max_features).fit(X, y)
+        assert clf.n_split_features_ == expected
+    with pytest.raises(ValueError, match="max_features"):
+        DecisionTree(max_features=0).fit(X, y)
+
+
+def _forest_data(n=600, seed=9):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n, 6))
+    # Oblique, noisy boundary: averaging trees beats a single one
+    y = (X[:, :3].sum(axis=1) + rng.normal(scale=0.5, size=n) > 0).astype(int)
+    return X, y
+
+
+def test_random_forest_single_tree_without_randomness_is_decision_tree():
+    X, y = _forest_data()
+    params = {"max_depth": 6, "min_samples_split": 3}
+    forest = RandomForest(n_estimators=1, bootstrap=False, max_features=None, **params)
+    tree = DecisionTree(**params).fit(X, y)
+    forest.fit(X, y)
+    np.testing.assert_array_equal(forest.predict(X), tree.predict(X))
+    np.testing.assert_array_equal(forest.predict_proba(X), tree.predict_proba(X))
+
+
+@pytest.mark.parametrize("splitter", ["best", "hist"])
+def test_random_forest_is_deterministic_across_n_jobs(splitter):
+    X, y = _forest_data()
+    params = {"n_estimators": 8, "max_depth": 6, "splitter": splitter}
+    serial = RandomForest(random_state=3, **params).fit(X, y)
+    parallel = RandomForest(random_state=3, n_jobs=2, **params).fit(X, y)
+    for a, b in zip(serial.trees_, parallel.trees_):
+        np.testing.assert_array_equal(a.feature, b.feature)
+        np.testing.assert_array_equal(a.threshold, b.threshold)
+    np.testing.assert_array_equal(serial.predict_proba(X), parallel.predict_proba(X))
+    other = RandomForest(random_state=4, **params).fit(X, y)
+    assert not np.array_equal(serial.predict_proba(X), other.predict_proba(X))
+
+
+def test_random_forest_averages_tree_predictions():
+    X, y = _forest_data()
+    X_new, y_new = _forest_data(seed=10)
+    forest = RandomForest(n_estimators=25, max_depth=8, random_state=0, batch_size=50)
+    forest.fit(X, y)
+    per_tree = np.mean([tree.value[tree.apply(X_new)] for tree in forest.trees_], 0)
+    np.testing.assert_allclose(forest.predict_proba(X_new), per_tree)
+    single = DecisionTree(max_depth=8).fit(X, y)
+    assert (forest.predict(X_new) == y_new).mean() > (
+        single.predict(X_new) == y_new
+    ).mean()
+
+
+def test_random_forest_regression():
+    X, _ = _forest_data()
+    y = X[:, 0] * X[:, 1] + np.sin(2 * X[:, 2])
+    forest = RandomForest(n_estimators=20, criterion="mse", random_state=0)
+    pred = forest.fit(X, y).predict(X)
+    assert pred.dtype == np.float64
+    assert np.mean((pred - y) ** 2) < 0.25 * y.var()
+    with pytest.raises(ValueError, match="classification"):
+        forest.predict_proba(X)
+    with pytest.raises(ValueError, match="splitter"):
+        RandomForest(splitter="random").fit(X, y)
+    with pytest.raises(ValueError, match="criterion"):
+        RandomForest(criterion="mae").fit(X, y)
+
+
+def _boosting_data(n=800, seed=11):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n, 5))
+    f = 2 * np.sin(X[:, 0]) + X[:, 1] * X[:, 2]
+    return X, f, f + rng.normal(scale=0.3, size=n)
+
+
+def test_gradient_boosting_regressor(monkeypatch):
+    X, _, y = _boosting_data()
+    X_new, f_new, _ = _boosting_data(seed=12)
+    calls = []
+    monkeypatch.setattr(
+        boosting, "bin_features", lambda *a: calls.append(1) or bin_features(*a)
+    )
+    n_rounds = 60
+    model = GradientBoostingRegressor(n_rounds, learning_rate=0.3).fit(X, y)
+    assert len(calls) == 1  # binned once for all rounds
+    assert len(model.estimators_) == model.best_iteration_ == n_rounds
+    assert np.all(np.diff(model.train_score_) <= 0.0)
+    # The incrementally updated training scores match a fresh prediction
+    assert model.train_score_[-1] == pytest.approx(np.mean((model.predict(X) - y) ** 2))
+    tree = DecisionTree(max_depth=3, criterion="mse").fit(X, y)
+    boosted_mse = np.mean((model.predict(X_new) - f_new) ** 2)
+    assert boosted_mse < 0.5 * np.mean((tree.predict(X_new) - f_new) ** 2)
+
+
+def test_gradient_boosting_early_stopping_and_subsample():
+    X, _, y = _boosting_data()
+    X_val, _, y_val = _boosting_data(n=300, seed=13)
+    params = {"n_estimators": 500, "learning_rate": 0.3, "n_iter_no_change": 5}
+    model = GradientBoostingRegressor(subsample=0.5, random_state=0, **params)
+    model.fit(X, y, eval_set=(X_val, y_val))
+    n_rounds = len(model.validation_score_)
+    assert n_rounds < params["n_estimators"]
+    assert model.best_iteration_ == int(np.argmin(model.validation_score_)) + 1
+    assert n_rounds - model.best_iteration_ == params["n_iter_no_change"]
+    assert len(model.estimators_) == model.best_iteration_
+    val_mse = np.mean((model.predict(X_val) - y_val) ** 2)
+    assert val_mse == pytest.approx(min(model.validation_score_))
+    again = GradientBoostingRegressor(subsample=0.5, random_state=0, **params)
+    np.testing.assert_array_equal(
+        again.fit(X, y, eval_set=(X_val, y_val)).predict(X_val), model.predict(X_val)
+    )
+    # Without eval_set a validation split is held out internally
+    held_out = GradientBoostingRegressor(**params).fit(X, y)
+    assert len(held_out.validation_score_) < params["n_estimators"]
+    with pytest.raises(ValueError, match="subsample"):
+        GradientBoostingRegressor(subsample=0.0).fit(X, y)
+
+
+def test_gradient_boosting_classifier():
+    X, f, _ = _boosting_data()
+    X_new, f_new, _ = _boosting_data(seed=12)
+    labels = np.array(["neg", "pos"])
+    y = labels[(f + np.random.default_rng(0).normal(scale=0.5, size=f.size) > 0) * 1]
+    model = GradientBoostingClassifier(n_estimators=80, max_depth=3).fit(X, y)
+    np.testing.assert_array_equal(model.classes_, labels)
+    assert model.train_score_[-1] < model.train_score_[0]
+    proba = model.predict_proba(X_new)
+    np.testing.assert_allclose(proba.sum(axis=1), 1.0)
+    np.testing.assert_array_equal(model.predict(X_new), labels[proba.argmax(axis=1)])
+    tree = DecisionTree(max_depth=3).fit(X, y)
+    truth = labels[(f_new > 0) * 1]
+    tree_acc = (tree.predict(X_new) == truth).mean()
+    assert (model.predict(X_new) == truth).mean() > tree_acc
+    with pytest.raises(ValueError, match="2 classes"):
+        GradientBoostingClassifier().fit(X, np.arange(f.size) % 3)
+
+
+@pytest.mark.parametrize("splitter", ["best", "hist"])
+def test_threaded_split_search_matches_serial(monkeypatch, splitter):
+    monkeypatch.setattr(tree_module, "PARALLEL_MIN_SAMPLES", 0)
+    X, y = _multiclass_data(seed=14, n=400)
+    params = {"max_depth": 6, "splitter": splitter, "max_features": 2}
+    serial = DecisionTree(random_state=0, **params).fit(X, y)
+    threaded = DecisionTree(random_state=0, n_jobs=4, **params).fit(X, y)
+    assert _structure(threaded) == _structure(serial)
+    assert threaded._pool is None
+
+
+def test_failed_fit_leaves_no_scratch_state(monkeypatch):
+    X, y = _multiclass_data(seed=15, n=100)
+    model = DecisionTree(max_depth=3)
+    before = set(vars(model))
+
+    def fail(*args):
+        raise RuntimeError("split failed")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(DecisionTree, "_goes_left", staticmethod(fail))
+        with pytest.raises(RuntimeError, match="split failed"):
+            model.fit(X, y)
+    fitted = set(vars(DecisionTree(max_depth=3).fit(X, y)))
+    assert set(vars(model)) - before <= fitted
+    assert "_is_left" not in vars(model)
+    assert _structure(model.fit(X, y)) == _structure(
+        DecisionTree(max_depth=3).fit(X, y)
+    )
+
+
+def _leaf_risk(tree):
+    """Total leaf impurity weighted by sample share, R(T)."""
+    leaves = tree.feature == LEAF
+    return (tree.n_samples[leaves] * tree.impurity[leaves]).sum() / tree.n_samples[0]
+
+
+def test_node_impurity_and_counts_are_recorded():
+    X, y = _multiclass_data(seed=15)
+    tree = DecisionTree(max_depth=3).fit(X, y).tree_
+    assert tree.n_samples[0] == y.size
+    assert tree.impurity[0] == pytest.approx(
+        1 - sum((y == c).mean() ** 2 for c in "abc")
+    )
+    internal = tree.feature != LEAF
+    np.testing.assert_allclose(
+        tree.n_samples[internal],
+        tree.n_samples[tree.left[internal]] + tree.n_samples[tree.right[internal]],
+    )
+
+
+@pytest.mark.parametrize("splitter", ["best", "hist"])
+def test_truncate_equals_shallower_fit(splitter):
+    X, y = _multiclass_data(seed=16)
+    deep = DecisionTree(max_depth=None, splitter=splitter).fit(X, y)
+    for depth in range(1, 6):
+        shallow = DecisionTree(max_depth=depth, splitter=splitter).fit(X, y)
+        assert _structure(deep.truncate(depth)) == _structure(shallow)
+        assert deep.truncate(depth).export_text() == shallow.export_text()
+
+
+def test_cost_complexity_pruning_path():
+    X, y = _multiclass_data(seed=17)
+    clf = DecisionTree(max_depth=None, min_samples_split=2).fit(X, y)
+    alphas, impurities = clf.cost_complexity_pruning_path()
+    assert alphas[0] == 0.0
+    assert np.all(np.diff(alphas) > 0)
+    assert np.all(np.diff(impurities) >= -ROUNDING)
+    assert impurities[0] == pytest.approx(_leaf_risk(clf.tree_))
+    for alpha, impurity in zip(alphas, impurities):
+        pruned = clf.prune(alpha)
+        assert _leaf_risk(pruned.tree_) == pytest.approx(impurity)
+    assert clf.prune(alphas[-1]).tree_.n_nodes == 1
+    assert _structure(clf.prune(0.0)) == _structure(clf)
+    # Between path alphas the pruned tree is that of the lower alpha
+    mid = (alphas[1] + alphas[2]) / 2
+    assert _structure(clf.prune(mid)) == _structure(clf.prune(alphas[1]))
+    # ccp_alpha at fit time prunes the same way
+    fitted = DecisionTree(max_depth=None, ccp_alpha=alphas[2]).fit(X, y)
+    assert _structure(fitted) == _structure(clf.prune(alphas[2]))
+
+
+def test_weakest_link_is_optimal_subtree():
+    """Pruned trees minimise R(T) + alpha * |leaves| over all prunings found."""
+    X, y = _multiclass_data(seed=18, n=150)
+    clf = DecisionTree(max_depth=4).fit(X, y)
+    alphas, _ = clf.cost_complexity_pruning_path()
+    candidates = [clf.prune(a).tree_ for a in alphas]
+    for alpha in alphas:
+        best = clf.prune(alpha).tree_
+        cost = _leaf_risk(best) + alpha * (best.feature == LEAF).sum()
+        for other in candidates:
+            other_cost = _leaf_risk(other) + alpha * (other.feature == LEAF).sum()
+            assert cost <= other_cost + ROUNDING
+
+
+def test_min_impurity_decrease():
+    X, y = _multiclass_data(seed=19)
+    full = DecisionTree(max_depth=None).fit(X, y)
+    threshold = 0.01
+    clf = DecisionTree(max_depth=None, min_impurity_decrease=threshold).fit(X, y)
+    tree = clf.tree_
+    assert 1 < tree.n_nodes < full.tree_.n_nodes
+    internal = np.flatnonzero(tree.feature != LEAF)
+    left, right = tree.left[internal], tree.right[internal]
+    decrease = (
+        tree.n_samples[internal] * tree.impurity[internal]
+        - tree.n_samples[left] * tree.impurity[left]
+        - tree.n_samples[right] * tree.impurity[right]
+    ) / tree.n_samples[0]
+    assert np.all(decrease >= threshold)
+    assert DecisionTree(min_impurity_decrease=1.0).fit(X, y).tree_.n_nodes == 1
+
+
+@pytest.mark.parametrize("splitter", ["best", "hist"])
+def test_max_leaf_nodes_grows_best_first(splitter):
+    X, y = _multiclass_data(seed=20)
+    params = {"max_depth": None, "splitter": splitter}
+    full = DecisionTree(**params).fit(X, y)
+    n_full_leaves = int((full.tree_.feature == LEAF).sum())
+    # Enough leaves for every split gives the depth-first tree back
+    unlimited = DecisionTree(max_leaf_nodes=n_full_leaves, **params).fit(X, y)
+    assert _structure(unlimited) == _structure(full)
+    previous_risk = np.inf
+    for max_leaf_nodes in (2, 3, 5, 8, 13):
+        clf = DecisionTree(max_leaf_nodes=max_leaf_nodes, **params).fit(X, y)
+        assert (clf.tree_.feature == LEAF).sum() == max_leaf_nodes
+        assert clf.tree_.feature[0] == full.tree_.feature[0]
+        risk = _leaf_risk(clf.tree_)
+        assert risk < previous_risk
+        previous_risk = risk
+    with pytest.raises(ValueError, match="max_leaf_nodes"):
+        DecisionTree(max_leaf_nodes=1).fit(X, y)
+
+
+N_CATEGORIES = 12
+LEFT_CATEGORIES = [1, 4, 7, 10]
+MISSING_RATE = 0.2
+
+
+def _missing_categorical_data(n=1500, seed=13):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n, 3))
+    X[:, 2] = rng.integers(0, N_CATEGORIES, n)
+    y = np.isin(X[:, 2], LEFT_CATEGORIES).astype(int)
+    missing = rng.random(n) < MISSING_RATE
+    X[missing, 0] = np.nan
+    # Missingness of feature 0 carries signal: it flips the label
+    return X, np.where(missing, 1 - y, y)
+
+
+@pytest.mark.parametrize("splitter", ["best", "hist"])
+def test_missing_values_and_categories_split_natively(splitter):
+    X, y = _missing_categorical_data()
+    clf = DecisionTree(max_depth=2, splitter=splitter, categorical_features=[2])
+    tree = clf.fit(X, y).tree_
+    assert tree.is_categorical[0]
+    np.testing.assert_array_equal(tree.categories(0), LEFT_CATEGORIES)
+    assert "X[2] in {1, 4, 7, 10}?" in clf.export_text()
+    # Both children split values (left) from NaNs (right)
+    for child in (tree.left[0], tree.right[0]):
+        assert tree.feature[child] == 0
+        assert tree.threshold[child] == np.inf
+        assert not tree.missing_left[child]
+    assert (clf.predict(X) == y).all()
+    X_new = np.array([[np.nan, 0.0, 4.0], [0.0, 0.0, 4.0], [np.nan, 0.0, 5.0]])
+    np.testing.assert_array_equal(clf.predict(X_new), [0, 1, 1])
+
+    exact = DecisionTree(max_depth=4, categorical_features=[2]).fit(X, y)
+    hist = DecisionTree(max_depth=4, splitter="hist", categorical_features=[2])
+    assert hist.fit(X, y).export_text() == exact.export_text()
+
+
+@pytest.mark.parametrize("splitter", ["best", "hist"])
+def test_missing_value_default_direction(splitter):
+    rng = np.random.default_rng(14)
+    X = rng.normal(size=(400, 1))
+    y = (X[:, 0] > 1.0).astype(int)
+    # Unseen in training, NaNs follow the larger child
+    clf = DecisionTree(max_depth=1, splitter=splitter).fit(X, y)
+    assert clf.tree_.missing_left[0]
+    # NaN rows labelled like the small child are sent there
+    X[: X.shape[0] // 4, 0] = np.nan
+    y[: X.shape[0] // 4] = 1
+    clf = DecisionTree(max_depth=1, splitter=splitter).fit(X, y)
+    assert not clf.tree_.missing_left[0]
+    assert (clf.predict(X) == y).mean() >= MIN_ACCURACY_TREE
+
+
+@pytest.mark.parametrize("criterion", ["gini", "mse"])
+def test_categorical_prefix_split_is_best_subset(criterion):
+    rng = np.random.default_rng(15)
+    n_categories = 6
+    codes = rng.integers(0, n_categories, 500)
+    effect = rng.normal(size=n_categories)
+    y = effect[codes] + rng.normal(size=codes.size)
+    if criterion == "gini":
+        y = (y > 0).astype(int)
+    X = codes[:, None].astype(float)
+    clf = DecisionTree(max_depth=1, criterion=criterion, categorical_features=[0])
+    tree = clf.fit(X, y).tree_
+
+    def gain(goes_left):
+        stats = clf.criterion_.sample_stats(
+            np.unique(y, return_inverse=True)[1] if criterion == "gini" else y, 2
+        )
+        share = goes_left.mean()
+        return (
+            clf._impurity(stats)
+            - share * clf._impurity(stats[goes_left])
+            - (1 - share) * clf._impurity(stats[~goes_left])
+        )
+
+    best = max(
+        gain(np.isin(codes, subset))
+        for size in range(1, n_categories)
+        for subset in itertools.combinations(range(n_categories), size)
+    )
+    assert gain(np.isin(codes, tree.categories(0))) == pytest.approx(best, abs=ROUNDING)
+
+
+def test_missing_and_categorical_binning_and_validation():
+    X = np.array([[0.5, 3.0], [np.nan, 1.0], [1.5, np.nan], [0.5, 3.0]])
+    edges = compute_bin_edges(X, categorical=np.array([False, True]))
+    np.testing.assert_array_equal(edges[1], [1.0, 3.0])
+    binned = bin_features(X, edges)
+    # NaNs get the code right after each feature's value bins
+    np.testing.assert_array_equal(binned[:, 0], [0, edges[0].size + 1, 1, 0])
+    np.testing.assert_array_equal(binned[:, 1], [1, 0, edges[1].size + 1, 1])
+    many = np.arange(20, dtype=float)[:, None]
+    with pytest.raises(ValueError, match="categories"):
+        compute_bin_edges(many, max_bins=8, categorical=np.array([True]))
+    y = np.arange(4) % 2
+    for bad in (-1.0, 2.5, 300.0):
+        X_bad = X.copy()
+        X_bad[0, 1] = bad
+        for splitter in ("best", "hist"):
+            clf = DecisionTree(splitter=splitter, categorical_features=[1])
+            with pytest.raises(ValueError, match="Categorical"):
+                clf.fit(X_bad, y)
+
+
+def test_ensembles_handle_missing_values_and_categories():
+    X, y = _missing_categorical_data()
+    forest = RandomForest(
+        n_estimators=10, max_depth=4, categorical_features=[2], random_state=0
+    ).fit(X, y)
+    assert (forest.predict(X) == y).mean() >= MIN_ACCURACY_TREE
+    booster = GradientBoostingClassifier(
+        n_estimators=10, learning_rate=0.3, categorical_features=[2]
+    ).fit(X, y)
+    assert (booster.predict(X) == y).mean() >= MIN_ACCURACY_TREE
+
+
+def _export_models():
+    X, y = _missing_categorical_data(n=600)
+    labels = np.array(["no", "yes"])[y]
+    classifier = DecisionTree(max_depth=5, categorical_features=[2]).fit(X, labels)
+    target = np.where(np.isnan(X[:, 0]), 2.0, X[:, 1]) + X[:, 2]
+    regressor = DecisionTree(
+        max_depth=5, criterion="mse", splitter="hist", categorical_features=[2]
+    ).fit(X, target)
+    return X, (classifier, regressor)
+
+
+def test_save_load_round_trip(tmp_path):
+    X, models = _export_models()
+    for model in models:
+        save_model(tmp_path / "model.dt", model)
+        loaded = load_model(tmp_path / "model.dt")
+        assert isinstance(loaded.tree_.threshold, np.memmap)
+        np.testing.assert_array_equal(loaded.predict(X), model.predict(X))
+        assert loaded.export_text() == model.export_text()
+        assert loaded.prune(0.01).export_text() == model.prune(0.01).export_text()
+        in_memory = load_model(tmp_path / "model.dt", mmap=False)
+        assert not isinstance(in_memory.tree_.threshold, np.memmap)
+        np.testing.assert_array_equal(in_memory.predict(X), model.predict(X))
+    assert loaded.criterion == "mse"
+    assert loaded.categorical_features == [2]
+
+
+def test_json_round_trip_is_strict_json():
+    X, models = _export_models()
+
+    def reject(constant):
+        raise ValueError(constant)
+
+    documents = []
+    for model in models:
+        text = to_json(model)
+        documents.append(json.loads(text, parse_constant=reject))
+        assert len(documents[-1]["nodes"]) == model.tree_.n_nodes
+        restored = from_json(text)
+        np.testing.assert_array_equal(restored.predict(X), model.predict(X))
+        assert restored.export_text() == model.export_text()
+    assert documents[0]["classes"] == ["no", "yes"]
+    assert documents[1]["classes"] is None
+    # The +inf threshold splitting values from NaNs is written as null
+    assert any(node.get("threshold", 0.0) is None for node in documents[0]["nodes"])
+
+
+def test_compiled_predictor_matches_predict(monkeypatch):
+    X, models = _export_models()
+    for model in models:
+        predict_one = compile_predictor(model)
+        assert [predict_one(row) for row in X.tolist()] == model.predict(X).tolist()
+    assert "def score(x):" in export_python(models[0], name="score")
+    X_deep = np.arange(200.0)[:, None]
+    deep = DecisionTree(max_depth=None).fit(X_deep, np.arange(200) % 2)
+    predict_one = compile_predictor(deep)
+    assert [predict_one(row) for row in X_deep] == deep.predict(X_deep).tolist()
+    monkeypatch.setattr(export, "MAX_CODEGEN_DEPTH", 2)
+    with pytest.raises(ValueError, match="deeper"):
+        export_python(deep)
+
+
+def test_export_rejects_bad_input(tmp_path):
+    with pytest.raises(ValueError, match="fitted"):
+        save_model(tmp_path / "m.dt", DecisionTree())
+    (tmp_path / "junk.dt").write_bytes(b"\0" * 64)
+    with pytest.raises(ValueError, match="not a saved"):
+        load_model(tmp_path / "junk.dt")
+    _, models = _export_models()
+    save_model(tmp_path / "m.dt", models[0])
+    data = bytearray((tmp_path / "m.dt").read_bytes())
+    data[8] = 99
+    (tmp_path / "m.dt").write_bytes(bytes(data))
+    with pytest.raises(ValueError, match="version 99"):
+        load_model(tmp_path / "m.dt")
+    with pytest.raises(ValueError, match="version"):
+        from_json('{"format_version": 99}')